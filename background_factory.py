@@ -1,5 +1,6 @@
 from __future__ import annotations
 import random
+from typing import Dict
 from image.bitmap import Bitmap
 from filesystem.file_utils import FileUtils
 from PIL import Image
@@ -17,28 +18,67 @@ class BackgroundFactory:
     _SUBDIR = "/images/backgrounds/"
     _EXT = ".png"
 
+    # Decoded dish images by name. Transforms always make new images,
+    # so cached ones are never modified. About 2 MB per dish.
+    _CACHE: Dict[str, Image.Image] = {}
+
+    @classmethod
+    def load(cls, name: str) -> Image.Image:
+        """
+        The decoded dish image `name`, read from disk on first use only.
+        """
+        pil = cls._CACHE.get(name)
+        if pil is None:
+            pil = FileUtils.load_local_image(
+                subdirectory=cls._SUBDIR,
+                name="/" + name + cls._EXT,
+            )
+            cls._CACHE[name] = pil
+        return pil
+
+    @classmethod
+    def preload(cls) -> None:
+        """
+        Decode every dish now so later samples never touch the disk.
+        """
+        for name in cls._NAMES:
+            cls.load(name)
+
     @classmethod
-    def random(cls) -> Bitmap:
+    def clear_cache(cls) -> None:
+        cls._CACHE.clear()
+
+    @classmethod
+    def random(cls, rng: random.Random | None = None) -> Bitmap:
         """
         Load a random dish image, apply random transforms
         (rotation, flips, resize), and return as a Bitmap.
+
+        All choices are drawn from `rng` (default: the global random module).
         """
+        bmp = Bitmap()
+        bmp.import_pillow(cls.random_image(rng=rng))
+        return bmp
+
+    @classmethod
+    def random_image(cls, rng: random.Random | None = None) -> Image.Image:
+        """
+        The transformed dish of random(), as a Pillow image (same draws
+        from `rng`), for callers that convert it some other way.
+        """
+        if rng is None:
+            rng = random
 
         # ------------------------------------------------------
         # 1. Choose random file and load Pillow image
         # ------------------------------------------------------
-        name = random.choice(cls._NAMES)
-        full_name = name + cls._EXT
-
-        pil = FileUtils.load_local_image(
-            subdirectory=cls._SUBDIR,
-            name="/" + full_name,
-        )
+        name = rng.choice(cls._NAMES)
+        pil = cls.load(name)
 
         # ------------------------------------------------------
         # 2. Random ROTATION (0, 90, 180, 270 degrees)
         # ------------------------------------------------------
-        rotate_choice = random.randint(0, 3)   # avoids identity 4
+        rotate_choice = rng.randint(0, 3)   # avoids identity 4
         angle = rotate_choice * 90
         if angle != 0:
             pil = pil.rotate(angle, expand=True)
@@ -46,21 +86,14 @@ class BackgroundFactory:
         # ------------------------------------------------------
         # 3. Random FLIPS
         # ------------------------------------------------------
-        if random.random() < 0.5:
+        if rng.random() < 0.5:
             pil = pil.transpose(Image.FLIP_LEFT_RIGHT)
 
-        if random.random() < 0.5:
+        if rng.random() < 0.5:
             pil = pil.transpose(Image.FLIP_TOP_BOTTOM)
 
         # ------------------------------------------------------
         # 4. Random RESIZE (square, 500–900 px)
         # ------------------------------------------------------
-        new_size = random.randint(500, 900)
-        pil = pil.resize((new_size, new_size), Image.BILINEAR)
-
-        # ------------------------------------------------------
-        # 5. Convert to Bitmap and return
-        # ------------------------------------------------------
-        bmp = Bitmap()
-        bmp.import_pillow(pil)
-        return bmp
+        new_size = rng.randint(500, 900)
+        return pil.resize((new_size, new_size), Image.BILINEAR)
@@ -0,0 +1,8 @@
+# benchmarks/__init__.py
+"""
+Repeatable microbenchmarks and end-to-end throughput runs.
+
+    python -m benchmarks run --output benchmarks/results/baseline.json
+    python -m benchmarks run --filter bitmap. --output current.json
+    python -m benchmarks compare benchmarks/results/baseline.json current.json
+"""
@@ -0,0 +1,94 @@
+# __main__.py
+"""
+    python -m benchmarks run [--filter TEXT ...] [--quick] [--output FILE]
+    python -m benchmarks compare BASELINE CURRENT [--threshold 0.10]
+    python -m benchmarks check [--scene TEXT ...] [--backend NAME ...] [--output DIR]
+
+compare exits with status 1 when any case's median is slower than the
+baseline by more than the threshold, and check when a fast backend's
+output differs from the reference code, so both can gate CI.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List
+
+from benchmarks.cases import all_cases
+from benchmarks.harness import BenchmarkHarness, compare, load_results, save_results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run or compare benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmark cases")
+    run.add_argument("--filter", action="append", default=[], help="only cases whose name contains TEXT")
+    run.add_argument("--quick", action="store_true", help="fewer repeats, skip end-to-end sample cases")
+    run.add_argument("--repeats", type=int, default=None, help="timed repeats per case (default 5, quick 3)")
+    run.add_argument("--output", type=Path, help="write results as JSON")
+    run.add_argument("--list", action="store_true", help="print the selected case names and exit")
+
+    diff = commands.add_parser("compare", help="compare two result files")
+    diff.add_argument("baseline", type=Path)
+    diff.add_argument("current", type=Path)
+    diff.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (default 0.10 = 10%%)")
+
+    check = commands.add_parser("check", help="compare fast backends against the reference renders")
+    check.add_argument("--scene", action="append", default=[], help="only scenes whose name contains TEXT")
+    check.add_argument("--backend", action="append", default=[], help="only this fast backend")
+    check.add_argument("--output", type=Path, help="save both renders of every differing image here")
+    return parser
+
+
+def run_check(args: argparse.Namespace) -> int:
+    from benchmarks import equivalence
+
+    if not equivalence.BACKENDS:
+        print("no fast backend registered; nothing to compare")
+        return 0
+    results = equivalence.check(args.scene, args.backend, args.output)
+    for result in results:
+        print(f"{result.scene:<14} {result.backend:<12} {'ok' if result.passed else 'DIFFERS'}")
+        for difference in result.differences:
+            print(f"    {difference.output}: {difference.message}")
+    failed = sum(not result.passed for result in results)
+    if failed:
+        print(f"{failed} of {len(results)} comparison(s) differ")
+        return 1
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "check":
+        return run_check(args)
+
+    if args.command == "compare":
+        regressions = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        return 0
+
+    cases = [
+        case for case in all_cases()
+        if (not args.filter or any(text in case.name for text in args.filter))
+        and not (args.quick and case.slow)
+    ]
+    if args.list:
+        print("\n".join(case.name for case in cases))
+        return 0
+
+    repeats = args.repeats if args.repeats is not None else (3 if args.quick else 5)
+    harness = BenchmarkHarness(repeats=repeats, min_time=0.05 if args.quick else 0.2)
+    results = harness.run(cases)
+    if args.output is not None:
+        print(f"wrote {save_results(results, args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
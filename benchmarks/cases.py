@@ -0,0 +1,244 @@
+# cases.py
+"""
+The benchmark cases. Every input is built from fixed seeds or files in the
+repository, so two runs of the same case measure the same work.
+
+Names are "<area>.<operation>[<size>]"; --filter matches substrings.
+"""
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List
+
+from benchmarks.harness import BenchmarkCase
+from circle_factory import CircleFactory
+from circle_label_placement import CircleLabelPlacement
+from image.array_bitmap import ArrayBitmap
+from image.bitmap import Bitmap
+from image.rgba import RGBA
+from image_utility import ImageUtility
+from labels.annotation_format import AnnotationFormat
+from labels.data_label import DataLabel
+from labels.image_annotation_document import ImageAnnotationDocument
+from labels.pixel_bag import PixelBag
+from runner import Runner
+from runner_cli import DEFAULTS
+from runner_params import RunnerParams
+from tinted_glyph_cache import TintedGlyphCache
+
+BITMAP_SIZES = (64, 256, 512)
+GLYPH_SIZES = (36, 64, 94)
+
+# (target_max, output size) grid for the end-to-end throughput cases,
+# run with each RunnerParams.kernels value
+SAMPLE_GRID = ((5, 256), (10, 256), (10, 512))
+SAMPLE_KERNELS = ("reference", "array")
+SAMPLES_PER_CALL = 4
+
+SEED = 1234
+
+
+# ----------------------------------------------------------------------
+# Inputs
+# ----------------------------------------------------------------------
+
+def _noise_bitmap(size: int) -> Bitmap:
+    rng = random.Random(SEED)
+    bitmap = Bitmap(size, size)
+    for column in bitmap.rgba:
+        for y in range(size):
+            column[y] = RGBA(rng.randrange(256), rng.randrange(256), rng.randrange(256), 255)
+    return bitmap
+
+
+def _glyph(size: int) -> Bitmap:
+    glyph = Bitmap()
+    glyph.import_pillow(CircleFactory.load(f"circle_white_{size}"))
+    return glyph
+
+
+def _array_glyph(size: int) -> ArrayBitmap:
+    return ArrayBitmap.with_pillow(CircleFactory.load(f"circle_white_{size}"))
+
+
+def _noise_array_bitmap(size: int) -> ArrayBitmap:
+    return ArrayBitmap.from_bitmap(_noise_bitmap(size))
+
+
+def _restore(working: Bitmap | ArrayBitmap, original: Bitmap | ArrayBitmap) -> Bitmap | ArrayBitmap:
+    """
+    Reset `working` to the pixels of `original`, cheaply enough not to
+    dominate the timing (the kernels replace Bitmap's RGBA objects rather
+    than mutate them, so copying the column lists is enough).
+    """
+    if isinstance(working, ArrayBitmap):
+        working.pixels[...] = original.pixels
+    else:
+        working.rgba = [list(column) for column in original.rgba]
+    return working
+
+
+def _disc_bag(radius: int) -> PixelBag:
+    bag = PixelBag()
+    for y in range(-radius, radius + 1):
+        for x in range(-radius, radius + 1):
+            if x * x + y * y <= radius * radius:
+                bag.add(radius + x, radius + y)
+    return bag
+
+
+def _params(**overrides: Any) -> RunnerParams:
+    values: Dict[str, Any] = dict(DEFAULTS)
+    values.update(seed=SEED, **overrides)
+    return RunnerParams.from_json(values)
+
+
+def _document() -> ImageAnnotationDocument:
+    params = _params(target_min=10, target_max=10)
+    _image, document = Runner.generate_sample(params, "bench", 0, 3, "document", Runner.sample_seed(SEED, 0))
+    return document
+
+
+def _render_samples(params: RunnerParams) -> None:
+    for index in range(SAMPLES_PER_CALL):
+        plan = Runner.plan_sample(params, "bench", index, seed=Runner.sample_seed(SEED, index))
+        rendered = Runner.render_sample(params, plan, 3)
+        labeled = Runner.label_sample(params, rendered)
+        Runner.encode_sample(params, labeled)
+
+
+# ----------------------------------------------------------------------
+# Cases
+# ----------------------------------------------------------------------
+
+def bitmap_cases() -> List[BenchmarkCase]:
+    cases: List[BenchmarkCase] = []
+    for size in BITMAP_SIZES:
+        pixels = size * size
+        cases += [
+            BenchmarkCase(f"bitmap.allocate[{size}]", lambda: None,
+                          lambda _, s=size: Bitmap(s, s), pixels, "px"),
+            BenchmarkCase(f"bitmap.copy[{size}]", lambda s=size: _noise_bitmap(s),
+                          lambda bitmap: bitmap.copy(), pixels, "px"),
+            BenchmarkCase(f"bitmap.crop[{size}]", lambda s=size: _noise_bitmap(s),
+                          lambda bitmap: bitmap.crop(bitmap.width // 4, bitmap.height // 4,
+                                                     bitmap.width // 2, bitmap.height // 2),
+                          pixels // 4, "px"),
+            BenchmarkCase(f"bitmap.export_pillow[{size}]", lambda s=size: _noise_bitmap(s),
+                          lambda bitmap: bitmap.export_pillow(), pixels, "px"),
+        ]
+    for size in GLYPH_SIZES:
+        cases.append(BenchmarkCase(
+            f"bitmap.stamp_alpha[{size}]",
+            lambda s=size: (_noise_bitmap(256), _glyph(s)),
+            lambda state: state[0].stamp_alpha(state[1], 100, 100),
+            size * size, "px",
+        ))
+    return cases
+
+
+def kernel_cases() -> List[BenchmarkCase]:
+    """
+    ImageUtility glyph kernels on the per-pixel Bitmap and on ArrayBitmap.
+    """
+    cases: List[BenchmarkCase] = []
+    color = RGBA(200, 40, 160)
+    for size in GLYPH_SIZES:
+        for backend, load in (("bitmap", _glyph), ("array", _array_glyph)):
+            cases.append(BenchmarkCase(
+                f"kernel.recolor_white[{size},{backend}]",
+                lambda s=size, load=load: (load(s), random.Random(SEED)),
+                lambda state: ImageUtility.recolor_white(state[0], color, 0.25, rng=state[1]),
+                size * size, "px",
+            ))
+            cases.append(BenchmarkCase(
+                f"kernel.multiply_alpha[{size},{backend}]",
+                lambda s=size, load=load: (load(s), load(s), random.Random(SEED)),
+                lambda state: ImageUtility.multiply_alpha(_restore(state[1], state[0]), 0.75, 0.10, rng=state[2]),
+                size * size, "px",
+            ))
+    return cases
+
+
+def place_glyph_cases() -> List[BenchmarkCase]:
+    """
+    One accepted circle end to end (recolor, alpha, stamp, label) through
+    Runner.place_glyph: four per-pixel passes plus make_label on Bitmap,
+    a single GlyphCompositor.place on ArrayBitmap. "array+tint" starts
+    from the cached TintedGlyph, as Runner does: with the default color
+    noise that saves the alpha scale and visible mask, not the recolor.
+    "array+bank" also takes its noise from the NoiseBank instead of
+    fresh draws.
+    """
+    color = RGBA(200, 40, 160)
+
+    def tinted(size: int) -> Any:
+        return TintedGlyphCache.get(f"circle_white_{size}", color)
+
+    def place(state: tuple) -> None:
+        params, canvas, original, glyph, rng = state
+        _restore(canvas, original)
+        if isinstance(glyph, Bitmap):
+            glyph = glyph.copy()  # the per-pixel kernels recolor it in place
+        placement = CircleLabelPlacement(DataLabel(name="bench"), 100, 100, glyph.width / 2.0)
+        item = Runner.place_glyph(params, canvas, glyph, color, placement, 80, 80, rng)
+        Runner.label_glyph(params, item)
+
+    cases: List[BenchmarkCase] = []
+    for size in GLYPH_SIZES:
+        for backend, canvas, load, noise_source in (
+            ("bitmap", _noise_bitmap, _glyph, "fresh"),
+            ("array", _noise_array_bitmap, _array_glyph, "fresh"),
+            ("array+tint", _noise_array_bitmap, tinted, "fresh"),
+            ("array+bank", _noise_array_bitmap, tinted, "bank"),
+        ):
+            cases.append(BenchmarkCase(
+                f"kernel.place_glyph[{size},{backend}]",
+                lambda s=size, canvas=canvas, load=load, n=noise_source: (
+                    _params(noise_source=n), canvas(256), canvas(256), load(s), random.Random(SEED)
+                ),
+                place,
+                size * size, "px",
+            ))
+    return cases
+
+
+def label_cases() -> List[BenchmarkCase]:
+    cases: List[BenchmarkCase] = []
+    for radius in (18, 47):
+        cases += [
+            BenchmarkCase(f"pixel_bag.to_run_length[r{radius}]", lambda r=radius: _disc_bag(r),
+                          lambda bag: bag.to_run_length(), 1, "bag"),
+            BenchmarkCase(f"pixel_bag.from_json[r{radius}]", lambda r=radius: _disc_bag(r).to_json(),
+                          PixelBag.from_json, 1, "bag"),
+        ]
+    for format in AnnotationFormat:
+        cases.append(BenchmarkCase(
+            f"document.round_trip[{format.value}]",
+            _document,
+            lambda document, f=format: ImageAnnotationDocument.loads(document.dumps(f)),
+            1, "doc",
+        ))
+    return cases
+
+
+def sample_cases() -> List[BenchmarkCase]:
+    def setup(target_max: int, size: int, kernels: str) -> RunnerParams:
+        CircleFactory.preload()
+        return _params(target_max=target_max, output_width=size, output_height=size, kernels=kernels)
+
+    return [
+        BenchmarkCase(
+            f"runner.samples[t{target_max},{size},{kernels}]",
+            lambda t=target_max, s=size, k=kernels: setup(t, s, k),
+            _render_samples,
+            SAMPLES_PER_CALL, "sample",
+            slow=True,
+        )
+        for target_max, size in SAMPLE_GRID
+        for kernels in SAMPLE_KERNELS
+    ]
+
+
+def all_cases() -> List[BenchmarkCase]:
+    return bitmap_cases() + kernel_cases() + place_glyph_cases() + label_cases() + sample_cases()
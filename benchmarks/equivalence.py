@@ -0,0 +1,396 @@
+# equivalence.py
+"""
+Golden-image equivalence: render the same scenes with the per-pixel
+reference code and with every registered fast backend, and compare.
+
+A backend decides how images are held (Bitmap for the reference,
+something array-backed for a fast path) and which RunnerParams overrides
+select it in Runner. Scenes only use the shared image API (stamp*,
+copy, ImageUtility, Runner.make_label), so each one renders unchanged on
+every backend.
+
+Inputs are the shipped stamps in images/test_stamps (alpha_25..alpha_100
+glyphs over a crop of stamp_blends_grid.png) and seeded Runner samples.
+
+    python -m benchmarks check                      # all scenes, all backends
+    python -m benchmarks check --scene stamp --output diffs/
+"""
+from __future__ import annotations
+
+import io
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from circle_label_placement import CircleLabelPlacement
+from filesystem.file_io import FileIO, PathLike
+from filesystem.file_utils import FileUtils
+from image.array_bitmap import ArrayBitmap
+from image.bitmap import Bitmap
+from image.noise_bank import NoiseBank
+from image.rgba import RGBA
+from image_utility import ImageUtility
+from labels.data_label import DataLabel
+from runner import Runner
+from runner_cli import DEFAULTS
+from runner_params import RunnerParams
+
+STAMP_NAMES = ("alpha_25", "alpha_50", "alpha_75", "alpha_100")
+STAMP_MODES = ("stamp", "stamp_alpha", "stamp_additive")
+SEED = 1234
+
+# Scene outputs: named images ((H, W, 4) uint8) or texts (annotation JSON)
+SceneOutput = Dict[str, Any]
+
+
+# ----------------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ImageBackend:
+    """
+    load(pil) -> image object the scenes draw on
+    to_array(image) -> (H, W, 4) uint8 RGBA
+    runner_overrides: RunnerParams fields that make Runner use this backend
+    scenes: the scenes it can render so far (empty = all)
+    """
+
+    name: str
+    load: Callable[[Image.Image], Any]
+    to_array: Callable[[Any], np.ndarray]
+    runner_overrides: Dict[str, Any] = field(default_factory=dict)
+    scenes: Tuple[str, ...] = ()
+
+    def renders(self, scene: str) -> bool:
+        return not self.scenes or scene in self.scenes
+
+
+def _bitmap_from_pillow(image: Image.Image) -> Bitmap:
+    bitmap = Bitmap()
+    bitmap.import_pillow(image)
+    return bitmap
+
+
+def _bitmap_to_array(bitmap: Bitmap) -> np.ndarray:
+    return np.asarray(bitmap.export_pillow().convert("RGBA"))
+
+
+REFERENCE = ImageBackend("reference", _bitmap_from_pillow, _bitmap_to_array)
+
+# Fast backends compared against REFERENCE, by name
+BACKENDS: Dict[str, ImageBackend] = {}
+
+
+def register_backend(backend: ImageBackend) -> None:
+    if backend.name == REFERENCE.name:
+        raise ValueError(f"'{REFERENCE.name}' is the backend everything is compared against")
+    BACKENDS[backend.name] = backend
+
+
+# NumPy kernels (ImageUtility, Runner and stamping dispatch on ArrayBitmap)
+register_backend(ImageBackend(
+    "array",
+    ArrayBitmap.with_pillow,
+    lambda bitmap: bitmap.pixels,
+    runner_overrides={"kernels": "array"},
+))
+
+
+# ----------------------------------------------------------------------
+# Tolerances and comparison
+# ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Tolerance:
+    """
+    max_abs_diff:      largest allowed per-channel difference (0 = exact)
+    max_mismatch:      fraction of pixels allowed to exceed max_abs_diff
+    Texts are always compared exactly.
+    """
+
+    max_abs_diff: int = 0
+    max_mismatch: float = 0.0
+
+
+EXACT = Tolerance()
+
+
+@dataclass
+class Difference:
+    output: str
+    message: str
+
+
+def compare_outputs(reference: SceneOutput, fast: SceneOutput, tolerance: Tolerance) -> List[Difference]:
+    differences: List[Difference] = []
+    for key in sorted(reference.keys() | fast.keys()):
+        if key not in reference or key not in fast:
+            differences.append(Difference(key, "only produced by one backend"))
+            continue
+        expected, actual = reference[key], fast[key]
+        if isinstance(expected, str):
+            message = _compare_texts(expected, actual)
+        else:
+            message = _compare_images(expected, actual, tolerance)
+        if message is not None:
+            differences.append(Difference(key, message))
+    return differences
+
+
+def _compare_images(expected: np.ndarray, actual: np.ndarray, tolerance: Tolerance) -> str | None:
+    if expected.shape != actual.shape:
+        return f"shape {actual.shape} != {expected.shape}"
+    delta = np.abs(expected.astype(np.int16) - actual.astype(np.int16))
+    bad = delta.max(axis=-1) > tolerance.max_abs_diff
+    fraction = float(bad.mean()) if bad.size else 0.0
+    if fraction <= tolerance.max_mismatch:
+        return None
+    y, x = np.argwhere(bad)[0]
+    return (
+        f"{int(bad.sum())} px ({fraction:.3%}) differ by more than {tolerance.max_abs_diff}, "
+        f"max {int(delta.max())}; first at x={x} y={y}: "
+        f"{tuple(int(v) for v in actual[y, x])} != {tuple(int(v) for v in expected[y, x])}"
+    )
+
+
+def _compare_texts(expected: str, actual: str) -> str | None:
+    if expected == actual:
+        return None
+    for number, (left, right) in enumerate(zip(expected.splitlines(), actual.splitlines()), start=1):
+        if left != right:
+            return f"line {number}: {right[:80]!r} != {left[:80]!r}"
+    return f"length {len(actual)} != {len(expected)}"
+
+
+# ----------------------------------------------------------------------
+# Scenes
+# ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Scene:
+    name: str
+    render: Callable[[ImageBackend], SceneOutput]
+    tolerance: Tolerance = EXACT
+
+
+def _stamp(name: str) -> Image.Image:
+    return FileUtils.load_local_image(subdirectory="images/test_stamps", name=f"/{name}.png").convert("RGBA")
+
+
+def _canvas(backend: ImageBackend) -> Any:
+    grid = _stamp("stamp_blends_grid")
+    return backend.load(grid.crop((100, 100, 100 + 480, 100 + 400)))
+
+
+def _processed_glyphs(backend: ImageBackend, alpha_noise: float) -> List[Any]:
+    """
+    Each stamp recolored and alpha-multiplied with its own seeded rng.
+    """
+    glyphs = []
+    for number, name in enumerate(STAMP_NAMES):
+        glyph = backend.load(_stamp(name))
+        rng = random.Random(SEED + number)
+        ImageUtility.recolor_white(glyph, RGBA(40, 200, 90), color_noise=0.25, rng=rng)
+        ImageUtility.multiply_alpha(glyph, rng.uniform(0.65, 0.85), alpha_noise, rng=rng)
+        glyphs.append(glyph)
+    return glyphs
+
+
+def render_stamp_modes(backend: ImageBackend) -> SceneOutput:
+    """
+    Every blend mode x every stamp, plus glyphs clipped by each canvas edge.
+    """
+    canvas = _canvas(backend)
+    glyphs = [backend.load(_stamp(name)) for name in STAMP_NAMES]
+    for row, mode in enumerate(STAMP_MODES):
+        for column, glyph in enumerate(glyphs):
+            getattr(canvas, mode)(glyph, 20 + 110 * column, 10 + 120 * row)
+    edges = ((-40, 150), (440, 60), (200, -50), (300, 350), (-200, -200))
+    for number, (x, y) in enumerate(edges):
+        getattr(canvas, STAMP_MODES[number % len(STAMP_MODES)])(glyphs[number % len(glyphs)], x, y)
+    return {"image": backend.to_array(canvas)}
+
+
+def render_recolor_white(backend: ImageBackend) -> SceneOutput:
+    """
+    recolor_white alone on every stamp, over all pixels and visible only.
+    """
+    outputs: SceneOutput = {}
+    for skip_transparent in (False, True):
+        for number, name in enumerate(STAMP_NAMES):
+            glyph = backend.load(_stamp(name))
+            rng = random.Random(SEED + number)
+            ImageUtility.recolor_white(glyph, RGBA(200, 40, 160), 0.25, rng=rng, skip_transparent=skip_transparent)
+            outputs[f"{name}@{'visible' if skip_transparent else 'all'}"] = backend.to_array(glyph)
+            outputs[f"{name}@{'visible' if skip_transparent else 'all'}.rng"] = repr(rng.random())
+    return outputs
+
+
+def render_recolor(backend: ImageBackend) -> SceneOutput:
+    outputs: SceneOutput = {}
+    for alpha_noise in (0.0, 0.10):
+        for name, glyph in zip(STAMP_NAMES, _processed_glyphs(backend, alpha_noise)):
+            outputs[f"{name}@{alpha_noise}"] = backend.to_array(glyph)
+    return outputs
+
+
+def render_composite(backend: ImageBackend) -> SceneOutput:
+    """
+    Runner's per-glyph sequence: recolor, multiply alpha, stamp_alpha, label.
+    """
+    params = _params({"output_width": 480, "output_height": 400})
+    canvas = _canvas(backend)
+    labels = []
+    positions = ((30, 40), (150, 60), (260, 200), (420, 330), (-30, 300))
+    for (x, y), glyph in zip(positions, _processed_glyphs(backend, 0.10) * 2):
+        canvas.stamp_alpha(glyph, x, y)
+        label = Runner.make_label(params, "green", glyph, x, y, 0.2)
+        labels.append(label.to_json())
+    return {"image": backend.to_array(canvas), "labels": repr(labels)}
+
+
+def render_place_glyph(backend: ImageBackend) -> SceneOutput:
+    """
+    Runner.place_glyph + label_glyph: the per-pixel sequence on the
+    reference, GlyphCompositor.place on array backends. Positions cover
+    every canvas edge and a glyph entirely off the canvas; color_noise 0
+    takes the compositor's noise-free tint path.
+    """
+    outputs: SceneOutput = {}
+    positions = ((30, 40), (150, 60), (-30, 200), (440, 330), (200, -40), (300, 370), (-300, 10))
+    for color_noise in (0.25, 0.0):
+        params = _params({"output_width": 480, "output_height": 400, "color_noise": color_noise})
+        canvas = _canvas(backend)
+        labels = []
+        for number, (x, y) in enumerate(positions):
+            glyph = backend.load(_stamp(STAMP_NAMES[number % len(STAMP_NAMES)]))
+            placement = CircleLabelPlacement(DataLabel(name="green"), x, y, glyph.width / 2.0)
+            rng = random.Random(SEED + number)
+            item = Runner.place_glyph(params, canvas, glyph, RGBA(40, 200, 90), placement, x, y, rng)
+            labels.append(Runner.label_glyph(params, item).to_json())
+            labels.append(repr(rng.random()))
+        outputs[f"image@{color_noise}"] = backend.to_array(canvas)
+        outputs[f"labels@{color_noise}"] = repr(labels)
+    return outputs
+
+
+def render_noise_bank(backend: ImageBackend) -> SceneOutput:
+    """
+    Bank noise instead of fresh draws: the kernels with a bank smaller
+    than the stamps (windows wrap), then seeded Runner samples with
+    noise_source "bank".
+    """
+    bank = NoiseBank(count=2, size=64)
+    outputs: SceneOutput = {}
+    for number, name in enumerate(STAMP_NAMES):
+        glyph = backend.load(_stamp(name))
+        rng = random.Random(SEED + number)
+        ImageUtility.recolor_white(glyph, RGBA(40, 200, 90), 0.25, rng=rng, skip_transparent=number % 2 == 1, noise_bank=bank)
+        ImageUtility.multiply_alpha(glyph, rng.uniform(0.65, 0.85), 0.10, rng=rng, noise_bank=bank)
+        outputs[name] = backend.to_array(glyph)
+        outputs[f"{name}.rng"] = repr(rng.random())
+    outputs.update(_runner_outputs(_params({**backend.runner_overrides, "noise_source": "bank"})))
+    return outputs
+
+
+def _params(overrides: Dict[str, Any]) -> RunnerParams:
+    values = dict(DEFAULTS)
+    values.update(seed=SEED, target_min=5, target_max=10)
+    values.update(overrides)
+    return RunnerParams.from_json(values)
+
+
+def render_runner(backend: ImageBackend) -> SceneOutput:
+    """
+    Seeded Runner samples, as written to disk: PNG pixels and annotation JSON.
+    """
+    return _runner_outputs(_params(backend.runner_overrides))
+
+
+def _runner_outputs(params: RunnerParams) -> SceneOutput:
+    outputs: SceneOutput = {}
+    for index in range(3):
+        encoded = Runner.encode_index(params, "golden", index, 3, Runner.sample_seed(SEED, index))
+        image = Image.open(io.BytesIO(encoded.png_bytes)).convert("RGBA")
+        outputs[f"{index}.png"] = np.asarray(image)
+        outputs[f"{index}.json"] = encoded.annotation_text
+    return outputs
+
+
+SCENES: Tuple[Scene, ...] = (
+    Scene("stamp_modes", render_stamp_modes),
+    Scene("recolor_white", render_recolor_white),
+    Scene("recolor", render_recolor),
+    Scene("composite", render_composite),
+    Scene("place_glyph", render_place_glyph),
+    Scene("runner", render_runner),
+    Scene("noise_bank", render_noise_bank),
+)
+
+
+# ----------------------------------------------------------------------
+# Harness
+# ----------------------------------------------------------------------
+
+@dataclass
+class SceneResult:
+    scene: str
+    backend: str
+    differences: List[Difference]
+
+    @property
+    def passed(self) -> bool:
+        return not self.differences
+
+
+def check(
+    scene_filter: List[str] | None = None,
+    backend_filter: List[str] | None = None,
+    output_directory: PathLike | None = None,
+) -> List[SceneResult]:
+    """
+    Render the selected scenes on the reference and each fast backend and
+    compare. With output_directory, both renders of every differing image
+    are saved there as PNGs.
+    """
+    scenes = [s for s in SCENES if not scene_filter or any(text in s.name for text in scene_filter)]
+    backends = [b for b in BACKENDS.values() if not backend_filter or b.name in backend_filter]
+
+    results: List[SceneResult] = []
+    for scene in scenes:
+        if not any(backend.renders(scene.name) for backend in backends):
+            continue
+        reference = scene.render(REFERENCE)
+        for backend in backends:
+            if not backend.renders(scene.name):
+                continue
+            fast = scene.render(backend)
+            differences = compare_outputs(reference, fast, scene.tolerance)
+            results.append(SceneResult(scene.name, backend.name, differences))
+            if differences and output_directory is not None:
+                _save_differences(Path(output_directory), scene, backend, reference, fast, differences)
+    return results
+
+
+def _save_differences(
+    directory: Path,
+    scene: Scene,
+    backend: ImageBackend,
+    reference: SceneOutput,
+    fast: SceneOutput,
+    differences: List[Difference],
+) -> None:
+    for difference in differences:
+        for label, outputs in ((REFERENCE.name, reference), (backend.name, fast)):
+            value = outputs.get(difference.output)
+            if not isinstance(value, np.ndarray):
+                continue
+            buffer = io.BytesIO()
+            Image.fromarray(value, "RGBA").save(buffer, format="PNG")
+            stem = difference.output.replace("@", "_").replace(".png", "")
+            FileIO.save(buffer.getvalue(), directory / f"{scene.name}_{stem}_{label}.png")
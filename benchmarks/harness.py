@@ -0,0 +1,206 @@
+# harness.py
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+from filesystem.file_io import FileIO, PathLike
+
+
+@dataclass
+class BenchmarkCase:
+    """
+    One named measurement. setup() builds the state once (untimed);
+    run(state) is the timed call. `items` is how many units (pixels,
+    samples, ...) one call processes, for the throughput column.
+    """
+
+    name: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+    items: int = 1
+    unit: str = "call"
+    slow: bool = False  # end-to-end cases skipped by --quick
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    number: int
+    repeats: int
+    seconds: List[float] = field(default_factory=list)  # per call, one per repeat
+    items: int = 1
+    unit: str = "call"
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.seconds)
+
+    @property
+    def best(self) -> float:
+        return min(self.seconds)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "median_seconds": self.median,
+            "min_seconds": self.best,
+            "stdev_seconds": statistics.stdev(self.seconds) if len(self.seconds) > 1 else 0.0,
+            "number": self.number,
+            "repeats": self.repeats,
+            "items": self.items,
+            "unit": self.unit,
+            "items_per_second": self.items / self.median if self.median > 0 else 0.0,
+        }
+
+
+class BenchmarkHarness:
+    """
+    timeit-style runner: each case is calibrated so one repeat takes at
+    least `min_time` seconds, then timed `repeats` times; the per-call
+    median is what compare() looks at.
+    """
+
+    def __init__(self, repeats: int = 5, min_time: float = 0.2) -> None:
+        self.repeats = repeats
+        self.min_time = min_time
+
+    def measure(self, case: BenchmarkCase) -> BenchmarkResult:
+        state = case.setup()
+        case.run(state)  # warm-up (imports, caches)
+
+        number = 1
+        while True:
+            elapsed = self._time(case, state, number)
+            if elapsed >= self.min_time or number >= 1_000_000:
+                break
+            number *= 10 if elapsed < self.min_time / 10 else 2
+
+        result = BenchmarkResult(case.name, number, self.repeats, items=case.items, unit=case.unit)
+        for _ in range(self.repeats):
+            result.seconds.append(self._time(case, state, number) / number)
+        return result
+
+    @staticmethod
+    def _time(case: BenchmarkCase, state: Any, number: int) -> float:
+        run = case.run
+        start = time.perf_counter()
+        for _ in range(number):
+            run(state)
+        return time.perf_counter() - start
+
+    def run(self, cases: Sequence[BenchmarkCase], verbose: bool = True) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        for case in cases:
+            result = self.measure(case)
+            results[case.name] = result.to_json()
+            if verbose:
+                print(self.format_result(result))
+        return {
+            "version": 1,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "machine": machine_info(),
+            "settings": {"repeats": self.repeats, "min_time": self.min_time},
+            "results": results,
+        }
+
+    @staticmethod
+    def format_result(result: BenchmarkResult) -> str:
+        rate = result.items / result.median if result.median > 0 else 0.0
+        return (
+            f"{result.name:<44} {_format_seconds(result.median):>10} "
+            f"(min {_format_seconds(result.best)}, n={result.number}x{result.repeats})  "
+            f"{rate:,.1f} {result.unit}/s"
+        )
+
+
+def machine_info() -> Dict[str, Any]:
+    import numpy
+    import PIL
+
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "numpy": numpy.__version__,
+        "pillow": PIL.__version__,
+        "git_commit": _git_commit(),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=FileIO.local_directory(),
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1.0:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.2f} us"
+
+
+# ----------------------------------------------------------------------
+# Result files
+# ----------------------------------------------------------------------
+
+def save_results(results: Dict[str, Any], file_path: PathLike) -> Path:
+    return FileIO.save(json.dumps(results, indent=2).encode("utf-8"), file_path)
+
+
+def load_results(file_path: PathLike) -> Dict[str, Any]:
+    return json.loads(FileIO.load(file_path).decode("utf-8"))
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[str]:
+    """
+    Print a baseline vs current table and return the names of cases whose
+    median got slower by more than `threshold` (0.10 = 10 %).
+    """
+    if baseline.get("machine", {}).get("platform") != current.get("machine", {}).get("platform"):
+        print("warning: results come from different machines; ratios may not mean much")
+
+    regressions: List[str] = []
+    base_results = baseline.get("results", {})
+    current_results = current.get("results", {})
+
+    print(f"{'case':<44} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name in sorted(base_results.keys() | current_results.keys()):
+        base = base_results.get(name)
+        now = current_results.get(name)
+        if base is None or now is None:
+            print(f"{name:<44} {'-' if base is None else _format_seconds(base['median_seconds']):>10} "
+                  f"{'-' if now is None else _format_seconds(now['median_seconds']):>10}   (only in one file)")
+            continue
+
+        ratio = now["median_seconds"] / base["median_seconds"] if base["median_seconds"] > 0 else float("inf")
+        flag = ""
+        if ratio > 1.0 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1.0 - threshold:
+            flag = "  faster"
+        print(f"{name:<44} {_format_seconds(base['median_seconds']):>10} "
+              f"{_format_seconds(now['median_seconds']):>10} {ratio:>6.2f}x{flag}")
+    return regressions
@@ -1,6 +1,10 @@
 # circle_factory.py
 from __future__ import annotations
 import random
+from typing import Dict
+from PIL import Image
+from filesystem.file_utils import FileUtils
+from image.array_bitmap import ArrayBitmap
 from image.bitmap import Bitmap
 
 
@@ -86,15 +90,79 @@ class CircleFactory:
     _SUBDIR = "/images/circles/"
     _EXT = ".png"
 
+    # Decoded sprites by name; each call still returns a fresh Bitmap,
+    # since callers recolor the glyph in place.
+    _CACHE: Dict[str, Image.Image] = {}
+
+    # Read-only ArrayBitmap sprites by name, shared by every caller
+    _TEMPLATES: Dict[str, ArrayBitmap] = {}
+
+    @classmethod
+    def load(cls, name: str) -> Image.Image:
+        """
+        The decoded sprite `name`, read from disk on first use only.
+        """
+        pil = cls._CACHE.get(name)
+        if pil is None:
+            pil = FileUtils.load_local_image(
+                subdirectory=cls._SUBDIR,
+                name="/" + name + cls._EXT,
+            )
+            cls._CACHE[name] = pil
+        return pil
+
+    @classmethod
+    def preload(cls) -> None:
+        """
+        Decode every sprite now so later samples never touch the disk.
+        """
+        for name in cls._NAMES:
+            cls.load(name)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._CACHE.clear()
+        cls._TEMPLATES.clear()
+
     @classmethod
-    def random(cls) -> Bitmap:
+    def random(cls, rng: random.Random | None = None) -> Bitmap:
         """
         Return a randomly selected circle sprite as a Bitmap.
+        The sprite is chosen with `rng` (default: the global random module).
         """
-        name = random.choice(cls._NAMES)
-        full_name = name + cls._EXT
+        if rng is None:
+            rng = random
+        name = rng.choice(cls._NAMES)
 
-        return Bitmap.with_local_image(
-            subdirectory=cls._SUBDIR,
-            name="/" + full_name   # match your example usage
-        )
+        bmp = Bitmap()
+        bmp.import_pillow(cls.load(name))
+        return bmp
+
+    @classmethod
+    def template(cls, name: str) -> ArrayBitmap:
+        """
+        Sprite `name` as a shared ArrayBitmap. Its pixels are read-only:
+        draw it with GlyphCompositor.place, or copy() it first.
+        """
+        template = cls._TEMPLATES.get(name)
+        if template is None:
+            template = ArrayBitmap.with_pillow(cls.load(name))
+            template.pixels.flags.writeable = False
+            cls._TEMPLATES[name] = template
+        return template
+
+    @classmethod
+    def random_template(cls, rng: random.Random | None = None) -> ArrayBitmap:
+        """
+        random() as a shared template (same draw from `rng`).
+        """
+        return cls.template(cls.random_name(rng=rng))
+
+    @classmethod
+    def random_name(cls, rng: random.Random | None = None) -> str:
+        """
+        The sprite name random() would pick (same draw from `rng`).
+        """
+        if rng is None:
+            rng = random
+        return rng.choice(cls._NAMES)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import random
 from enum import Enum, auto
+from typing import List
 from image.rgba import RGBA
 
 INSET = 32            # avoid pure 0 or 255
@@ -16,13 +17,12 @@ class ColorName(Enum):
     MAGENTA = auto()
 
     # --------------------------------------------------
-    # Class method: random color from first num_colors
+    # Class method: the first num_colors colors, in order
     # --------------------------------------------------
     @classmethod
-    def random(cls, num_colors: int) -> "ColorName":
+    def pool(cls, num_colors: int) -> List["ColorName"]:
         """
-        Choose a random color from the first `num_colors` colors in the
-        predefined order:
+        The first `num_colors` colors in the predefined order:
 
             RED, GREEN, BLUE, YELLOW, CYAN, MAGENTA
 
@@ -43,8 +43,29 @@ class ColorName(Enum):
         if num_colors > len(ordered):
             num_colors = len(ordered)
 
-        pool = ordered[:num_colors]
-        return random.choice(pool)
+        return ordered[:num_colors]
+
+    # --------------------------------------------------
+    # Class method: random color from first num_colors
+    # --------------------------------------------------
+    @classmethod
+    def random(cls, num_colors: int, rng: random.Random | None = None) -> "ColorName":
+        """
+        Choose a random color from ColorName.pool(num_colors).
+
+        The choice is drawn from `rng` (default: the global random module).
+        """
+        if rng is None:
+            rng = random
+
+        return rng.choice(cls.pool(num_colors))
+
+    @classmethod
+    def labels(cls, num_colors: int) -> List[str]:
+        """
+        Label names of ColorName.pool(num_colors), e.g. ["Red", "Green", "Blue"].
+        """
+        return [color.label() for color in cls.pool(num_colors)]
 
     # --------------------------------------------------
     # Human-readable label
@@ -0,0 +1,253 @@
+# dataset_index.py
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from filesystem.file_io import FileIO, PathLike
+
+IMAGE_SUFFIX = ".png"
+ANNOTATION_SUFFIX = "_annotations.json"
+
+
+@dataclass(frozen=True)
+class FileStat:
+    size: int
+    mtime_ns: int
+
+
+@dataclass
+class IndexedSample:
+    """
+    One sample name and whichever of its two files exist.
+    """
+
+    name: str
+    image: Path | None = None
+    annotation: Path | None = None
+
+    @property
+    def is_complete(self) -> bool:
+        return self.image is not None and self.annotation is not None
+
+
+@dataclass
+class IndexChanges:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def __repr__(self) -> str:
+        return f"IndexChanges(added={len(self.added)}, changed={len(self.changed)}, removed={len(self.removed)})"
+
+
+class DatasetIndex:
+    """
+    Size/mtime index of one flat split folder (e.g. "training"), with
+    files grouped into samples:
+
+        <name>.png + <name>_annotations.json  ->  IndexedSample(name, image, annotation)
+
+    The folder is listed with a single os.scandir pass (no per-file
+    Path objects or is_file() calls). The index is kept in a sidecar
+    manifest next to the folder, <folder>.dataset_index.json, so it does
+    not change the folder it describes.
+
+    refresh() rescans and reports what was added, changed (size or mtime)
+    and removed since the last scan; the manifest is rewritten only when
+    something changed. The folder's own mtime is kept in the manifest too:
+    while it is unchanged no file was added, removed or renamed, and
+    refresh() skips the scan. A file rewritten in place does not touch
+    the folder mtime; refresh(force=True) restats every file.
+
+    Usage:
+        index = DatasetIndex.open_local("training")     # loads + refreshes
+        for sample in index.complete_samples():
+            sample.image, sample.annotation
+    """
+
+    VERSION = 1
+    MANIFEST_SUFFIX = ".dataset_index.json"
+
+    # A folder modified this recently (ns) may change again within the
+    # same mtime tick; its mtime is not recorded, so the next refresh scans.
+    RECENT_NS = 2_000_000_000
+
+    def __init__(self, directory: PathLike) -> None:
+        self.directory = FileIO._to_path(directory)
+        self.files: Dict[str, FileStat] = {}
+        self.directory_mtime_ns: int | None = None
+        self._samples: Dict[str, IndexedSample] | None = None
+
+    @classmethod
+    def open(cls, directory: PathLike, refresh: bool = True) -> "DatasetIndex":
+        """
+        Load the sidecar manifest if there is one, then (by default) bring
+        it up to date with the folder.
+        """
+        index = cls(directory)
+        index.load()
+        if refresh:
+            index.refresh()
+        return index
+
+    @classmethod
+    def open_local(cls, subdirectory: PathLike, refresh: bool = True) -> "DatasetIndex":
+        return cls.open(FileIO.local_directory(subdirectory), refresh=refresh)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory.parent / f"{self.directory.name}{self.MANIFEST_SUFFIX}"
+
+    # --------------------------------------------------
+    # Scanning
+    # --------------------------------------------------
+    @classmethod
+    def scan(cls, directory: PathLike) -> Dict[str, FileStat]:
+        """
+        {file name: FileStat} of the regular files directly in directory.
+        """
+        result: Dict[str, FileStat] = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    result[entry.name] = FileStat(stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return result
+
+    def refresh(self, save: bool = True, force: bool = False) -> IndexChanges:
+        """
+        Rescan the folder and update the index in place. Returns the
+        differences by file name; saves the manifest if there are any.
+        Unless force, a folder whose mtime matches the manifest is not
+        rescanned (no changes).
+        """
+        try:
+            directory_mtime_ns: int | None = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            directory_mtime_ns = None
+        if not force and directory_mtime_ns is not None and directory_mtime_ns == self.directory_mtime_ns:
+            return IndexChanges()
+        if directory_mtime_ns is not None and time.time_ns() - directory_mtime_ns < self.RECENT_NS:
+            directory_mtime_ns = None
+
+        current = self.scan(self.directory)
+        changes = IndexChanges()
+        for name, stat in current.items():
+            previous = self.files.get(name)
+            if previous is None:
+                changes.added.append(name)
+            elif previous != stat:
+                changes.changed.append(name)
+        changes.removed = [name for name in self.files if name not in current]
+
+        for entries in (changes.added, changes.changed, changes.removed):
+            entries.sort()
+
+        if changes or directory_mtime_ns != self.directory_mtime_ns:
+            if changes:
+                self.files = current
+                self._samples = None
+            self.directory_mtime_ns = directory_mtime_ns
+            if save:
+                self.save()
+        return changes
+
+    # --------------------------------------------------
+    # Samples
+    # --------------------------------------------------
+    @classmethod
+    def sample_name(cls, file_name: str) -> Tuple[str, str] | None:
+        """
+        ("name", "image" | "annotation") for a sample file, else None.
+        """
+        if file_name.endswith(ANNOTATION_SUFFIX):
+            return file_name[: -len(ANNOTATION_SUFFIX)], "annotation"
+        if file_name.endswith(IMAGE_SUFFIX):
+            return file_name[: -len(IMAGE_SUFFIX)], "image"
+        return None
+
+    @property
+    def samples(self) -> Dict[str, IndexedSample]:
+        """
+        Every sample name seen, complete or not, sorted by name.
+        """
+        if self._samples is None:
+            samples: Dict[str, IndexedSample] = {}
+            for file_name in sorted(self.files):
+                parsed = self.sample_name(file_name)
+                if parsed is None:
+                    continue
+                name, kind = parsed
+                sample = samples.setdefault(name, IndexedSample(name))
+                setattr(sample, kind, self.directory / file_name)
+            self._samples = dict(sorted(samples.items()))
+        return self._samples
+
+    def complete_samples(self) -> List[IndexedSample]:
+        return [sample for sample in self.samples.values() if sample.is_complete]
+
+    def incomplete_samples(self) -> List[IndexedSample]:
+        return [sample for sample in self.samples.values() if not sample.is_complete]
+
+    def paths(self, suffix: str = "") -> List[Path]:
+        """
+        Paths of indexed files whose name ends with suffix, sorted by name.
+        """
+        return [self.directory / name for name in sorted(self.files) if name.endswith(suffix)]
+
+    def stat(self, file_name: str) -> FileStat | None:
+        return self.files.get(file_name)
+
+    def __len__(self) -> int:
+        return len(self.complete_samples())
+
+    def summary(self) -> str:
+        incomplete = len(self.incomplete_samples())
+        text = f"{self.directory.name}: {len(self)} samples, {len(self.files)} files"
+        if incomplete:
+            text += f", {incomplete} incomplete"
+        return text
+
+    # --------------------------------------------------
+    # Manifest
+    # --------------------------------------------------
+    def load(self) -> bool:
+        """
+        Read the sidecar manifest. Returns False (and leaves the index
+        empty) if it is missing, unreadable or from another version.
+        """
+        try:
+            data = json.loads(FileIO.load(self.manifest_path).decode("utf-8"))
+        except (FileNotFoundError, ValueError):
+            return False
+        if data.get("version") != self.VERSION:
+            return False
+        self.files = {name: FileStat(size, mtime_ns) for name, (size, mtime_ns) in data["files"].items()}
+        self.directory_mtime_ns = data.get("directory_mtime_ns")
+        self._samples = None
+        return True
+
+    def save(self) -> Path:
+        data = {
+            "version": self.VERSION,
+            "directory": self.directory.name,
+            "directory_mtime_ns": self.directory_mtime_ns,
+            "files": {name: [stat.size, stat.mtime_ns] for name, stat in sorted(self.files.items())},
+        }
+        path = self.manifest_path
+        temp_path = path.with_name(path.name + ".tmp")
+        FileIO.save(json.dumps(data, separators=(",", ":")).encode("utf-8"), temp_path)
+        os.replace(temp_path, path)
+        return path
@@ -0,0 +1,150 @@
+# shard_reader.py
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Sequence, Tuple
+
+from PIL import Image
+
+from filesystem.dataset_index import DatasetIndex
+from filesystem.file_io import FileIO, PathLike
+from filesystem.shard_writer import ShardWriter
+from labels.image_annotation_document import ImageAnnotationDocument
+
+
+class ShardReader:
+    """
+    Reads samples written by ShardWriter.
+
+    Random access (reader[i], read_image(i), ...) seeks straight to the
+    member offsets recorded in the index. Sequential iteration (iter_samples)
+    streams each tar front to back, which is the friendly pattern for
+    network filesystems.
+
+    Several indexes (one per Runner.run) can be read as one dataset:
+        reader = ShardReader.open_local("training")
+    """
+
+    ANNOTATION_EXTENSION = "annotations.json"
+    IMAGE_EXTENSION = "png"
+
+    def __init__(self, index_paths: PathLike | Sequence[PathLike]) -> None:
+        if isinstance(index_paths, (str, Path)):
+            index_paths = [index_paths]
+
+        # (shard path, sample entry) per sample, in index order
+        self._entries: List[Tuple[Path, Dict[str, Any]]] = []
+        self._shard_paths: List[Path] = []
+
+        for index_path in index_paths:
+            index_path = FileIO._to_path(index_path)
+            index = json.loads(FileIO.load(index_path).decode("utf-8"))
+            version = index.get("version")
+            if version != ShardWriter.VERSION:
+                raise ValueError(f"Unsupported shard index version {version}: {index_path}")
+
+            shard_paths = [index_path.parent / shard["file"] for shard in index["shards"]]
+            self._shard_paths.extend(shard_paths)
+            for sample in index["samples"]:
+                self._entries.append((shard_paths[sample["shard"]], sample))
+
+        self._keys: Dict[str, int] = {entry["key"]: i for i, (_, entry) in enumerate(self._entries)}
+        self._handles: Dict[Path, BinaryIO] = {}
+
+    @classmethod
+    def open_local(cls, subdirectory: str) -> "ShardReader":
+        """
+        Open every shard index found directly in a project folder.
+        """
+        return cls(DatasetIndex.open_local(subdirectory).paths(ShardWriter.INDEX_EXTENSION))
+
+    # --------------------------------------------------
+    # Lifetime
+    # --------------------------------------------------
+    def close(self) -> None:
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+
+    def __enter__(self) -> "ShardReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --------------------------------------------------
+    # Random access
+    # --------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> List[str]:
+        return [entry["key"] for _, entry in self._entries]
+
+    def index_of(self, key: str) -> int:
+        return self._keys[key]
+
+    def read_member(self, index: int, extension: str) -> bytes:
+        shard_path, entry = self._entries[index]
+        offset, size = entry["members"][extension]
+        handle = self._handles.get(shard_path)
+        if handle is None:
+            handle = open(shard_path, "rb")
+            self._handles[shard_path] = handle
+        handle.seek(offset)
+        return handle.read(size)
+
+    def __getitem__(self, index: int) -> Dict[str, bytes]:
+        """
+        All members of sample i as {extension: bytes}, plus "__key__".
+        """
+        _, entry = self._entries[index]
+        result: Dict[str, Any] = {"__key__": entry["key"]}
+        for extension in entry["members"]:
+            result[extension] = self.read_member(index, extension)
+        return result
+
+    def read_image(self, index: int) -> Image.Image:
+        image = Image.open(io.BytesIO(self.read_member(index, self.IMAGE_EXTENSION)))
+        image.load()
+        return image
+
+    def read_annotation_text(self, index: int) -> str:
+        return self.read_member(index, self.ANNOTATION_EXTENSION).decode("utf-8")
+
+    def read_document(self, index: int) -> ImageAnnotationDocument:
+        return ImageAnnotationDocument.loads(self.read_annotation_text(index))
+
+    # --------------------------------------------------
+    # Sequential streaming
+    # --------------------------------------------------
+    def iter_samples(self) -> Iterator[Dict[str, bytes]]:
+        """
+        Stream every sample shard by shard without seeking, yielding
+        {"__key__": key, extension: bytes, ...} like WebDataset does.
+        Member names are split into key and extension by the index, since
+        either may contain dots; members the index does not list are skipped.
+        """
+        for shard_path in self._shard_paths:
+            names = {
+                f"{entry['key']}.{extension}": (entry["key"], extension)
+                for path, entry in self._entries if path == shard_path
+                for extension in entry["members"]
+            }
+            current: Dict[str, Any] | None = None
+            with tarfile.open(shard_path, "r|") as tar:
+                for member in tar:
+                    if not member.isfile() or member.name not in names:
+                        continue
+                    key, extension = names[member.name]
+                    if current is not None and current["__key__"] != key:
+                        yield current
+                        current = None
+                    if current is None:
+                        current = {"__key__": key}
+                    current[extension] = tar.extractfile(member).read()
+            if current is not None:
+                yield current
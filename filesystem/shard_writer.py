@@ -0,0 +1,150 @@
+# shard_writer.py
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from filesystem.file_io import FileIO, PathLike
+
+
+class ShardWriter:
+    """
+    Packs samples into size-bounded, WebDataset-style tar shards.
+
+    Every sample is a group of tar members sharing one key:
+        <key>.png
+        <key>.annotations.json
+    and a new shard is started whenever the next sample would push the
+    current one past max_bytes. On close() an index is written next to
+    the shards:
+
+        <prefix>.index.json
+        {
+          "version": 1,
+          "shards":  [ { "file": "<prefix>-00000.tar", "samples": n, "bytes": n }, ... ],
+          "samples": [ { "key": ..., "shard": i,
+                         "members": { "png": [offset, size], ... } }, ... ]
+        }
+
+    Offsets point at member data, so a reader can seek straight to one
+    sample without walking the tar.
+
+    write() and close() may be called from several threads (e.g. the
+    write workers of GenerationPipeline); samples are appended one at a
+    time.
+    """
+
+    INDEX_EXTENSION = ".index.json"
+    SHARD_EXTENSION = ".tar"
+    VERSION = 1
+
+    def __init__(self, directory: PathLike, prefix: str, max_bytes: int = 64 * 1024 * 1024) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.directory: Path = FileIO._to_path(directory)
+        self.prefix: str = prefix
+        self.max_bytes: int = int(max_bytes)
+
+        self._tar: tarfile.TarFile | None = None
+        self._shard_path: Path | None = None
+        self._shard_samples = 0
+        self._shards: List[Dict[str, Any]] = []
+        self._samples: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def local(cls, subdirectory: str, prefix: str, max_bytes: int = 64 * 1024 * 1024) -> "ShardWriter":
+        return cls(FileIO.local_directory(subdirectory), prefix, max_bytes)
+
+    @classmethod
+    def index_path(cls, directory: PathLike, prefix: str) -> Path:
+        return FileIO._to_path(directory) / f"{prefix}{cls.INDEX_EXTENSION}"
+
+    # --------------------------------------------------
+    # Writing
+    # --------------------------------------------------
+    def write(self, key: str, members: Dict[str, bytes]) -> None:
+        """
+        Append one sample. members maps extension (no leading dot,
+        e.g. "png", "annotations.json") to file bytes.
+        """
+        with self._lock:
+            self._write(key, members)
+
+    def _write(self, key: str, members: Dict[str, bytes]) -> None:
+        # 512-byte tar header per member, data padded to 512, and the
+        # 1024-byte end-of-archive marker written on close
+        incoming = sum(512 + ((len(data) + 511) // 512) * 512 for data in members.values()) + 1024
+
+        if self._tar is None:
+            self._open_shard()
+        elif self._shard_samples > 0 and self._tar.offset + incoming > self.max_bytes:
+            self._close_shard()
+            self._open_shard()
+
+        mtime = time.time()
+        offsets: Dict[str, List[int]] = {}
+        for extension, data in members.items():
+            info = tarfile.TarInfo(name=f"{key}.{extension}")
+            info.size = len(data)
+            info.mtime = mtime
+            self._tar.addfile(info, io.BytesIO(data))
+            # addfile leaves the cursor after the 512-padded data block
+            data_offset = self._tar.offset - ((len(data) + 511) // 512) * 512
+            offsets[extension] = [data_offset, len(data)]
+
+        self._samples.append({
+            "key": key,
+            "shard": len(self._shards),
+            "members": offsets,
+        })
+        self._shard_samples += 1
+
+    def _open_shard(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{self.prefix}-{len(self._shards):05d}{self.SHARD_EXTENSION}"
+        self._shard_path = self.directory / name
+        self._tar = tarfile.open(self._shard_path, "w", format=tarfile.USTAR_FORMAT)
+        self._shard_samples = 0
+
+    def _close_shard(self) -> None:
+        if self._tar is None:
+            return
+        self._tar.close()
+        self._shards.append({
+            "file": self._shard_path.name,
+            "samples": self._shard_samples,
+            "bytes": self._shard_path.stat().st_size,
+        })
+        self._tar = None
+        self._shard_path = None
+
+    def close(self) -> Path:
+        """
+        Finish the current shard and write the index. Returns the index path.
+        """
+        with self._lock:
+            self._close_shard()
+            index = {
+                "version": self.VERSION,
+                "shards": self._shards,
+                "samples": self._samples,
+            }
+        path = self.index_path(self.directory, self.prefix)
+        FileIO.save(json.dumps(index, separators=(",", ":")).encode("utf-8"), path)
+        return path
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._samples)
@@ -0,0 +1,336 @@
+# generation_pipeline.py
+from __future__ import annotations
+
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List
+
+from pipeline_params import PipelineParams
+from runner import ProgressCallback, Runner, SamplePlan, StopCallback
+from runner_params import RunnerParams
+from sample_sink import SampleSink
+from stage_memory import MemoryBudget, StageMemory
+from stage_timing import StageTiming
+
+# Marks the end of a queue's input; one is queued per downstream worker.
+_DONE = object()
+
+
+class _Stopped(Exception):
+    """Raised inside a worker when another worker failed."""
+
+
+@dataclass
+class QueueDepthStats:
+    capacity: int
+    max_depth: int = 0
+    total_depth: int = 0
+    samples: int = 0
+
+    @property
+    def mean_depth(self) -> float:
+        return self.total_depth / self.samples if self.samples else 0.0
+
+
+@dataclass
+class PipelineStats:
+    completed: int = 0
+    elapsed_seconds: float = 0.0
+    queues: Dict[str, QueueDepthStats] = field(default_factory=dict)
+
+    @property
+    def samples_per_second(self) -> float:
+        return self.completed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"Pipeline: {self.completed} samples in {self.elapsed_seconds:.2f} s "
+            f"({self.samples_per_second:.2f} samples/s)"
+        ]
+        for name, stats in self.queues.items():
+            lines.append(
+                f"  {name:>6} queue: max {stats.max_depth}/{stats.capacity}, "
+                f"mean {stats.mean_depth:.1f}"
+            )
+        return "\n".join(lines)
+
+
+class GenerationPipeline:
+    """
+    Runs Runner's sample stages concurrently:
+
+        plan -> [render] -> [label] -> [encode] -> [write]
+
+    Each bracketed stage has its own worker threads and reads from a
+    bounded queue, so a slow stage makes the stages in front of it block
+    (backpressure) instead of piling up finished samples in memory.
+
+    The plan stage gives every sample its own seed (Runner.sample_seed
+    with params.seed, else drawn from the global random module in index
+    order), so a run is reproducible no matter how the workers interleave.
+
+    Usage:
+        params.pipeline = PipelineParams(encode_workers=2)
+        Runner.run_train(params)     # Runner.run dispatches here
+    """
+
+    STAGES = ("render", "label", "encode", "write")
+
+    def __init__(self, pipeline_params: PipelineParams) -> None:
+        self.pipeline_params = pipeline_params
+
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._lock = threading.Lock()
+        self._queues: Dict[str, queue.Queue] = {}
+        self._remaining: Dict[str, int] = {}
+        self._completed = 0
+        self._started = 0
+        self._total = 0
+        self._progress: ProgressCallback | None = None
+        self._budget: MemoryBudget | None = None
+
+    # --------------------------------------------------
+    # Queue helpers that give up when the pipeline stops
+    # --------------------------------------------------
+    def _put(self, q: queue.Queue, item: Any) -> None:
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue) -> Any:
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _fail(self, error: BaseException) -> None:
+        with self._lock:
+            self._errors.append(error)
+        self._stop.set()
+
+    # --------------------------------------------------
+    # Workers
+    # --------------------------------------------------
+    def _plan_worker(
+        self,
+        params: RunnerParams,
+        name: str,
+        indices: Iterable[int],
+        should_stop: StopCallback | None,
+    ) -> None:
+        try:
+            first = self._queues[self.STAGES[0]]
+            for index in indices:
+                if should_stop is not None and should_stop():
+                    break
+                if params.seed is not None:
+                    seed = Runner.sample_seed(params.seed, index)
+                else:
+                    seed = random.getrandbits(64)
+                self._put(first, Runner.plan_sample(params, name, index, seed=seed))
+            for _ in range(self._workers(self.STAGES[0])):
+                self._put(first, _DONE)
+        except _Stopped:
+            pass
+        except BaseException as error:
+            self._fail(error)
+
+    def _wait_for_memory(self) -> None:
+        """
+        Over a throttling memory budget, hold the next sample back until
+        usage drops or every sample already started has been written.
+        """
+        budget = self._budget
+        if budget is None or not budget.throttles:
+            return
+        while budget.exceeded() and self._started > self._completed:
+            if self._stop.is_set():
+                raise _Stopped()
+            time.sleep(0.1)
+
+    def _stage_worker(self, stage: str, fn: Callable[[Any], Any]) -> None:
+        stage_index = self.STAGES.index(stage)
+        inbox = self._queues[stage]
+        next_stage = self.STAGES[stage_index + 1] if stage_index + 1 < len(self.STAGES) else None
+        outbox = self._queues[next_stage] if next_stage else None
+
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    break
+                if stage_index == 0:
+                    self._wait_for_memory()
+                    with self._lock:
+                        self._started += 1
+                result = fn(item)
+                if outbox is not None:
+                    self._put(outbox, result)
+                else:
+                    with self._lock:
+                        self._completed += 1
+                        if self._progress is not None:
+                            self._progress(self._completed, self._total)
+
+            # The last worker of a stage closes the next stage's queue.
+            with self._lock:
+                self._remaining[stage] -= 1
+                last = self._remaining[stage] == 0
+            if last and next_stage is not None:
+                for _ in range(self._workers(next_stage)):
+                    self._put(outbox, _DONE)
+        except _Stopped:
+            pass
+        except BaseException as error:
+            self._fail(error)
+
+    def _monitor(self, stats: PipelineStats, total: int, done: threading.Event) -> None:
+        interval = self.pipeline_params.report_interval
+        last_report = time.perf_counter()
+        while not done.wait(0.05):
+            if self._budget is not None:
+                self._budget.exceeded()  # warns when the budget is crossed
+            for stage, q in self._queues.items():
+                depth = q.qsize()
+                entry = stats.queues[stage]
+                entry.max_depth = max(entry.max_depth, depth)
+                entry.total_depth += depth
+                entry.samples += 1
+
+            now = time.perf_counter()
+            if interval > 0 and now - last_report >= interval:
+                last_report = now
+                print(self.depth_report(total))
+
+    @staticmethod
+    def _in_sample(fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        """
+        Attribute StageTiming timers and StageMemory stages inside fn to
+        the item's sample.
+        """
+        def run(item: Any) -> Any:
+            plan = item if isinstance(item, SamplePlan) else item.plan
+            with StageTiming.sample(plan.index), StageMemory.sample(plan.index):
+                return fn(item)
+        return run
+
+    def _workers(self, stage: str) -> int:
+        return int(getattr(self.pipeline_params, f"{stage}_workers"))
+
+    def depth_report(self, total: int | None = None) -> str:
+        """
+        One line with the current depth of every queue, e.g.
+            queues render=3/8 label=0/8 encode=2/8 write=0/8 | done 12/601
+        """
+        parts = [
+            f"{stage}={q.qsize()}/{self.pipeline_params.queue_size}"
+            for stage, q in self._queues.items()
+        ]
+        done = f"{self._completed}/{total}" if total is not None else str(self._completed)
+        return f"queues {' '.join(parts)} | done {done}"
+
+    # --------------------------------------------------
+    # Run
+    # --------------------------------------------------
+    def run(
+        self,
+        params: RunnerParams,
+        name: str,
+        num_colors: int,
+        sink: SampleSink,
+        indices: Iterable[int],
+        progress: ProgressCallback | None = None,
+        should_stop: StopCallback | None = None,
+        budget: MemoryBudget | None = None,
+    ) -> PipelineStats:
+        """
+        Generate every index through the stages and write it to sink.
+        Re-raises the first worker error after all threads have stopped.
+
+        progress and should_stop behave as in Runner.run: once should_stop()
+        returns True the plan stage stops and the samples already queued
+        drain through the remaining stages. While a throttling budget is
+        exceeded, a new sample starts rendering only once all others are written.
+        """
+        indices = list(indices)
+        capacity = self.pipeline_params.queue_size
+
+        self._stop.clear()
+        self._errors = []
+        self._completed = 0
+        self._started = 0
+        self._total = len(indices)
+        self._progress = progress
+        self._budget = budget
+        self._queues = {stage: queue.Queue(maxsize=capacity) for stage in self.STAGES}
+        self._remaining = {stage: self._workers(stage) for stage in self.STAGES}
+
+        stage_functions: Dict[str, Callable[[Any], Any]] = {
+            "render": self._in_sample(lambda plan: Runner.render_sample(params, plan, num_colors)),
+            "label": self._in_sample(lambda rendered: Runner.label_sample(params, rendered)),
+            "encode": self._in_sample(lambda labeled: Runner.encode_sample(params, labeled)),
+            "write": lambda encoded: Runner.write_sample(encoded, sink),
+        }
+
+        stats = PipelineStats(queues={stage: QueueDepthStats(capacity) for stage in self.STAGES})
+        start_time = time.perf_counter()
+
+        threads: List[threading.Thread] = [
+            threading.Thread(
+                target=self._plan_worker,
+                args=(params, name, indices, should_stop),
+                name="pipeline-plan",
+                daemon=True,
+            )
+        ]
+        for stage in self.STAGES:
+            for worker in range(self._workers(stage)):
+                threads.append(threading.Thread(
+                    target=self._stage_worker,
+                    args=(stage, stage_functions[stage]),
+                    name=f"pipeline-{stage}-{worker}",
+                    daemon=True,
+                ))
+
+        monitor_done = threading.Event()
+        monitor = threading.Thread(
+            target=self._monitor,
+            args=(stats, len(indices), monitor_done),
+            name="pipeline-monitor",
+            daemon=True,
+        )
+
+        monitor.start()
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            raise
+        finally:
+            monitor_done.set()
+            monitor.join()
+
+        stats.completed = self._completed
+        stats.elapsed_seconds = time.perf_counter() - start_time
+        print(stats.summary())
+
+        if self._errors:
+            raise self._errors[0]
+        return stats
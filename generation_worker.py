@@ -0,0 +1,121 @@
+# generation_worker.py
+from __future__ import annotations
+
+import threading
+import time
+
+from PySide6.QtCore import QObject, Qt, QThread, Signal, Slot
+
+from generation_pool import GenerationPool
+from runner import Runner
+from runner_params import RunnerParams
+
+
+class GenerationWorker(QObject):
+    """
+    Runs Runner.run_train / run_test off the GUI thread.
+
+    Lives on its own QThread (see create()); all signals are delivered to
+    the GUI thread through queued connections, so slots can touch widgets.
+
+    cancel() may be called from any thread. The run stops before the next
+    sample starts (samples in flight are still written), then `finished`
+    fires with cancelled=True.
+    """
+
+    # (split, total); total counts only samples left to generate (resume)
+    started = Signal(str, int)
+
+    # (done, total, samples per second, estimated seconds remaining)
+    progress = Signal(int, int, float, float)
+
+    # (done, cancelled)
+    finished = Signal(int, bool)
+
+    # error message; `finished` is not emitted after a failure
+    failed = Signal(str)
+
+    SPLITS = ("train", "test")
+
+    def __init__(self, params: RunnerParams, split: str, pool: GenerationPool | None = None) -> None:
+        super().__init__()
+        if split not in self.SPLITS:
+            raise ValueError(f"Unknown split '{split}' (expected one of: {', '.join(self.SPLITS)})")
+        self.params = params
+        self.split = split
+        self.pool = pool
+        self._cancel = threading.Event()
+        self._start_time = 0.0
+        self._total: int | None = None  # from Runner's first progress(0, total)
+
+    @classmethod
+    def create(
+        cls,
+        params: RunnerParams,
+        split: str,
+        pool: GenerationPool | None = None,
+    ) -> tuple[QThread, "GenerationWorker"]:
+        """
+        Create a worker on a new QThread, wired up but not started: connect
+        to its signals and thread.finished first, then call thread.start(),
+        so no early signal is missed. Keep references to both until
+        thread.finished fires; they delete themselves afterwards.
+
+        With a pool, samples are rendered in its worker processes and this
+        thread only writes them.
+        """
+        thread = QThread()
+        worker = cls(params, split, pool)
+        worker.moveToThread(thread)
+
+        thread.started.connect(worker.run)
+        # Direct: quit from the worker thread itself, so the thread also
+        # ends while the GUI thread is blocked in thread.wait().
+        worker.finished.connect(thread.quit, Qt.DirectConnection)
+        worker.failed.connect(thread.quit, Qt.DirectConnection)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        return thread, worker
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @Slot()
+    def run(self) -> None:
+        self._start_time = time.perf_counter()
+        self._total = None
+
+        try:
+            run = Runner.run_train if self.split == "train" else Runner.run_test
+            pool = self.pool
+            done = run(
+                self.params,
+                progress=self._on_progress,
+                should_stop=self.is_cancelled,
+                executor=pool.executor if pool is not None else None,
+                workers=pool.workers if pool is not None else 1,
+                worker_pids=pool.worker_pids if pool is not None else None,
+            )
+        except Exception as error:
+            self.failed.emit(f"{type(error).__name__}: {error}")
+            return
+
+        total = self._total if self._total is not None else done
+        self.finished.emit(done, self.is_cancelled() and done < total)
+
+    def _on_progress(self, done: int, total: int) -> None:
+        if self._total is None:
+            # Runner reports the pending count first (fewer than the index
+            # range when resuming), before any sample is written.
+            self._total = total
+            self._start_time = time.perf_counter()
+            self.started.emit(self.split, total)
+            if done == 0:
+                return
+        elapsed = time.perf_counter() - self._start_time
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        self.progress.emit(done, total, rate, eta)
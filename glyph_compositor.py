@@ -0,0 +1,163 @@
+# glyph_compositor.py
+from __future__ import annotations
+import random
+from dataclasses import dataclass
+import numpy as np
+from image.array_bitmap import ArrayBitmap
+from image.noise_bank import NoiseBank
+from image.noise_field import NoiseField
+from image.rgba import RGBA
+from labels.pixel_bag_run_length import PixelBagRunLength
+
+
+@dataclass(frozen=True)
+class TintedGlyph:
+    """
+    A white glyph template prepared for one color: the per-sprite and
+    per-color values GlyphCompositor.place would otherwise derive on every
+    placement (alpha scale, visible mask and count).
+
+    rgb, the noise-free tint, is only used with color_noise 0. With color
+    noise each placement still computes clip(base + noise) and truncates
+    it per pixel: noise is added before truncation, so it cannot be
+    applied to the uint8 tint with the same result.
+
+        template       the white sprite (read-only, shared)
+        base           (3,) float64 color in 0–1
+        rgb            (h, w, 3) uint8 tint with no color noise
+        alpha          (h, w) uint8 template alpha
+        alpha_unit     (h, w) float64 alpha / 255.0
+        visible        (w, h) bool, alpha > 0 in the kernels' x-major order
+        visible_count  number of visible pixels
+    """
+
+    template: ArrayBitmap
+    base: np.ndarray
+    rgb: np.ndarray
+    alpha: np.ndarray
+    alpha_unit: np.ndarray
+    visible: np.ndarray
+    visible_count: int
+
+    @classmethod
+    def build(cls, template: ArrayBitmap, rgba: RGBA) -> "TintedGlyph":
+        base = np.array([rgba.rf, rgba.gf, rgba.bf])
+        alpha = template.pixels[..., 3]
+        visible = np.ascontiguousarray(alpha.T != 0)
+        rgb = np.empty((template.height, template.width, 3), dtype=np.uint8)
+        rgb[...] = (np.clip(base, 0.0, 1.0) * 255).astype(np.uint8)
+        tinted = cls(
+            template=template,
+            base=base,
+            rgb=rgb,
+            alpha=alpha,
+            alpha_unit=alpha / 255.0,
+            visible=visible,
+            visible_count=int(np.count_nonzero(visible)),
+        )
+        for array in (tinted.base, tinted.rgb, tinted.alpha_unit, tinted.visible):
+            array.flags.writeable = False
+        return tinted
+
+    @property
+    def width(self) -> int:
+        return self.template.width
+
+    @property
+    def height(self) -> int:
+        return self.template.height
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes this entry adds on top of the shared template.
+        """
+        return self.base.nbytes + self.rgb.nbytes + self.alpha_unit.nbytes + self.visible.nbytes
+
+
+class GlyphCompositor:
+
+    # --------------------------------------------------------------
+    # place: recolor + multiply alpha + stamp_alpha + make_label
+    # --------------------------------------------------------------
+    @classmethod
+    def place(
+        cls,
+        canvas: ArrayBitmap,
+        glyph: ArrayBitmap | TintedGlyph,
+        rgba: RGBA,
+        color_noise: float,
+        alpha_min: float,
+        alpha_max: float,
+        alpha_noise: float,
+        x: int,
+        y: int,
+        alpha_threshold: float,
+        rng: random.Random | None = None,
+        noise_bank: NoiseBank | None = None,
+    ) -> PixelBagRunLength:
+        """
+        Draw a white glyph template onto the canvas with its top-left at
+        (x, y), in one pass over the part that lands on the canvas:
+
+            recolor_white(glyph, rgba, color_noise)
+            multiply_alpha(glyph, rng.uniform(alpha_min, alpha_max), alpha_noise)
+            canvas.stamp_alpha(glyph, x, y)
+            Runner.make_label(..., glyph, x, y, alpha_threshold)
+
+        and return the label as stripes in canvas coordinates (clipped
+        to the canvas). The template is only read; no glyph copy is made.
+        `glyph` is the template, or a TintedGlyph already prepared for
+        rgba (TintedGlyphCache), which skips rebuilding the alpha scale
+        and visible mask; the color itself is only taken ready-made when
+        color_noise is 0.
+
+        Canvas pixels, label and the rng state afterwards are exactly
+        what that sequence produces: the sequence's draws (3 per glyph
+        pixel, one base alpha, one per visible pixel) are taken as a
+        single NoiseField batch, and noise for pixels off the canvas is
+        drawn but never used.
+
+        With a noise_bank the sequence takes the recolor noise from one
+        bank window and the alpha noise from a second one, picked before
+        and after the base alpha, again exactly as the kernels would.
+        """
+        tinted = glyph if isinstance(glyph, TintedGlyph) else TintedGlyph.build(glyph, rgba)
+        w, h = tinted.width, tinted.height
+
+        # Random values behind the noise, as (y, x) views over the whole glyph
+        if noise_bank is None:
+            color_count = w * h * 3
+            draws = NoiseField.random(rng, color_count + 1 + tinted.visible_count)
+            base_alpha = float(NoiseField.scale(draws[color_count], alpha_min, alpha_max))
+            color_draws = draws[:color_count].reshape(w, h, 3).transpose(1, 0, 2)
+            alpha_draws = np.zeros((w, h))  # alpha-0 pixels draw nothing and stay 0
+            alpha_draws[tinted.visible] = draws[color_count + 1:]
+            alpha_draws = alpha_draws.T
+        else:
+            color_draws = noise_bank.window(rng, w, h)[..., :3]
+            base_alpha = (rng if rng is not None else random).uniform(alpha_min, alpha_max)
+            alpha_draws = noise_bank.window(rng, w, h)[..., 3]
+
+        bounds = canvas.stamp_bounds(w, h, x, y)
+        if bounds is None:
+            return PixelBagRunLength()
+        destination, source = bounds
+
+        # Color (without noise, the cached noise-free tint)
+        if color_noise == 0.0:
+            rgb = tinted.rgb[source]
+        else:
+            half = color_noise / 2.0
+            colors = np.clip(tinted.base + NoiseField.scale(color_draws[source], -half, +half), 0.0, 1.0)
+            rgb = (colors * 255).astype(np.uint8)
+
+        # Alpha
+        half = alpha_noise / 2.0
+        factor = np.clip(base_alpha + NoiseField.scale(alpha_draws[source], -half, +half), 0.0, 1.0)
+        glyph_alpha = (tinted.alpha_unit[source] * factor * 255).astype(np.uint8)
+
+        canvas.pixels[destination] = ArrayBitmap.blend_alpha(rgb, glyph_alpha, canvas.pixels[destination])
+
+        rows, columns = destination
+        return PixelBagRunLength.from_mask(glyph_alpha / 255.0 > alpha_threshold, columns.start, rows.start)
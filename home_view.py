@@ -1,7 +1,14 @@
 # home_view.py
 from __future__ import annotations
 
-from PySide6.QtWidgets import QWidget, QPushButton, QGridLayout
+from PySide6.QtWidgets import (
+    QWidget,
+    QPushButton,
+    QGridLayout,
+    QVBoxLayout,
+    QProgressBar,
+    QLabel,
+)
 from PySide6.QtCore import QSize, Qt, Signal
 
 
@@ -12,6 +19,9 @@ class HomeView(QWidget):
     Contains two buttons:
       - 'Generate Test' pinned to the top-left.
       - 'Generate Train' pinned to the bottom-right.
+
+    and, in the middle, a progress bar, status line and 'Cancel' button
+    for the generation run in progress, plus the worker pool's status.
     """
 
     # ------------------------------------------------------------------
@@ -19,6 +29,7 @@ class HomeView(QWidget):
     # ------------------------------------------------------------------
     generate_test_requested = Signal()
     generate_train_requested = Signal()
+    cancel_requested = Signal()
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
@@ -73,6 +84,31 @@ class HomeView(QWidget):
             alignment=Qt.AlignBottom | Qt.AlignRight,
         )
 
+        # Center: progress of the current run
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFixedWidth(360)
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+
+        self.status_label = QLabel("Idle")
+        self.status_label.setAlignment(Qt.AlignCenter)
+
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+
+        progress_box = QVBoxLayout()
+        progress_box.setSpacing(6)
+        progress_box.addWidget(self.progress_bar, alignment=Qt.AlignHCenter)
+        progress_box.addWidget(self.status_label, alignment=Qt.AlignHCenter)
+        progress_box.addWidget(self.cancel_button, alignment=Qt.AlignHCenter)
+
+        # Worker pool size / memory, refreshed by MainWindow
+        self.pool_label = QLabel("")
+        self.pool_label.setStyleSheet("color: #888;")
+        progress_box.addWidget(self.pool_label, alignment=Qt.AlignHCenter)
+
+        layout.addLayout(progress_box, 1, 1, alignment=Qt.AlignCenter)
+
         layout.setRowStretch(1, 1)
         layout.setColumnStretch(1, 1)
 
@@ -84,6 +120,7 @@ class HomeView(QWidget):
     def _connect_signals(self) -> None:
         self.generate_test_button.clicked.connect(self.on_generate_test_clicked)
         self.generate_train_button.clicked.connect(self.on_generate_train_clicked)
+        self.cancel_button.clicked.connect(self.on_cancel_clicked)
 
     # ------------------------------------------------------------------
     # Slots / callbacks
@@ -95,3 +132,42 @@ class HomeView(QWidget):
     def on_generate_train_clicked(self) -> None:
         # Previously: print("Generate Train was clicked")
         self.generate_train_requested.emit()
+
+    def on_cancel_clicked(self) -> None:
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText("Cancelling after the current sample…")
+        self.cancel_requested.emit()
+
+    # ------------------------------------------------------------------
+    # Run state (driven by MainWindow from GenerationWorker signals)
+    # ------------------------------------------------------------------
+    def set_running(self, running: bool) -> None:
+        self.generate_test_button.setEnabled(not running)
+        self.generate_train_button.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+
+    def show_started(self, split: str, total: int) -> None:
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(0)
+        self.status_label.setText(f"Generating {split}: 0/{total}")
+
+    def show_progress(self, done: int, total: int, rate: float, eta: float) -> None:
+        self.progress_bar.setValue(done)
+        self.status_label.setText(
+            f"{done}/{total}  ·  {rate:.2f} samples/s  ·  ETA {self._format_seconds(eta)}"
+        )
+
+    def show_status(self, text: str) -> None:
+        self.status_label.setText(text)
+
+    def show_pool(self, text: str) -> None:
+        self.pool_label.setText(text)
+
+    @staticmethod
+    def _format_seconds(seconds: float) -> str:
+        seconds = int(round(seconds))
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours:
+            return f"{hours}:{minutes:02d}:{seconds:02d}"
+        return f"{minutes}:{seconds:02d}"
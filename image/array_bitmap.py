@@ -0,0 +1,162 @@
+# array_bitmap.py
+
+from __future__ import annotations
+import numpy as np
+from PIL import Image
+from image.bitmap import Bitmap
+from image.rgba import RGBA
+
+# ----------------------------------------------------------------------
+# ArrayBitmap: one (height, width, 4) uint8 NumPy array
+# ----------------------------------------------------------------------
+
+class ArrayBitmap:
+    """
+    NumPy-backed counterpart of Bitmap for the vectorized kernels:
+        - width, height
+        - pixels: (height, width, 4) uint8 RGBA, indexed pixels[y, x]
+          (row-major like Pillow/OpenCV, unlike Bitmap.rgba[x][y])
+
+    New pixels are opaque black (0, 0, 0, 255), as in Bitmap.allocate.
+    Convert with from_bitmap()/to_bitmap() where code still needs a Bitmap.
+    """
+
+    def __init__(self, width: int = 0, height: int = 0) -> None:
+        self.pixels: np.ndarray = np.zeros((0, 0, 4), dtype=np.uint8)
+        if width > 0 and height > 0:
+            self.allocate(width, height)
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    def allocate(self, width: int, height: int) -> None:
+        self.pixels = np.zeros((int(height), int(width), 4), dtype=np.uint8)
+        self.pixels[..., 3] = 255
+
+    def copy(self) -> "ArrayBitmap":
+        return ArrayBitmap.from_array(self.pixels)
+
+    def pixel(self, x: int, y: int) -> RGBA:
+        r, g, b, a = self.pixels[y, x]
+        return RGBA(int(r), int(g), int(b), int(a))
+
+    # --------------------------------------------------
+    # Stamping (same results as Bitmap.stamp*)
+    # --------------------------------------------------
+    def stamp_bounds(self, width: int, height: int, x: int, y: int):
+        """
+        Overlap of a width x height glyph placed with its top-left at
+        (x, y), as (destination slices, glyph slices) for pixels[y, x]
+        indexing, or None if it lies entirely outside this bitmap.
+        """
+        start_dx, start_dy = max(x, 0), max(y, 0)
+        end_dx, end_dy = min(x + width, self.width), min(y + height, self.height)
+        if start_dx >= end_dx or start_dy >= end_dy:
+            return None
+        destination = (slice(start_dy, end_dy), slice(start_dx, end_dx))
+        glyph = (slice(start_dy - y, end_dy - y), slice(start_dx - x, end_dx - x))
+        return destination, glyph
+
+    def stamp(self, glyph: "ArrayBitmap", x: int, y: int) -> None:
+        bounds = self.stamp_bounds(glyph.width, glyph.height, x, y)
+        if bounds is None:
+            return
+        destination, source = bounds
+        self.pixels[destination] = glyph.pixels[source]
+
+    def stamp_alpha(self, glyph: "ArrayBitmap", x: int, y: int) -> None:
+        bounds = self.stamp_bounds(glyph.width, glyph.height, x, y)
+        if bounds is None:
+            return
+        destination, source = bounds
+        src = glyph.pixels[source]
+        self.pixels[destination] = self.blend_alpha(src[..., :3], src[..., 3], self.pixels[destination])
+
+    def stamp_additive(self, glyph: "ArrayBitmap", x: int, y: int) -> None:
+        bounds = self.stamp_bounds(glyph.width, glyph.height, x, y)
+        if bounds is None:
+            return
+        destination, source = bounds
+        self.pixels[destination] = self.blend_additive(glyph.pixels[source], self.pixels[destination])
+
+    @staticmethod
+    def blend_alpha(src_rgb: np.ndarray, src_alpha: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """
+        RGBA.blend_alpha over whole arrays: uint8 (..., 3) colors and
+        (...) alphas over uint8 (..., 4) destination pixels. The float
+        operations run in the same order, so results match bit for bit.
+        """
+        sa = src_alpha / 255.0
+        da = dst[..., 3] / 255.0
+        keep = (1.0 - sa)[..., None]
+
+        out = np.empty(dst.shape, dtype=np.float64)
+        out[..., :3] = (src_rgb / 255.0) * sa[..., None] + (dst[..., :3] / 255.0) * keep
+        out[..., 3] = sa + da * (1.0 - sa)
+        out[out[..., 3] == 0.0] = 0.0
+        return np.clip(out * 255, 0, 255).astype(np.uint8)
+
+    @staticmethod
+    def blend_additive(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """
+        RGBA.blend_additive over whole (..., 4) uint8 arrays.
+        """
+        sa = src[..., 3] / 255.0
+        da = dst[..., 3] / 255.0
+
+        out = np.empty(dst.shape, dtype=np.float64)
+        out[..., :3] = (src[..., :3] / 255.0) * sa[..., None] + dst[..., :3] / 255.0
+        out[..., 3] = np.minimum(1.0, sa + da)
+        return np.clip(out * 255, 0, 255).astype(np.uint8)
+
+    # --------------------------------------------------
+    # Conversion
+    # --------------------------------------------------
+    @classmethod
+    def from_array(cls, pixels: np.ndarray, copy: bool = True) -> "ArrayBitmap":
+        """
+        Wrap (or copy) an (H, W, 4) uint8 RGBA array.
+        """
+        if pixels.ndim != 3 or pixels.shape[2] != 4:
+            raise ValueError(f"Expected an (H, W, 4) array, got shape {pixels.shape}")
+        result = cls()
+        result.pixels = np.array(pixels, dtype=np.uint8) if copy else np.asarray(pixels, dtype=np.uint8)
+        return result
+
+    @classmethod
+    def from_bitmap(cls, bitmap: Bitmap) -> "ArrayBitmap":
+        result = cls(bitmap.width, bitmap.height)
+        pixels = result.pixels
+        for x in range(bitmap.width):
+            column = bitmap.rgba[x]
+            for y in range(bitmap.height):
+                px = column[y]
+                pixels[y, x] = (px.ri, px.gi, px.bi, px.ai)
+        return result
+
+    def to_bitmap(self) -> Bitmap:
+        result = Bitmap()
+        result.import_pillow(self.export_pillow())
+        return result
+
+    @classmethod
+    def with_pillow(cls, image: Image.Image) -> "ArrayBitmap":
+        result = cls()
+        result.import_pillow(image)
+        return result
+
+    def import_pillow(self, image: Image.Image) -> None:
+        """
+        Import from a Pillow Image (converted to RGBA first).
+        """
+        if image is None:
+            raise ValueError("image is None")
+        self.pixels = np.array(image.convert("RGBA"), dtype=np.uint8)
+
+    def export_pillow(self) -> Image.Image:
+        return Image.fromarray(self.pixels, "RGBA")
@@ -0,0 +1,94 @@
+# noise_bank.py
+
+from __future__ import annotations
+import random
+import threading
+from typing import Dict, Tuple
+import numpy as np
+from image.noise_source import DEFAULT_BANK_COUNT, DEFAULT_BANK_SIZE
+
+# ----------------------------------------------------------------------
+# NoiseBank: a few large uniform noise fields, sampled by window
+# ----------------------------------------------------------------------
+
+class NoiseBank:
+    """
+    `count` fields of size x size x 4 uniform [0, 1) float64 values,
+    generated once from a fixed seed. window() hands out a glyph-sized
+    slice of one field in one of 8 orientations (4 rotations, mirrored
+    or not) at a random offset: a view, not new random numbers.
+
+    Channels 0-2 feed recolor_white (r, g, b) and channel 3 feeds
+    multiply_alpha, so color and alpha noise never share values. Windows
+    overlap between glyphs; noise is no longer independent from glyph to
+    glyph, only hard to tell apart from it.
+
+    Defaults (4 fields of 256 px) take 8 MB. Banks are built lazily and
+    shared per (count, size) within a process by shared().
+    """
+
+    DEFAULT_COUNT = DEFAULT_BANK_COUNT
+    DEFAULT_SIZE = DEFAULT_BANK_SIZE
+    SEED = 20240601
+
+    _shared: Dict[Tuple[int, int], "NoiseBank"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, count: int = DEFAULT_COUNT, size: int = DEFAULT_SIZE, seed: int = SEED) -> None:
+        if count <= 0 or size <= 0:
+            raise ValueError("NoiseBank count and size must be positive")
+        self.size = int(size)
+        self.fields: np.ndarray = np.random.default_rng(seed).random((int(count), self.size, self.size, 4))
+
+    @property
+    def count(self) -> int:
+        return self.fields.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.fields.nbytes
+
+    @classmethod
+    def shared(cls, count: int = DEFAULT_COUNT, size: int = DEFAULT_SIZE) -> "NoiseBank":
+        """
+        The process-wide bank of this shape, built on first use.
+        """
+        key = (int(count), int(size))
+        bank = cls._shared.get(key)
+        if bank is None:
+            with cls._lock:
+                bank = cls._shared.get(key)
+                if bank is None:
+                    bank = cls(count, size)
+                    cls._shared[key] = bank
+        return bank
+
+    @classmethod
+    def clear_shared(cls) -> None:
+        with cls._lock:
+            cls._shared.clear()
+
+    def window(self, rng: random.Random | None, width: int, height: int) -> np.ndarray:
+        """
+        (height, width, 4) values in [0, 1), indexed [y, x, channel].
+        Draws four integers from `rng` (default: the global random module):
+        field, orientation, x offset, y offset. Glyphs larger than a field
+        wrap around it (a copy instead of a view).
+        """
+        if rng is None:
+            rng = random
+        field = self.fields[rng.randrange(self.count)]
+        orientation = rng.randrange(8)
+        field = np.rot90(field, orientation % 4)
+        if orientation >= 4:
+            field = field[:, ::-1]
+
+        size = self.size
+        offset_x = rng.randrange(max(size - width, 0) + 1)
+        offset_y = rng.randrange(max(size - height, 0) + 1)
+        if width <= size and height <= size:
+            return field[offset_y:offset_y + height, offset_x:offset_x + width]
+
+        ys = (offset_y + np.arange(height)) % size
+        xs = (offset_x + np.arange(width)) % size
+        return field[np.ix_(ys, xs)]
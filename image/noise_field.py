@@ -0,0 +1,82 @@
+# noise_field.py
+
+from __future__ import annotations
+import random
+import threading
+import numpy as np
+
+# ----------------------------------------------------------------------
+# NoiseField: batches of rng.uniform() as NumPy arrays
+# ----------------------------------------------------------------------
+
+class NoiseField:
+    """
+    Uniform noise drawn as one NumPy array from a random.Random (or the
+    random module), such that both the values and the generator's state
+    afterwards are exactly what `count` calls of rng.uniform(low, high)
+    in a row would have produced.
+
+    CPython's random and NumPy's MT19937 bit generator are the same
+    Mersenne Twister and build a double from two 32-bit outputs the same
+    way, so the state is handed to NumPy, the batch drawn there, and the
+    advanced state handed back. Vectorized kernels therefore consume the
+    sample's seeded stream exactly like the per-pixel loops they replace.
+    """
+
+    # One reusable bit generator per thread (creating one costs ~150 us)
+    _local = threading.local()
+
+    @classmethod
+    def _generator(cls) -> np.random.Generator:
+        generator = getattr(cls._local, "generator", None)
+        if generator is None:
+            generator = np.random.Generator(np.random.MT19937(0))
+            cls._local.generator = generator
+        return generator
+
+    @classmethod
+    def random(cls, rng: random.Random | None, count: int) -> np.ndarray:
+        """
+        float64 array of `count` values in [0, 1), as [rng.random() for _ in range(count)].
+        """
+        if rng is None:
+            rng = random
+        if count <= 0:
+            return np.empty(0, dtype=np.float64)
+
+        version, internal, gauss_next = rng.getstate()
+        generator = cls._generator()
+        bit_generator = generator.bit_generator
+        bit_generator.state = {
+            "bit_generator": "MT19937",
+            "state": {"key": np.array(internal[:-1], dtype=np.uint32), "pos": internal[-1]},
+        }
+
+        values = generator.random(count)
+
+        state = bit_generator.state["state"]
+        rng.setstate((version, tuple(state["key"].tolist()) + (int(state["pos"]),), gauss_next))
+        return values
+
+    @classmethod
+    def uniform(
+        cls,
+        rng: random.Random | None,
+        low: float,
+        high: float,
+        count: int,
+    ) -> np.ndarray:
+        """
+        float64 array of `count` values, as [rng.uniform(low, high) for _ in range(count)].
+        """
+        return cls.scale(cls.random(rng, count), low, high)
+
+    @staticmethod
+    def scale(values: np.ndarray, low: float, high: float) -> np.ndarray:
+        """
+        Map random() values onto [low, high) with random.uniform's
+        operation order: a + (b - a) * random(). Lets one batch from
+        random() stand in for a run of uniform() calls with different
+        bounds.
+        """
+        return low + (high - low) * values
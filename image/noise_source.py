@@ -0,0 +1,33 @@
+# noise_source.py
+
+from __future__ import annotations
+from enum import Enum
+
+# Default NoiseBank shape (RunnerParams.noise_bank_count / noise_bank_size)
+DEFAULT_BANK_COUNT = 4
+DEFAULT_BANK_SIZE = 256
+
+# ----------------------------------------------------------------------
+# NoiseSource: where the glyph kernels take their per-pixel noise from
+# ----------------------------------------------------------------------
+
+class NoiseSource(Enum):
+    """
+        FRESH  a new rng.uniform() per pixel and channel (the default;
+               exact, every glyph independent)
+        BANK   a window of a precomputed NoiseBank field; the rng only
+               picks the field, orientation and offset
+    """
+
+    FRESH = "fresh"
+    BANK = "bank"
+
+    @classmethod
+    def parse(cls, value: "NoiseSource | str") -> "NoiseSource":
+        if isinstance(value, NoiseSource):
+            return value
+        try:
+            return cls(str(value).strip().lower())
+        except ValueError:
+            names = ", ".join(source.value for source in cls)
+            raise ValueError(f"Unknown noise source '{value}' (expected one of: {names})")
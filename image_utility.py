@@ -1,8 +1,12 @@
 # image_utility.py
 from __future__ import annotations
 import random
+import numpy as np
 from image.rgba import RGBA
 from image.bitmap import Bitmap
+from image.array_bitmap import ArrayBitmap
+from image.noise_bank import NoiseBank
+from image.noise_field import NoiseField
 
 
 class ImageUtility:
@@ -11,29 +15,62 @@ class ImageUtility:
     # recolor_white (0–1 logic)
     # --------------------------------------------------------------
     @classmethod
-    def recolor_white(cls, bitmap: Bitmap, rgba: RGBA, color_noise: float) -> None:
+    def recolor_white(
+        cls,
+        bitmap: Bitmap | ArrayBitmap,
+        rgba: RGBA,
+        color_noise: float,
+        rng: random.Random | None = None,
+        skip_transparent: bool = False,
+        noise_bank: NoiseBank | None = None,
+    ) -> None:
         """
         Recolor every pixel based on the RGBA baseline color,
         with noise entirely in 0–1 space.
 
         baseline.r  ±  (color_noise / 2)
+
+        Noise is drawn from `rng` (default: the global random module).
+        With skip_transparent, pixels with alpha 0 keep their color and
+        draw no noise (the rng then advances less).
+        With a noise_bank, the noise is channels 0-2 of one bank window
+        instead, and `rng` only picks the window.
+
+        An ArrayBitmap is recolored in place by _recolor_white_array,
+        with exactly the same result and rng state afterwards.
         """
+        if isinstance(bitmap, ArrayBitmap):
+            cls._recolor_white_array(bitmap, rgba, color_noise, rng, skip_transparent, noise_bank)
+            return
+
+        if rng is None:
+            rng = random
         half = color_noise / 2.0
+        spread = half - -half  # rng.uniform(-half, +half) == -half + spread * rng.random()
 
         base_r = rgba.rf   # 0–1
         base_g = rgba.gf
         base_b = rgba.bf
 
         w, h = bitmap.width, bitmap.height
+        bank = noise_bank.window(rng, w, h).tolist() if noise_bank is not None else None
 
         for x in range(w):
             for y in range(h):
                 px = bitmap.rgba[x][y]
+                if skip_transparent and px.ai == 0:
+                    continue
 
                 # noise in 0-1 space
-                modified_r = base_r + random.uniform(-half, +half)
-                modified_g = base_g + random.uniform(-half, +half)
-                modified_b = base_b + random.uniform(-half, +half)
+                if bank is None:
+                    modified_r = base_r + rng.uniform(-half, +half)
+                    modified_g = base_g + rng.uniform(-half, +half)
+                    modified_b = base_b + rng.uniform(-half, +half)
+                else:
+                    values = bank[y][x]
+                    modified_r = base_r + (-half + spread * values[0])
+                    modified_g = base_g + (-half + spread * values[1])
+                    modified_b = base_b + (-half + spread * values[2])
 
                 # clamp to 0–1
                 modified_r = max(0.0, min(1.0, modified_r))
@@ -48,21 +85,84 @@ class ImageUtility:
                     px.ai,   # alpha unchanged, still 0–255
                 )
 
+    @classmethod
+    def _recolor_white_array(
+        cls,
+        bitmap: ArrayBitmap,
+        rgba: RGBA,
+        color_noise: float,
+        rng: random.Random | None,
+        skip_transparent: bool,
+        noise_bank: NoiseBank | None = None,
+    ) -> None:
+        """
+        recolor_white as array operations: one batch of noise for all
+        pixels, clip, truncate to 0–255, write the RGB channels in place.
+
+        The per-pixel loop walks x then y and draws r, g, b for each
+        pixel, so the batch is laid out (x, y, channel) and transposed
+        onto the (y, x) pixel array. A bank window is already (y, x).
+        """
+        half = color_noise / 2.0
+        base = np.array([rgba.rf, rgba.gf, rgba.bf])
+        pixels = bitmap.pixels
+
+        if noise_bank is not None:
+            noise = NoiseField.scale(noise_bank.window(rng, bitmap.width, bitmap.height)[..., :3], -half, +half)
+            values = (np.clip(base + noise, 0.0, 1.0) * 255).astype(np.uint8)
+            if skip_transparent:
+                visible = pixels[..., 3] != 0
+                pixels[visible, :3] = values[visible]
+            else:
+                pixels[..., :3] = values
+            return
+
+        if skip_transparent:
+            xs, ys = np.nonzero(pixels[..., 3].T)  # visible pixels, x-major
+            noise = NoiseField.uniform(rng, -half, +half, len(xs) * 3).reshape(-1, 3)
+            values = np.clip(base + noise, 0.0, 1.0)
+            pixels[ys, xs, :3] = (values * 255).astype(np.uint8)
+            return
+
+        noise = NoiseField.uniform(rng, -half, +half, bitmap.width * bitmap.height * 3)
+        values = np.clip(base + noise.reshape(bitmap.width, bitmap.height, 3), 0.0, 1.0)
+        pixels[..., :3] = (values * 255).astype(np.uint8).transpose(1, 0, 2)
+
     # --------------------------------------------------------------
     # multiply_alpha (0–1 logic)
     # --------------------------------------------------------------
     @classmethod
-    def multiply_alpha(cls, bitmap: Bitmap, base: float, alpha_noise: float) -> None:
+    def multiply_alpha(
+        cls,
+        bitmap: Bitmap | ArrayBitmap,
+        base: float,
+        alpha_noise: float,
+        rng: random.Random | None = None,
+        noise_bank: NoiseBank | None = None,
+    ) -> None:
         """
         Multiply alpha by a noisy factor, with all math in 0–1 space:
 
             factor = base ± (alpha_noise / 2)
 
         If original alpha is 0, it remains 0.
+        Noise is drawn from `rng` (default: the global random module),
+        or is channel 3 of one noise_bank window picked with `rng`.
+
+        An ArrayBitmap is updated in place by _multiply_alpha_array,
+        with exactly the same result and rng state afterwards.
         """
+        if isinstance(bitmap, ArrayBitmap):
+            cls._multiply_alpha_array(bitmap, base, alpha_noise, rng, noise_bank)
+            return
+
+        if rng is None:
+            rng = random
         half = alpha_noise / 2.0
+        spread = half - -half  # rng.uniform(-half, +half) == -half + spread * rng.random()
 
         w, h = bitmap.width, bitmap.height
+        bank = noise_bank.window(rng, w, h).tolist() if noise_bank is not None else None
 
         for x in range(w):
             for y in range(h):
@@ -75,7 +175,10 @@ class ImageUtility:
                     continue
 
                 # noisy factor
-                factor = base + random.uniform(-half, +half)
+                if bank is None:
+                    factor = base + rng.uniform(-half, +half)
+                else:
+                    factor = base + (-half + spread * bank[y][x][3])
                 factor = max(0.0, min(1.0, factor))
 
                 new_alpha_f = orig_alpha_f * factor
@@ -87,3 +190,30 @@ class ImageUtility:
                     px.bi,
                     new_alpha_i,
                 )
+
+    @classmethod
+    def _multiply_alpha_array(
+        cls,
+        bitmap: ArrayBitmap,
+        base: float,
+        alpha_noise: float,
+        rng: random.Random | None,
+        noise_bank: NoiseBank | None = None,
+    ) -> None:
+        """
+        multiply_alpha as array operations: the noisy factor is drawn only
+        for pixels with alpha > 0, in the loop's x-then-y order (a boolean
+        mask over the transposed alpha view), then multiplied and truncated
+        back into the alpha channel in one pass.
+        """
+        half = alpha_noise / 2.0
+        alpha = bitmap.pixels[..., 3].T  # (x, y) view onto the alpha channel
+        visible = alpha != 0
+
+        if noise_bank is not None:
+            window = noise_bank.window(rng, bitmap.width, bitmap.height)[..., 3].T
+            noise = NoiseField.scale(window[visible], -half, +half)
+        else:
+            noise = NoiseField.uniform(rng, -half, +half, int(np.count_nonzero(visible)))
+        factor = np.clip(base + noise, 0.0, 1.0)
+        alpha[visible] = (alpha[visible] / 255.0 * factor * 255).astype(np.uint8)
@@ -0,0 +1,28 @@
+# kernel_backend.py
+from __future__ import annotations
+from enum import Enum
+
+
+class KernelBackend(Enum):
+    """
+    How Runner draws a sample (RunnerParams.kernels).
+
+        REFERENCE  Bitmap images; every glyph is recolored, alpha-multiplied,
+                   stamped and traced by the per-pixel loops
+        ARRAY      ArrayBitmap images; every glyph is one GlyphCompositor.place
+
+    Both write identical PNGs and annotations for the same seed.
+    """
+
+    REFERENCE = "reference"
+    ARRAY = "array"
+
+    @classmethod
+    def parse(cls, value: "KernelBackend | str") -> "KernelBackend":
+        if isinstance(value, KernelBackend):
+            return value
+        try:
+            return cls(str(value).strip().lower())
+        except ValueError:
+            names = ", ".join(backend.value for backend in cls)
+            raise ValueError(f"Unknown kernels '{value}' (expected one of: {names})")
@@ -0,0 +1,477 @@
+# annotation_binary_store.py
+from __future__ import annotations
+
+import argparse
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from filesystem.dataset_index import DatasetIndex
+from filesystem.file_io import FileIO, PathLike
+from labels.annotation_format import AnnotationFormat
+from labels.data_label import DataLabel
+from labels.data_label_collection import DataLabelCollection
+from labels.image_annotation_document import ImageAnnotationDocument
+from labels.image_annotation_header import ImageAnnotationHeader
+from labels.image_annotation_reader import ImageAnnotationReader
+from labels.pixel_bag import PixelBag
+from labels.pixel_bag_run_length import PixelBagRunLength
+
+# ----------------------------------------------------------------------
+# File layout (all little-endian, every section 8-byte aligned):
+#
+#   header        _HEADER struct (magic, version, counts, section offsets)
+#   documents     _DOC_DTYPE[document_count]
+#   labels        _LABEL_DTYPE[label_count]     (grouped by document)
+#   strings       _STRING_DTYPE[string_count]   (offset/length into blob)
+#   stripes       int32[stripe_count, 3]        (y, x_start, x_end)
+#   string blob   UTF-8 bytes
+# ----------------------------------------------------------------------
+
+_MAGIC = b"CFAB"
+_VERSION = 1
+
+# magic, version, document_count, label_count, string_count, stripe_count,
+# documents_offset, labels_offset, strings_offset, stripes_offset, blob_offset
+_HEADER = struct.Struct("<4sIIIIQQQQQQ")
+
+_DOC_DTYPE = np.dtype([
+    ("name_id", "<u4"),
+    ("width", "<i4"),
+    ("height", "<i4"),
+    ("label_count", "<u4"),
+    ("first_label", "<u8"),
+])
+
+_LABEL_DTYPE = np.dtype([
+    ("name_id", "<u4"),
+    ("stripe_count", "<u4"),
+    ("first_stripe", "<u8"),
+])
+
+_STRING_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("length", "<u8"),
+])
+
+_STRIPE_DTYPE = np.dtype("<i4")
+
+# (name, width, height, [(label_name, stripes[n, 3]), ...])
+DocumentRecord = Tuple[str, int, int, List[Tuple[str, np.ndarray]]]
+
+
+def _align8(value: int) -> int:
+    return (value + 7) & ~7
+
+
+def _stripes_array(rle: PixelBagRunLength) -> np.ndarray:
+    return np.asarray(rle.to_flat(), dtype=_STRIPE_DTYPE).reshape(-1, 3)
+
+
+# ----------------------------------------------------------------------
+# Zero-copy views
+# ----------------------------------------------------------------------
+
+class DataLabelView:
+    """
+    Read-only DataLabel backed by a slice of the store's stripe array.
+
+    `stripes` is an (n, 3) int32 view (y, x_start, x_end) directly into
+    the memory map; nothing is copied until to_data_label() is called.
+    """
+
+    __slots__ = ("name", "stripes")
+
+    def __init__(self, name: str, stripes: np.ndarray) -> None:
+        self.name: str = name
+        self.stripes: np.ndarray = stripes
+
+    @property
+    def pixel_count(self) -> int:
+        if len(self.stripes) == 0:
+            return 0
+        return int((self.stripes[:, 2] - self.stripes[:, 1] + 1).sum())
+
+    def contains(self, x: int, y: int) -> bool:
+        rows = self.stripes[self.stripes[:, 0] == y]
+        return bool(np.any((rows[:, 1] <= x) & (x <= rows[:, 2])))
+
+    def to_run_length(self) -> PixelBagRunLength:
+        return PixelBagRunLength.from_flat(self.stripes.ravel().tolist())
+
+    def to_data_label(self) -> DataLabel:
+        """
+        Materialize a regular, mutable DataLabel (expands every pixel).
+        """
+        return DataLabel(name=self.name, pixel_bag=PixelBag.from_run_length(self.to_run_length()))
+
+    def to_json(self, format: AnnotationFormat | str = AnnotationFormat.JSON) -> Dict[str, Any]:
+        fmt = AnnotationFormat.parse(format)
+        rle = self.to_run_length()
+        if fmt == AnnotationFormat.JSON:
+            stripes: Any = rle.to_json()
+        elif fmt == AnnotationFormat.FLAT:
+            stripes = rle.to_flat()
+        else:
+            stripes = rle.to_packed()
+        return {"name": self.name, fmt.pixels_key(): stripes}
+
+    def __repr__(self) -> str:
+        return f'DataLabelView(name="{self.name}", stripes={len(self.stripes)}, count={self.pixel_count})'
+
+
+class ImageAnnotationDocumentView:
+    """
+    Read-only ImageAnnotationDocument over one entry of an
+    AnnotationBinaryStore. Labels are DataLabelView objects.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        width: int,
+        height: int,
+        labels: List[DataLabelView],
+        stripes: np.ndarray,
+    ) -> None:
+        self.name: str = name
+        self.width: int = int(width)
+        self.height: int = int(height)
+        self.labels: List[DataLabelView] = labels
+        # All of this document's stripes, contiguous (labels are adjacent).
+        self.stripes: np.ndarray = stripes
+
+    @property
+    def data_label_names(self) -> List[str]:
+        return sorted({label.name for label in self.labels})
+
+    @property
+    def header(self) -> ImageAnnotationHeader:
+        return ImageAnnotationHeader(
+            name=self.name,
+            width=self.width,
+            height=self.height,
+            data_label_names=self.data_label_names,
+        )
+
+    def to_document(self) -> ImageAnnotationDocument:
+        """
+        Materialize a regular ImageAnnotationDocument (expands every pixel).
+        """
+        labels = [label.to_data_label() for label in self.labels]
+        return ImageAnnotationDocument(self.name, self.width, self.height, DataLabelCollection(labels))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __iter__(self) -> Iterator[DataLabelView]:
+        return iter(self.labels)
+
+    def __repr__(self) -> str:
+        return (
+            f'ImageAnnotationDocumentView(name="{self.name}", '
+            f"size=({self.width}, {self.height}), "
+            f"data_label_names={self.data_label_names}, "
+            f"label_count={len(self.labels)})"
+        )
+
+
+# ----------------------------------------------------------------------
+# Store
+# ----------------------------------------------------------------------
+
+class AnnotationBinaryStore:
+    """
+    One memory-mapped file holding every annotation document of a split.
+
+    Opening the store reads only the fixed-size header; store[i] then
+    finds document i through the offset tables and returns views into
+    the packed int32 stripe array without parsing any other document.
+
+    Usage:
+        AnnotationBinaryStore.write_local_split("training")
+        with AnnotationBinaryStore.open_local_split("training") as store:
+            view = store[17]
+            for label in view:
+                label.stripes   # (n, 3) int32, zero-copy
+
+    Views keep the memory map alive; drop them before close().
+
+    From the project root:
+        python -m labels.annotation_binary_store training testing
+    """
+
+    EXTENSION = "annotations.bin"
+
+    def __init__(self, file_path: PathLike) -> None:
+        self.path: Path = Path(file_path).resolve()
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            document_count,
+            label_count,
+            string_count,
+            stripe_count,
+            documents_offset,
+            labels_offset,
+            strings_offset,
+            stripes_offset,
+            blob_offset,
+        ) = _HEADER.unpack_from(self._mmap, 0)
+
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"Not an annotation store: {self.path}")
+        if version != _VERSION:
+            self.close()
+            raise ValueError(f"Unsupported annotation store version {version}: {self.path}")
+
+        buffer = self._mmap
+        self._documents = np.frombuffer(buffer, _DOC_DTYPE, document_count, documents_offset)
+        self._labels = np.frombuffer(buffer, _LABEL_DTYPE, label_count, labels_offset)
+        self._strings = np.frombuffer(buffer, _STRING_DTYPE, string_count, strings_offset)
+        self._stripes = np.frombuffer(buffer, _STRIPE_DTYPE, stripe_count * 3, stripes_offset).reshape(-1, 3)
+        self._blob_offset = blob_offset
+        self._string_cache: Dict[int, str] = {}
+
+    @classmethod
+    def open_local_split(cls, split: str) -> "AnnotationBinaryStore":
+        return cls(cls.local_split_path(split))
+
+    @classmethod
+    def local_split_path(cls, split: str) -> Path:
+        return FileIO.local_file(None, FileIO.local_directory(split).name, cls.EXTENSION)
+
+    # --------------------------------------------------
+    # Lifetime
+    # --------------------------------------------------
+    def close(self) -> None:
+        self._documents = None
+        self._labels = None
+        self._strings = None
+        self._stripes = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views are still alive; the map is released with the last one.
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "AnnotationBinaryStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --------------------------------------------------
+    # Random access
+    # --------------------------------------------------
+    def _string(self, string_id: int) -> str:
+        cached = self._string_cache.get(string_id)
+        if cached is None:
+            entry = self._strings[string_id]
+            start = self._blob_offset + int(entry["offset"])
+            cached = self._mmap[start:start + int(entry["length"])].decode("utf-8")
+            self._string_cache[string_id] = cached
+        return cached
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __getitem__(self, index: int) -> ImageAnnotationDocumentView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"document index {index} out of range")
+
+        doc = self._documents[index]
+        first_label = int(doc["first_label"])
+        label_rows = self._labels[first_label:first_label + int(doc["label_count"])]
+
+        labels: List[DataLabelView] = []
+        for row in label_rows:
+            first = int(row["first_stripe"])
+            labels.append(DataLabelView(
+                self._string(int(row["name_id"])),
+                self._stripes[first:first + int(row["stripe_count"])],
+            ))
+
+        if len(label_rows) > 0:
+            doc_start = int(label_rows[0]["first_stripe"])
+            doc_end = int(label_rows[-1]["first_stripe"]) + int(label_rows[-1]["stripe_count"])
+        else:
+            doc_start = doc_end = 0
+
+        return ImageAnnotationDocumentView(
+            self._string(int(doc["name_id"])),
+            int(doc["width"]),
+            int(doc["height"]),
+            labels,
+            self._stripes[doc_start:doc_end],
+        )
+
+    def __iter__(self) -> Iterator[ImageAnnotationDocumentView]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def names(self) -> List[str]:
+        return [self._string(int(doc["name_id"])) for doc in self._documents]
+
+    def index_of(self, name: str) -> int:
+        """
+        Linear lookup of a document by name. Raises KeyError if absent.
+        """
+        for index, doc in enumerate(self._documents):
+            if self._string(int(doc["name_id"])) == name:
+                return index
+        raise KeyError(name)
+
+    # --------------------------------------------------
+    # Writing
+    # --------------------------------------------------
+    @classmethod
+    def write(cls, file_path: PathLike, documents: Iterable[ImageAnnotationDocument]) -> Path:
+        """
+        Write in-memory documents to a new store file.
+        """
+        records = (
+            (
+                doc.name,
+                doc.width,
+                doc.height,
+                [(label.name, _stripes_array(label.pixel_bag.to_run_length())) for label in doc.data],
+            )
+            for doc in documents
+        )
+        return cls.write_records(file_path, records)
+
+    @classmethod
+    def write_annotation_files(cls, file_path: PathLike, annotation_paths: Sequence[PathLike]) -> Path:
+        """
+        Build a store straight from annotation JSON files (any
+        AnnotationFormat). Stripes are streamed, never expanded to pixels.
+        """
+        def records() -> Iterator[DocumentRecord]:
+            for path in annotation_paths:
+                header = ImageAnnotationReader.read_header(path)
+                labels = [
+                    (item.get("name", ""), _stripes_array(DataLabel.run_length_from_json(item)))
+                    for item in ImageAnnotationReader.iter_label_json(path)
+                ]
+                yield (header.name, header.width, header.height, labels)
+
+        return cls.write_records(file_path, records())
+
+    @classmethod
+    def write_local_split(cls, split: str) -> Path:
+        """
+        Pack every *_annotations.json in a project folder (e.g. "training")
+        into <split>.annotations.bin next to it, sorted by file name.
+        """
+        paths = DatasetIndex.open_local(split).paths("_annotations.json")
+        return cls.write_annotation_files(cls.local_split_path(split), paths)
+
+    @classmethod
+    def write_records(cls, file_path: PathLike, records: Iterable[DocumentRecord]) -> Path:
+        string_ids: Dict[str, int] = {}
+        strings: List[bytes] = []
+
+        def intern(text: str) -> int:
+            string_id = string_ids.get(text)
+            if string_id is None:
+                string_id = len(strings)
+                string_ids[text] = string_id
+                strings.append(text.encode("utf-8"))
+            return string_id
+
+        doc_rows: List[Tuple[int, int, int, int, int]] = []
+        label_rows: List[Tuple[int, int, int]] = []
+        stripe_chunks: List[np.ndarray] = []
+        stripe_count = 0
+
+        for name, width, height, labels in records:
+            doc_rows.append((intern(name), int(width), int(height), len(labels), len(label_rows)))
+            for label_name, stripes in labels:
+                stripes = np.asarray(stripes, dtype=_STRIPE_DTYPE).reshape(-1, 3)
+                label_rows.append((intern(label_name), len(stripes), stripe_count))
+                stripe_chunks.append(stripes)
+                stripe_count += len(stripes)
+
+        documents = np.array(doc_rows, dtype=_DOC_DTYPE)
+        labels_table = np.array(label_rows, dtype=_LABEL_DTYPE)
+        if stripe_chunks:
+            stripes_table = np.ascontiguousarray(np.concatenate(stripe_chunks), dtype=_STRIPE_DTYPE)
+        else:
+            stripes_table = np.zeros((0, 3), dtype=_STRIPE_DTYPE)
+
+        string_table = np.zeros(len(strings), dtype=_STRING_DTYPE)
+        blob_cursor = 0
+        for i, data in enumerate(strings):
+            string_table[i] = (blob_cursor, len(data))
+            blob_cursor += len(data)
+
+        documents_offset = _align8(_HEADER.size)
+        labels_offset = _align8(documents_offset + documents.nbytes)
+        strings_offset = _align8(labels_offset + labels_table.nbytes)
+        stripes_offset = _align8(strings_offset + string_table.nbytes)
+        blob_offset = _align8(stripes_offset + stripes_table.nbytes)
+
+        header = _HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            len(documents),
+            len(labels_table),
+            len(strings),
+            stripe_count,
+            documents_offset,
+            labels_offset,
+            strings_offset,
+            stripes_offset,
+            blob_offset,
+        )
+
+        path = Path(file_path).resolve()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            for offset, data in (
+                (0, header),
+                (documents_offset, documents.tobytes()),
+                (labels_offset, labels_table.tobytes()),
+                (strings_offset, string_table.tobytes()),
+                (stripes_offset, stripes_table.tobytes()),
+                (blob_offset, b"".join(strings)),
+            ):
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(data)
+        return path
+
+    def __repr__(self) -> str:
+        return f'AnnotationBinaryStore(path="{self.path}", documents={len(self)})'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Pack a split's annotation JSON files into one memory-mappable store.",
+    )
+    parser.add_argument("splits", nargs="*", default=["training", "testing"])
+    args = parser.parse_args()
+
+    for split in args.splits:
+        path = AnnotationBinaryStore.write_local_split(split)
+        with AnnotationBinaryStore(path) as store:
+            count = len(store)
+        print(f"{split}: {count} documents -> {path} ({path.stat().st_size / 1e6:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
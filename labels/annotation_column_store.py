@@ -0,0 +1,377 @@
+# annotation_column_store.py
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from filesystem.dataset_index import ANNOTATION_SUFFIX, DatasetIndex
+from filesystem.file_io import PathLike
+from labels.annotation_binary_store import AnnotationBinaryStore
+from labels.data_label import DataLabel
+from labels.data_label_collection import DataLabelCollection
+from labels.image_annotation_document import ImageAnnotationDocument
+from labels.image_annotation_reader import ImageAnnotationReader
+from labels.pixel_bag import PixelBag
+from labels.pixel_bag_run_length import PixelBagRunLength
+
+# (name, width, height, [(label_name, flat stripe list or (n, 3) array), ...])
+ColumnRecord = Tuple[str, int, int, List[Tuple[str, Sequence[int] | np.ndarray]]]
+
+
+class AnnotationColumnStore:
+    """
+    Every annotation of a split as a handful of flat arrays.
+
+    Stripes (all documents, all labels, concatenated):
+        stripe_y, stripe_x_start, stripe_x_end           int32[S]
+    Labels:
+        label_stripe_offsets  int64[L + 1]   label i owns stripes [o[i], o[i+1])
+        label_class           int32[L]       index into class_names
+        label_doc             int32[L]       owning document
+    Documents:
+        doc_label_offsets     int64[D + 1]   document j owns labels [o[j], o[j+1])
+        doc_width, doc_height int32[D]
+        doc_names             List[str]
+    Classes:
+        class_names           List[str]      sorted
+
+    Nothing is expanded into PixelBag objects, so a whole split costs a
+    few bytes per stripe. All statistics are numpy reductions over the
+    entire split at once.
+
+    Usage:
+        store = AnnotationColumnStore.from_local_split("training")
+        store.class_area()        # {"Blue": ..., "Green": ..., "Red": ...}
+        store.count_histograms()  # {"Blue": [docs with 0, 1, 2, ... labels], ...}
+    """
+
+    def __init__(
+        self,
+        doc_names: List[str],
+        doc_width: np.ndarray,
+        doc_height: np.ndarray,
+        doc_label_offsets: np.ndarray,
+        class_names: List[str],
+        label_class: np.ndarray,
+        label_stripe_offsets: np.ndarray,
+        stripe_y: np.ndarray,
+        stripe_x_start: np.ndarray,
+        stripe_x_end: np.ndarray,
+    ) -> None:
+        self.doc_names: List[str] = doc_names
+        self.doc_width: np.ndarray = np.asarray(doc_width, dtype=np.int32)
+        self.doc_height: np.ndarray = np.asarray(doc_height, dtype=np.int32)
+        self.doc_label_offsets: np.ndarray = np.asarray(doc_label_offsets, dtype=np.int64)
+        self.class_names: List[str] = class_names
+        self.label_class: np.ndarray = np.asarray(label_class, dtype=np.int32)
+        self.label_stripe_offsets: np.ndarray = np.asarray(label_stripe_offsets, dtype=np.int64)
+        self.stripe_y: np.ndarray = np.asarray(stripe_y, dtype=np.int32)
+        self.stripe_x_start: np.ndarray = np.asarray(stripe_x_start, dtype=np.int32)
+        self.stripe_x_end: np.ndarray = np.asarray(stripe_x_end, dtype=np.int32)
+
+        self.label_doc: np.ndarray = np.repeat(
+            np.arange(self.document_count, dtype=np.int32),
+            np.diff(self.doc_label_offsets),
+        )
+
+    # --------------------------------------------------
+    # Builders
+    # --------------------------------------------------
+    @classmethod
+    def from_records(cls, records: Iterable[ColumnRecord]) -> "AnnotationColumnStore":
+        doc_names: List[str] = []
+        doc_width: List[int] = []
+        doc_height: List[int] = []
+        doc_label_offsets: List[int] = [0]
+        label_names: List[str] = []
+        label_stripe_offsets: List[int] = [0]
+        stripe_chunks: List[np.ndarray] = []
+
+        for name, width, height, labels in records:
+            doc_names.append(name)
+            doc_width.append(int(width))
+            doc_height.append(int(height))
+            for label_name, stripes in labels:
+                stripes = np.asarray(stripes, dtype=np.int32).reshape(-1, 3)
+                label_names.append(label_name)
+                stripe_chunks.append(stripes)
+                label_stripe_offsets.append(label_stripe_offsets[-1] + len(stripes))
+            doc_label_offsets.append(len(label_names))
+
+        class_names = sorted(set(label_names))
+        class_ids = {name: i for i, name in enumerate(class_names)}
+        label_class = np.fromiter((class_ids[n] for n in label_names), dtype=np.int32, count=len(label_names))
+
+        if stripe_chunks:
+            stripes_all = np.concatenate(stripe_chunks)
+        else:
+            stripes_all = np.zeros((0, 3), dtype=np.int32)
+
+        return cls(
+            doc_names=doc_names,
+            doc_width=np.array(doc_width, dtype=np.int32),
+            doc_height=np.array(doc_height, dtype=np.int32),
+            doc_label_offsets=np.array(doc_label_offsets, dtype=np.int64),
+            class_names=class_names,
+            label_class=label_class,
+            label_stripe_offsets=np.array(label_stripe_offsets, dtype=np.int64),
+            stripe_y=np.ascontiguousarray(stripes_all[:, 0]),
+            stripe_x_start=np.ascontiguousarray(stripes_all[:, 1]),
+            stripe_x_end=np.ascontiguousarray(stripes_all[:, 2]),
+        )
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[ImageAnnotationDocument]) -> "AnnotationColumnStore":
+        return cls.from_records(
+            (
+                doc.name,
+                doc.width,
+                doc.height,
+                [(label.name, label.pixel_bag.to_run_length().to_flat()) for label in doc.data],
+            )
+            for doc in documents
+        )
+
+    @classmethod
+    def from_annotation_files(cls, annotation_paths: Sequence[PathLike]) -> "AnnotationColumnStore":
+        """
+        Stream annotation JSON files (any AnnotationFormat) straight into
+        columns; labels are decoded to stripes only.
+        """
+        def records():
+            for path in annotation_paths:
+                header = ImageAnnotationReader.read_header(path)
+                labels = [
+                    (item.get("name", ""), DataLabel.run_length_from_json(item).to_flat())
+                    for item in ImageAnnotationReader.iter_label_json(path)
+                ]
+                yield (header.name, header.width, header.height, labels)
+
+        return cls.from_records(records())
+
+    @classmethod
+    def from_local_split(cls, split: str) -> "AnnotationColumnStore":
+        return cls.from_annotation_files(DatasetIndex.open_local(split).paths(ANNOTATION_SUFFIX))
+
+    @classmethod
+    def from_binary_store(cls, store: AnnotationBinaryStore) -> "AnnotationColumnStore":
+        """
+        Copy an AnnotationBinaryStore into columns (no JSON involved).
+        """
+        return cls.from_records(
+            (view.name, view.width, view.height, [(label.name, label.stripes) for label in view])
+            for view in store
+        )
+
+    # --------------------------------------------------
+    # Sizes
+    # --------------------------------------------------
+    @property
+    def document_count(self) -> int:
+        return len(self.doc_names)
+
+    @property
+    def label_count(self) -> int:
+        return len(self.label_class)
+
+    @property
+    def stripe_count(self) -> int:
+        return len(self.stripe_y)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes held by the numpy columns (names excluded).
+        """
+        arrays = (
+            self.doc_width, self.doc_height, self.doc_label_offsets,
+            self.label_class, self.label_doc, self.label_stripe_offsets,
+            self.stripe_y, self.stripe_x_start, self.stripe_x_end,
+        )
+        return int(sum(a.nbytes for a in arrays))
+
+    def __len__(self) -> int:
+        return self.document_count
+
+    # --------------------------------------------------
+    # Per-stripe / per-label columns
+    # --------------------------------------------------
+    def stripe_lengths(self) -> np.ndarray:
+        return (self.stripe_x_end - self.stripe_x_start + 1).astype(np.int64)
+
+    def stripe_label(self) -> np.ndarray:
+        """
+        Owning label index of every stripe.
+        """
+        return np.repeat(
+            np.arange(self.label_count, dtype=np.int32),
+            np.diff(self.label_stripe_offsets),
+        )
+
+    def label_area(self) -> np.ndarray:
+        """
+        Pixel count of every label, int64[L].
+        """
+        return np.bincount(
+            self.stripe_label(),
+            weights=self.stripe_lengths(),
+            minlength=self.label_count,
+        ).astype(np.int64)
+
+    def label_bounds(self) -> np.ndarray:
+        """
+        Inclusive (xmin, ymin, xmax, ymax) of every label, int32[L, 4].
+        Labels without stripes get (0, 0, -1, -1).
+        """
+        result = np.zeros((self.label_count, 4), dtype=np.int32)
+        result[:, 2:] = -1
+
+        counts = np.diff(self.label_stripe_offsets)
+        nonempty = counts > 0
+        if not np.any(nonempty):
+            return result
+
+        starts = self.label_stripe_offsets[:-1][nonempty]
+        result[nonempty, 0] = np.minimum.reduceat(self.stripe_x_start, starts)
+        result[nonempty, 1] = np.minimum.reduceat(self.stripe_y, starts)
+        result[nonempty, 2] = np.maximum.reduceat(self.stripe_x_end, starts)
+        result[nonempty, 3] = np.maximum.reduceat(self.stripe_y, starts)
+        return result
+
+    def label_frames(self) -> np.ndarray:
+        """
+        (x, y, width, height) of every label, matching PixelBag.frame.
+        """
+        bounds = self.label_bounds()
+        frames = np.empty_like(bounds)
+        frames[:, 0] = bounds[:, 0]
+        frames[:, 1] = bounds[:, 1]
+        frames[:, 2] = bounds[:, 2] - bounds[:, 0] + 1
+        frames[:, 3] = bounds[:, 3] - bounds[:, 1] + 1
+        return frames
+
+    # --------------------------------------------------
+    # Per-class reductions over the whole split
+    # --------------------------------------------------
+    def _per_class(self, values: np.ndarray) -> Dict[str, int]:
+        return {name: int(values[i]) for i, name in enumerate(self.class_names)}
+
+    def class_label_count(self) -> Dict[str, int]:
+        counts = np.bincount(self.label_class, minlength=len(self.class_names))
+        return self._per_class(counts)
+
+    def class_area(self) -> Dict[str, int]:
+        """
+        Total labelled pixels per class across the split.
+        """
+        area = np.bincount(
+            self.label_class,
+            weights=self.label_area(),
+            minlength=len(self.class_names),
+        )
+        return self._per_class(area.astype(np.int64))
+
+    def class_bounds(self) -> Dict[str, Tuple[int, int, int, int]]:
+        """
+        Union (xmin, ymin, xmax, ymax) of every label of each class.
+        """
+        bounds = self.label_bounds()
+        has_pixels = bounds[:, 2] >= bounds[:, 0]
+        result: Dict[str, Tuple[int, int, int, int]] = {}
+        for i, name in enumerate(self.class_names):
+            rows = bounds[(self.label_class == i) & has_pixels]
+            if len(rows) == 0:
+                continue
+            result[name] = (
+                int(rows[:, 0].min()),
+                int(rows[:, 1].min()),
+                int(rows[:, 2].max()),
+                int(rows[:, 3].max()),
+            )
+        return result
+
+    def document_class_counts(self) -> np.ndarray:
+        """
+        Labels per (document, class), int64[D, C].
+        """
+        classes = len(self.class_names)
+        flat = self.label_doc.astype(np.int64) * classes + self.label_class
+        counts = np.bincount(flat, minlength=self.document_count * classes)
+        return counts.reshape(self.document_count, classes)
+
+    def document_class_area(self) -> np.ndarray:
+        """
+        Labelled pixels per (document, class), int64[D, C].
+        """
+        classes = len(self.class_names)
+        flat = self.label_doc.astype(np.int64) * classes + self.label_class
+        area = np.bincount(flat, weights=self.label_area(), minlength=self.document_count * classes)
+        return area.astype(np.int64).reshape(self.document_count, classes)
+
+    def count_histograms(self) -> Dict[str, np.ndarray]:
+        """
+        For each class, hist[k] = number of documents with exactly k
+        labels of that class. An "all" entry covers every class.
+        """
+        counts = self.document_class_counts()
+        result = {
+            name: np.bincount(counts[:, i])
+            for i, name in enumerate(self.class_names)
+        }
+        result["all"] = np.bincount(counts.sum(axis=1)) if self.document_count else np.zeros(0, dtype=np.int64)
+        return result
+
+    def area_histograms(self, bins: int | Sequence[int] = 16) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        np.histogram of label areas for each class: (counts, bin_edges).
+        """
+        area = self.label_area()
+        return {
+            name: np.histogram(area[self.label_class == i], bins=bins)
+            for i, name in enumerate(self.class_names)
+        }
+
+    # --------------------------------------------------
+    # Back to per-document objects
+    # --------------------------------------------------
+    def document_stripes(self, index: int) -> np.ndarray:
+        """
+        All stripes of one document as an (n, 3) int32 array (a copy).
+        """
+        first_label = self.doc_label_offsets[index]
+        last_label = self.doc_label_offsets[index + 1]
+        start = self.label_stripe_offsets[first_label]
+        end = self.label_stripe_offsets[last_label]
+        return np.stack(
+            (self.stripe_y[start:end], self.stripe_x_start[start:end], self.stripe_x_end[start:end]),
+            axis=1,
+        )
+
+    def to_document(self, index: int) -> ImageAnnotationDocument:
+        """
+        Materialize one document as a regular ImageAnnotationDocument.
+        """
+        labels: List[DataLabel] = []
+        for label in range(int(self.doc_label_offsets[index]), int(self.doc_label_offsets[index + 1])):
+            start = int(self.label_stripe_offsets[label])
+            end = int(self.label_stripe_offsets[label + 1])
+            flat = np.stack(
+                (self.stripe_y[start:end], self.stripe_x_start[start:end], self.stripe_x_end[start:end]),
+                axis=1,
+            ).ravel().tolist()
+            bag = PixelBag.from_run_length(PixelBagRunLength.from_flat(flat))
+            labels.append(DataLabel(self.class_names[self.label_class[label]], bag))
+        return ImageAnnotationDocument(
+            self.doc_names[index],
+            int(self.doc_width[index]),
+            int(self.doc_height[index]),
+            DataLabelCollection(labels),
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"AnnotationColumnStore(documents={self.document_count}, "
+            f"labels={self.label_count}, stripes={self.stripe_count}, "
+            f"classes={self.class_names}, nbytes={self.nbytes})"
+        )
@@ -0,0 +1,66 @@
+# annotation_format.py
+from __future__ import annotations
+
+from enum import Enum
+from typing import Any, Dict
+
+
+class AnnotationFormat(Enum):
+    """
+    How a DataLabel's stripes are written inside an annotation document.
+
+        JSON    "pixels": [ { "y": ..., "x_start": ..., "x_end": ... }, ... ]
+                written with indent=2 (the original, human-readable layout)
+        FLAT    "runs":   [ y0, x_start0, x_end0, y1, ... ]
+                minified
+        PACKED  "packed": "<base64 row-delta varints>"
+                minified
+
+    All three are plain JSON text, so files keep their _annotations.json
+    name and every reader accepts any of them.
+    """
+
+    JSON = "json"
+    FLAT = "flat"
+    PACKED = "packed"
+
+    # --------------------------------------------------
+    # Lookup
+    # --------------------------------------------------
+    @classmethod
+    def parse(cls, value: "AnnotationFormat | str") -> "AnnotationFormat":
+        """
+        Accept either an AnnotationFormat or its string value.
+        Raise ValueError for unknown names.
+        """
+        if isinstance(value, AnnotationFormat):
+            return value
+        try:
+            return cls(str(value).strip().lower())
+        except ValueError:
+            names = ", ".join(fmt.value for fmt in cls)
+            raise ValueError(f"Unknown annotation format '{value}' (expected one of: {names})")
+
+    # --------------------------------------------------
+    # Per-format details
+    # --------------------------------------------------
+    def pixels_key(self) -> str:
+        """
+        The DataLabel key that holds the stripes in this format.
+        """
+        match self:
+            case AnnotationFormat.JSON:
+                return "pixels"
+            case AnnotationFormat.FLAT:
+                return "runs"
+            case AnnotationFormat.PACKED:
+                return "packed"
+        raise ValueError("Unknown AnnotationFormat")
+
+    def dumps_kwargs(self) -> Dict[str, Any]:
+        """
+        Keyword arguments for json.dumps when writing this format.
+        """
+        if self == AnnotationFormat.JSON:
+            return {"indent": 2}
+        return {"separators": (",", ":")}
@@ -0,0 +1,147 @@
+# annotation_rasterizer.py
+from __future__ import annotations
+
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from labels.image_annotation_document import ImageAnnotationDocument
+
+
+class AnnotationRasterizer:
+    """
+    Turns annotations into dense numpy masks.
+
+        class_map:   (H, W) uint8, 0 = background, k = class_names[k - 1]
+        class_masks: (C, H, W) uint8, 1 where class_names[c] is present
+
+    Labels are painted in document order, so in a class_map a label that
+    was stamped later wins where circles overlap (as it does in the image).
+    Labels whose name is not in class_names are skipped.
+
+    Usage:
+        names = ["Red", "Green", "Blue"]
+        class_map = AnnotationRasterizer.class_map(document, names)
+    """
+
+    # What readers and generators hand out per sample: the document
+    # itself, its class_map or its class_masks.
+    TARGETS = ("document", "class_map", "masks")
+
+    # --------------------------------------------------
+    # From ImageAnnotationDocument
+    # --------------------------------------------------
+    @classmethod
+    def class_map(cls, document: ImageAnnotationDocument, class_names: Sequence[str]) -> np.ndarray:
+        result = np.zeros((document.height, document.width), dtype=np.uint8)
+        class_ids = cls._class_ids(class_names)
+        for label in document.data:
+            class_id = class_ids.get(label.name)
+            if class_id is None:
+                continue
+            xs, ys = cls._points(label.pixel_bag, document.width, document.height)
+            result[ys, xs] = class_id + 1
+        return result
+
+    @classmethod
+    def class_masks(cls, document: ImageAnnotationDocument, class_names: Sequence[str]) -> np.ndarray:
+        result = np.zeros((len(class_names), document.height, document.width), dtype=np.uint8)
+        class_ids = cls._class_ids(class_names)
+        for label in document.data:
+            class_id = class_ids.get(label.name)
+            if class_id is None:
+                continue
+            xs, ys = cls._points(label.pixel_bag, document.width, document.height)
+            result[class_id, ys, xs] = 1
+        return result
+
+    # --------------------------------------------------
+    # From stripes: (label_name, int32[n, 3] of y, x_start, x_end)
+    # --------------------------------------------------
+    @classmethod
+    def class_map_from_stripes(
+        cls,
+        width: int,
+        height: int,
+        labels: Iterable[Tuple[str, np.ndarray]],
+        class_names: Sequence[str],
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """
+        Paint into `out` (H, W) if given (e.g. a memmap slice), else a new array.
+        """
+        result = out if out is not None else np.zeros((height, width), dtype=np.uint8)
+        if out is not None:
+            result[...] = 0
+        class_ids = cls._class_ids(class_names)
+        for name, stripes in labels:
+            class_id = class_ids.get(name)
+            if class_id is not None:
+                cls._paint_stripes(result, stripes, class_id + 1)
+        return result
+
+    @classmethod
+    def class_masks_from_stripes(
+        cls,
+        width: int,
+        height: int,
+        labels: Iterable[Tuple[str, np.ndarray]],
+        class_names: Sequence[str],
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """
+        Paint into `out` (C, H, W) if given, else a new array.
+        """
+        if out is not None:
+            result = out
+            result[...] = 0
+        else:
+            result = np.zeros((len(class_names), height, width), dtype=np.uint8)
+        class_ids = cls._class_ids(class_names)
+        for name, stripes in labels:
+            class_id = class_ids.get(name)
+            if class_id is not None:
+                cls._paint_stripes(result[class_id], stripes, 1)
+        return result
+
+    # --------------------------------------------------
+    # Helpers
+    # --------------------------------------------------
+    @staticmethod
+    def _class_ids(class_names: Sequence[str]) -> dict:
+        return {name: i for i, name in enumerate(class_names)}
+
+    @staticmethod
+    def _points(pixel_bag, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(pixel_bag) == 0:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty
+        points = np.fromiter(
+            (v for xy in pixel_bag for v in xy),
+            dtype=np.intp,
+            count=2 * len(pixel_bag),
+        ).reshape(-1, 2)
+        xs = points[:, 0]
+        ys = points[:, 1]
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        return xs[inside], ys[inside]
+
+    @staticmethod
+    def _paint_stripes(target: np.ndarray, stripes: np.ndarray, value: int) -> None:
+        height, width = target.shape
+        for y, x_start, x_end in np.asarray(stripes).reshape(-1, 3).tolist():
+            if 0 <= y < height:
+                x0 = max(x_start, 0)
+                x1 = min(x_end + 1, width)
+                if x0 < x1:
+                    target[y, x0:x1] = value
+
+    @classmethod
+    def class_names_in(cls, documents: Iterable[ImageAnnotationDocument]) -> List[str]:
+        """
+        Sorted union of label names across documents.
+        """
+        names = set()
+        for document in documents:
+            names.update(document.data_label_names)
+        return sorted(names)
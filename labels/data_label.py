@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 from typing import Any, Dict
+from labels.annotation_format import AnnotationFormat
 from labels.pixel_bag import PixelBag
+from labels.pixel_bag_run_length import PixelBagRunLength
 
 class DataLabel:
     """
@@ -14,6 +16,9 @@ class DataLabel:
             "name": "some_label_name",
             "pixels": [ { "y": ..., "x_start": ..., "x_end": ... }, ... ]
         }
+
+    The compact AnnotationFormat variants replace "pixels" with
+    "runs" (flat int list) or "packed" (base64 varints).
     """
 
     def __init__(self, name: str, pixel_bag: PixelBag | None = None) -> None:
@@ -39,19 +44,43 @@ class DataLabel:
     # --------------------------------------------------
     # JSON serialization
     # --------------------------------------------------
-    def to_json(self) -> Dict[str, Any]:
+    def to_json(self, format: AnnotationFormat | str = AnnotationFormat.JSON) -> Dict[str, Any]:
+        fmt = AnnotationFormat.parse(format)
+        if fmt == AnnotationFormat.JSON:
+            return {
+                "name": self.name,
+                "pixels": self.pixel_bag.to_json(),
+            }
+
+        rle = self.pixel_bag.to_run_length()
+        if fmt == AnnotationFormat.FLAT:
+            stripes: Any = rle.to_flat()
+        else:
+            stripes = rle.to_packed()
         return {
             "name": self.name,
-            "pixels": self.pixel_bag.to_json(),
+            fmt.pixels_key(): stripes,
         }
 
     @staticmethod
     def from_json(data: Dict[str, Any]) -> "DataLabel":
         name = data.get("name", "")
-        pixels_json = data.get("pixels", [])
-        bag = PixelBag.from_json(pixels_json)
+        rle = DataLabel.run_length_from_json(data)
+        bag = PixelBag.from_run_length(rle)
         return DataLabel(name=name, pixel_bag=bag)
 
+    @staticmethod
+    def run_length_from_json(data: Dict[str, Any]) -> PixelBagRunLength:
+        """
+        Decode just the stripes of a label dict, in whichever
+        AnnotationFormat it was written, without expanding pixels.
+        """
+        if "packed" in data:
+            return PixelBagRunLength.from_packed(data["packed"])
+        if "runs" in data:
+            return PixelBagRunLength.from_flat(data["runs"])
+        return PixelBagRunLength.from_json(data.get("pixels", []))
+
     # --------------------------------------------------
     # Utility / debug printing (summary style)
     # --------------------------------------------------
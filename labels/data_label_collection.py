@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Iterable
 
+from labels.annotation_format import AnnotationFormat
 from labels.data_label import DataLabel
 
 class DataLabelCollection:
@@ -55,11 +56,11 @@ class DataLabelCollection:
     # --------------------------------------------------
     # JSON serialization (array only)
     # --------------------------------------------------
-    def to_json(self) -> List[Dict[str, Any]]:
+    def to_json(self, format: AnnotationFormat | str = AnnotationFormat.JSON) -> List[Dict[str, Any]]:
         """
         Return a JSON-compatible list of label dicts, no wrapper.
         """
-        return [label.to_json() for label in self.labels]
+        return [label.to_json(format) for label in self.labels]
 
     @staticmethod
     def from_json(data: List[Dict[str, Any]]) -> "DataLabelCollection":
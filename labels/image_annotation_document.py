@@ -1,8 +1,11 @@
 # image_annotation_document.py
 from __future__ import annotations
 
+import json
 from typing import Any, Dict, List
+from labels.annotation_format import AnnotationFormat
 from labels.data_label_collection import DataLabelCollection
+from labels.image_annotation_header import ImageAnnotationHeader
 
 class ImageAnnotationDocument:
     """
@@ -40,10 +43,23 @@ class ImageAnnotationDocument:
         names = {label.name for label in self.data}
         return sorted(names)
 
+    @property
+    def header(self) -> ImageAnnotationHeader:
+        """
+        The top-level fields only, as ImageAnnotationReader.read_header
+        would return them for this document's JSON.
+        """
+        return ImageAnnotationHeader(
+            name=self.name,
+            width=self.width,
+            height=self.height,
+            data_label_names=self.data_label_names,
+        )
+
     # --------------------------------------------------
     # JSON serialization
     # --------------------------------------------------
-    def to_json(self) -> Dict[str, Any]:
+    def to_json(self, format: AnnotationFormat | str = AnnotationFormat.JSON) -> Dict[str, Any]:
         """
         Return a JSON-compatible dict representing this document.
 
@@ -54,23 +70,30 @@ class ImageAnnotationDocument:
           "width":            int,
           "height":           int,
           "data_label_names": [str, ...],
-          "labels":           [ ... DataLabel.to_json() ... ]
+          "format":           "flat" | "packed",   (compact formats only)
+          "labels":           [ ... DataLabel.to_json(format) ... ]
         }
 
         Note: data_label_names is derived from `data` at serialization time.
+        The default JSON format omits "format" so existing files are unchanged.
         """
-        return {
+        fmt = AnnotationFormat.parse(format)
+        result: Dict[str, Any] = {
             "name": self.name,
             "width": self.width,
             "height": self.height,
             "data_label_names": self.data_label_names,
-            "labels": self.data.to_json(),
         }
+        if fmt != AnnotationFormat.JSON:
+            result["format"] = fmt.value
+        result["labels"] = self.data.to_json(fmt)
+        return result
 
     @staticmethod
     def from_json(data: Dict[str, Any]) -> "ImageAnnotationDocument":
         """
         Parse an ImageAnnotationDocument from a JSON-compatible dict.
+        Labels may be in any AnnotationFormat (see DataLabel.from_json).
 
         data_label_names from JSON are currently ignored as a source of truth,
         since they can always be recomputed from the label data. They are
@@ -92,6 +115,24 @@ class ImageAnnotationDocument:
             data=dlc,
         )
 
+    # --------------------------------------------------
+    # Text serialization
+    # --------------------------------------------------
+    def dumps(self, format: AnnotationFormat | str = AnnotationFormat.JSON) -> str:
+        """
+        Serialize to JSON text: indented for AnnotationFormat.JSON,
+        minified for the compact formats.
+        """
+        fmt = AnnotationFormat.parse(format)
+        return json.dumps(self.to_json(fmt), **fmt.dumps_kwargs())
+
+    @staticmethod
+    def loads(text: str) -> "ImageAnnotationDocument":
+        """
+        Parse JSON text written in any AnnotationFormat.
+        """
+        return ImageAnnotationDocument.from_json(json.loads(text))
+
     # --------------------------------------------------
     # Debug / repr
     # --------------------------------------------------
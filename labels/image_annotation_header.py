@@ -0,0 +1,43 @@
+# image_annotation_header.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+
+@dataclass
+class ImageAnnotationHeader:
+    """
+    The cheap, top-level fields of an ImageAnnotationDocument.
+
+    Reading a header never touches the "labels" array, so it is the
+    right thing to use for inventories and listings.
+    """
+    name: str
+    width: int
+    height: int
+    data_label_names: List[str] = field(default_factory=list)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "width": int(self.width),
+            "height": int(self.height),
+            "data_label_names": list(self.data_label_names),
+        }
+
+    @staticmethod
+    def from_json(data: Dict[str, Any]) -> "ImageAnnotationHeader":
+        return ImageAnnotationHeader(
+            name=data.get("name", ""),
+            width=int(data.get("width", 0)),
+            height=int(data.get("height", 0)),
+            data_label_names=list(data.get("data_label_names", []) or []),
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f'ImageAnnotationHeader(name="{self.name}", '
+            f"size=({self.width}, {self.height}), "
+            f"data_label_names={self.data_label_names})"
+        )
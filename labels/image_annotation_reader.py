@@ -0,0 +1,223 @@
+# image_annotation_reader.py
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, TextIO
+
+from filesystem.dataset_index import DatasetIndex
+from filesystem.file_io import FileIO, PathLike
+from labels.data_label import DataLabel
+from labels.image_annotation_header import ImageAnnotationHeader
+
+_WHITESPACE = " \t\r\n"
+
+
+class _JsonStreamCursor:
+    """
+    Minimal pull-style cursor over a JSON text stream.
+
+    Structural characters ({ } [ ] , :) are consumed one at a time,
+    while complete values are decoded with json.JSONDecoder.raw_decode.
+    The buffer is refilled from the stream on demand, so only the value
+    currently being decoded has to fit in memory.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = 64 * 1024) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """
+        Append more text to the buffer, dropping what was already consumed.
+        Reads grow with the buffer so a huge value is not re-parsed
+        once per chunk. Returns False at end of stream.
+        """
+        if self._eof:
+            return False
+        pending = self._buffer[self._pos:]
+        chunk = self._stream.read(max(self._chunk_size, len(pending)))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = pending + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Return the next non-whitespace character without consuming it,
+        or "" at end of stream.
+        """
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'EOF'}'")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """
+        Decode and consume the next complete JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number that ends exactly at the buffer edge may continue
+            # in the next chunk; re-decode once more text is available.
+            if end >= len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def object_keys(self) -> Iterator[str]:
+        """
+        Walk the members of an object. Each key is yielded with the cursor
+        sitting on its value; the caller MUST consume that value (value(),
+        array_items(), ...) before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            found = self.peek()
+            self._pos += 1
+            if found == "}":
+                return
+            if found != ",":
+                raise ValueError(f"Expected ',' or '}}' but found '{found or 'EOF'}'")
+
+    def array_items(self) -> Iterator[Any]:
+        """
+        Decode the elements of an array one value at a time.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            found = self.peek()
+            self._pos += 1
+            if found == "]":
+                return
+            if found != ",":
+                raise ValueError(f"Expected ',' or ']' but found '{found or 'EOF'}'")
+
+
+class ImageAnnotationReader:
+    """
+    Lazy access to an ImageAnnotationDocument JSON file.
+
+    - read_header() returns name / width / height / data_label_names and
+      stops before the "labels" array whenever the header is complete.
+    - iter_labels() streams the labels one DataLabel at a time, so only
+      one label's stripes are ever decoded at once.
+
+    Usage:
+        header = ImageAnnotationReader.read_header(path)
+        for label in ImageAnnotationReader.iter_labels(path):
+            ...
+    """
+
+    _HEADER_KEYS = ("name", "width", "height", "data_label_names")
+    _ANNOTATION_SUFFIX = "_annotations.json"
+
+    # --------------------------------------------------
+    # Header only
+    # --------------------------------------------------
+    @classmethod
+    def read_header(cls, file_path: PathLike) -> ImageAnnotationHeader:
+        """
+        Read only the header fields of one annotation file.
+
+        Runner writes the header before "labels", so the labels are never
+        decoded. If a file has no "data_label_names", the label names are
+        collected by streaming the labels (stripes are still not expanded
+        into pixels).
+        """
+        fields: Dict[str, Any] = {}
+
+        with open(Path(file_path), "r", encoding="utf-8") as stream:
+            # The header sits in the first few hundred bytes.
+            cursor = _JsonStreamCursor(stream, chunk_size=4096)
+            for key in cursor.object_keys():
+                if key == "labels":
+                    if "data_label_names" not in fields:
+                        names = {item.get("name", "") for item in cursor.array_items()}
+                        fields["data_label_names"] = sorted(names)
+                    elif all(k in fields for k in cls._HEADER_KEYS):
+                        break
+                    else:
+                        cursor.value()
+                elif key in cls._HEADER_KEYS:
+                    fields[key] = cursor.value()
+                    if all(k in fields for k in cls._HEADER_KEYS):
+                        break
+                else:
+                    cursor.value()
+
+        return ImageAnnotationHeader.from_json(fields)
+
+    @classmethod
+    def read_headers(cls, file_paths: List[PathLike]) -> List[ImageAnnotationHeader]:
+        return [cls.read_header(path) for path in file_paths]
+
+    @classmethod
+    def inventory(cls, directory: PathLike) -> List[ImageAnnotationHeader]:
+        """
+        Read the header of every *_annotations.json file directly inside
+        directory, sorted by file name (listed via its DatasetIndex).
+        """
+        return cls.read_headers(DatasetIndex.open(directory).paths(cls._ANNOTATION_SUFFIX))
+
+    @classmethod
+    def inventory_local(cls, subdirectory: PathLike) -> List[ImageAnnotationHeader]:
+        return cls.inventory(FileIO.local_directory(subdirectory))
+
+    # --------------------------------------------------
+    # Streaming labels
+    # --------------------------------------------------
+    @classmethod
+    def iter_label_json(cls, file_path: PathLike) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the raw JSON dict of each label, one at a time.
+        """
+        with open(Path(file_path), "r", encoding="utf-8") as stream:
+            cursor = _JsonStreamCursor(stream)
+            for key in cursor.object_keys():
+                if key == "labels":
+                    yield from cursor.array_items()
+                    return
+                cursor.value()
+
+    @classmethod
+    def iter_labels(cls, file_path: PathLike) -> Iterator[DataLabel]:
+        """
+        Yield each label as a DataLabel, one at a time.
+        """
+        for item in cls.iter_label_json(file_path):
+            yield DataLabel.from_json(item)
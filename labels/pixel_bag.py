@@ -219,9 +219,16 @@ class PixelBag:
         Reconstructs all (x, y) pixels from the run-length stripes.
         """
         rle = PixelBagRunLength.from_json(data)
+        return PixelBag.from_run_length(rle)
+
+    @staticmethod
+    def from_run_length(rle: "PixelBagRunLength") -> "PixelBag":
+        """
+        Reconstruct all (x, y) pixels from run-length stripes.
+        """
         bag = PixelBag()
+        pixels = bag._set
         for stripe in rle.stripes:
-            y = stripe.y
-            for x in range(stripe.x_start, stripe.x_end + 1):
-                bag.add(x, y)
+            y = int(stripe.y)
+            pixels.update((x, y) for x in range(int(stripe.x_start), int(stripe.x_end) + 1))
         return bag
@@ -1,9 +1,20 @@
 # pixel_bag_run_length.py
 from __future__ import annotations
+import base64
 from typing import Any, Iterable, List
 
+import numpy as np
+
 from labels.pixel_bag_run_length_stripe import PixelBagRunLengthStripe
 
+
+def _zigzag(value: int) -> int:
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) if not (value & 1) else -((value + 1) >> 1)
+
 class PixelBagRunLength:
     """
     Run-length representation of a PixelBag:
@@ -24,6 +35,105 @@ class PixelBagRunLength:
         stripes = [PixelBagRunLengthStripe.from_json(item) for item in data]
         return PixelBagRunLength(stripes=stripes)
 
+    # --------------------------------------------------
+    # Compact serialization
+    # --------------------------------------------------
+    def to_flat(self) -> List[int]:
+        """
+        Flat integer list, three entries per stripe:
+            [y0, x_start0, x_end0, y1, x_start1, x_end1, ...]
+        """
+        result: List[int] = []
+        for stripe in self.stripes:
+            result.append(int(stripe.y))
+            result.append(int(stripe.x_start))
+            result.append(int(stripe.x_end))
+        return result
+
+    @staticmethod
+    def from_flat(data: List[int]) -> "PixelBagRunLength":
+        if len(data) % 3 != 0:
+            raise ValueError(f"Flat stripe list length {len(data)} is not a multiple of 3")
+        stripes = [
+            PixelBagRunLengthStripe(int(data[i]), int(data[i + 1]), int(data[i + 2]))
+            for i in range(0, len(data), 3)
+        ]
+        return PixelBagRunLength(stripes=stripes)
+
+    def to_packed(self) -> str:
+        """
+        Row-delta, varint-packed stripes as a base64 string.
+
+        Each stripe stores three zigzag varints relative to the previous
+        stripe (the first is relative to 0):
+            y - prev_y,  x_start - prev_x_start,  x_end - x_start
+        Stripes come out of PixelBag.to_run_length() sorted by row, so the
+        deltas are almost always a single byte each.
+        """
+        out = bytearray()
+        prev_y = 0
+        prev_x = 0
+        for stripe in self.stripes:
+            y = int(stripe.y)
+            x_start = int(stripe.x_start)
+            x_end = int(stripe.x_end)
+            for value in (y - prev_y, x_start - prev_x, x_end - x_start):
+                value = _zigzag(value)
+                while value >= 0x80:
+                    out.append((value & 0x7F) | 0x80)
+                    value >>= 7
+                out.append(value)
+            prev_y = y
+            prev_x = x_start
+        return base64.b64encode(bytes(out)).decode("ascii")
+
+    @staticmethod
+    def from_packed(data: str) -> "PixelBagRunLength":
+        raw = base64.b64decode(data)
+        values: List[int] = []
+        value = 0
+        shift = 0
+        for byte in raw:
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            values.append(_unzigzag(value))
+            value = 0
+            shift = 0
+        if shift != 0 or len(values) % 3 != 0:
+            raise ValueError("Truncated packed stripe data")
+
+        stripes: List[PixelBagRunLengthStripe] = []
+        y = 0
+        x_start = 0
+        for i in range(0, len(values), 3):
+            y += values[i]
+            x_start += values[i + 1]
+            stripes.append(PixelBagRunLengthStripe(y, x_start, x_start + values[i + 2]))
+        return PixelBagRunLength(stripes=stripes)
+
+    # --------------------------------------------------
+    # Dense masks
+    # --------------------------------------------------
+    @staticmethod
+    def from_mask(mask: np.ndarray, x: int = 0, y: int = 0) -> "PixelBagRunLength":
+        """
+        Stripes of the True pixels of a 2-D (rows, columns) boolean mask,
+        row by row, offset so mask[0, 0] is pixel (x, y).
+        """
+        height, width = mask.shape
+        padded = np.zeros((height, width + 2), dtype=np.int8)
+        padded[:, 1:-1] = mask
+        edges = np.diff(padded, axis=1)
+        rows, starts = np.nonzero(edges == 1)
+        _rows, ends = np.nonzero(edges == -1)  # run ends, one past the last pixel
+        stripes = [
+            PixelBagRunLengthStripe(y + int(row), x + int(start), x + int(end) - 1)
+            for row, start, end in zip(rows.tolist(), starts.tolist(), ends.tolist())
+        ]
+        return PixelBagRunLength(stripes=stripes)
+
     # --------------------------------------------------
     # Utility
     # --------------------------------------------------
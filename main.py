@@ -11,7 +11,7 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QMessageBox,
 )
-from PySide6.QtCore import QSize
+from PySide6.QtCore import QSize, QTimer
 
 from top_left_panel import TopLeftPanel
 from top_center_panel import TopCenterPanel
@@ -20,14 +20,15 @@ from middle_left_panel import MiddleLeftPanel      # <-- NEW
 from home_view import HomeView
 
 from runner_params import RunnerParams
-from runner import Runner
+from generation_pool import GenerationPool
+from generation_worker import GenerationWorker
 
 from trial import trial
 from trial2 import trial2
 from trial3 import trial3
 from trial4 import trial4
 
-from filesystem.file_io import FileIO
+from filesystem.dataset_index import DatasetIndex
 
 class MainWindow(QMainWindow):
     def __init__(self) -> None:
@@ -91,49 +92,29 @@ class MainWindow(QMainWindow):
 
         self.home_view.generate_test_requested.connect(self.on_generate_test_requested)
         self.home_view.generate_train_requested.connect(self.on_generate_train_requested)
+        self.home_view.cancel_requested.connect(self.on_cancel_requested)
+
+        # Current background run (None when idle)
+        self.generation_thread = None
+        self.generation_worker: GenerationWorker | None = None
+        self.close_pending = False  # window closes when the run's thread finishes
+
+        # Warm render processes, kept for the whole session
+        self.generation_pool = GenerationPool()
+        self.generation_pool.warm()
+
+        self.pool_timer = QTimer(self)
+        self.pool_timer.timeout.connect(self.refresh_pool_status)
+        self.pool_timer.start(1000)
+        self.refresh_pool_status()
 
         #trial()
         #trial2()
         #trial3()
         #trial4()
         
-        files = FileIO.get_all_files_local("testing")
-        print("files_a ")
-        for file in files:
-            print("=> ", file)
-
-        files = FileIO.get_all_files_local("/testing")
-        print("files_b ")
-        for file in files:
-            print("=> ", file)
-
-        files = FileIO.get_all_files_local("/testing//")
-        print("files_c ")
-        for file in files:
-            print("=> ", file)
-
-
-        files = FileIO.get_all_files_local_recursive("testing")
-        print("files_d ")
-        for file in files:
-            print("=> ", file)
-
-        files = FileIO.get_all_files_local_recursive("///testing")
-        print("files_e ")
-        for file in files:
-            print("=> ", file)
-
-        files = FileIO.get_all_files_local_recursive("////testing/////")
-        print("files_f ")
-        for file in files:
-            print("=> ", file)
-
-        pngs = [p for p in files if p.suffix.lower() == ".png"]
-
-        print("png => ")
-        for file in pngs:
-            print("=> ", file)
-
+        for folder in ("training", "testing"):
+            print(DatasetIndex.open_local(folder).summary())
 
     # ------------------------------------------------------
     # Helper: collect all params from the panels
@@ -181,22 +162,80 @@ class MainWindow(QMainWindow):
     # Handlers for HomeView signals
     # ------------------------------------------------------
     def on_generate_test_requested(self) -> None:
-        try:
-            params = self.build_runner_params()
-            params.validate()
-        except ValueError as e:
-            QMessageBox.warning(self, "Invalid parameters", str(e))
-            return
-        Runner.run_test(params)
+        self.start_generation("test")
 
     def on_generate_train_requested(self) -> None:
+        self.start_generation("train")
+
+    def on_cancel_requested(self) -> None:
+        if self.generation_worker is not None:
+            self.generation_worker.cancel()
+
+    # ------------------------------------------------------
+    # Background generation
+    # ------------------------------------------------------
+    def start_generation(self, split: str) -> None:
+        if self.generation_worker is not None:
+            return
         try:
             params = self.build_runner_params()
             params.validate()
         except ValueError as e:
             QMessageBox.warning(self, "Invalid parameters", str(e))
             return
-        Runner.run_train(params)
+
+        thread, worker = GenerationWorker.create(params, split, self.generation_pool)
+        worker.started.connect(self.home_view.show_started)
+        worker.progress.connect(self.home_view.show_progress)
+        worker.finished.connect(self.on_generation_finished)
+        worker.failed.connect(self.on_generation_failed)
+        thread.finished.connect(self.on_generation_thread_finished)
+
+        self.generation_thread = thread
+        self.generation_worker = worker
+        self.home_view.set_running(True)
+        thread.start()
+
+    def on_generation_finished(self, done: int, cancelled: bool) -> None:
+        if cancelled:
+            self.home_view.show_status(f"Cancelled after {done} samples")
+        else:
+            self.home_view.show_status(f"Done: {done} samples")
+
+    def on_generation_failed(self, message: str) -> None:
+        self.home_view.show_status("Failed")
+        if message.startswith("BrokenProcessPool"):
+            # A worker died; start fresh ones for the next run.
+            self.generation_pool.restart()
+        QMessageBox.critical(self, "Generation failed", message)
+
+    def refresh_pool_status(self) -> None:
+        self.home_view.show_pool(self.generation_pool.describe())
+
+    def on_generation_thread_finished(self) -> None:
+        self.generation_thread = None
+        self.generation_worker = None
+        self.home_view.set_running(False)
+        if self.close_pending:
+            self.close()
+
+    # How long closing the window waits for a cancelled run to stop
+    CLOSE_WAIT_MS = 5000
+
+    def closeEvent(self, event) -> None:
+        # Let an active run stop at a sample boundary before the window goes.
+        if self.generation_worker is not None:
+            self.generation_worker.cancel()
+            self.generation_thread.quit()  # ends the thread as soon as run() returns
+            if not self.generation_thread.wait(self.CLOSE_WAIT_MS):
+                # Still finishing samples in flight: close once the thread is done.
+                self.close_pending = True
+                self.home_view.show_status("Stopping…")
+                event.ignore()
+                return
+        self.pool_timer.stop()
+        self.generation_pool.shutdown()
+        super().closeEvent(event)
 
 
 def main() -> None:
@@ -0,0 +1,26 @@
+# memory_action.py
+from __future__ import annotations
+from enum import Enum
+
+
+class MemoryAction(Enum):
+    """
+    What a run does while MemoryBudget is exceeded.
+
+        WARN      print a warning when the budget is first crossed
+        THROTTLE  also keep fewer samples in flight (executor and
+                  pipeline runs) until usage drops below the budget
+    """
+
+    WARN = "warn"
+    THROTTLE = "throttle"
+
+    @classmethod
+    def parse(cls, value: "MemoryAction | str") -> "MemoryAction":
+        if isinstance(value, MemoryAction):
+            return value
+        try:
+            return cls(str(value).strip().lower())
+        except ValueError:
+            names = ", ".join(action.value for action in cls)
+            raise ValueError(f"Unknown memory action '{value}' (expected one of: {names})")
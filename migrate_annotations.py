@@ -0,0 +1,180 @@
+# migrate_annotations.py
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+from filesystem.dataset_index import ANNOTATION_SUFFIX, DatasetIndex
+from labels.annotation_format import AnnotationFormat
+from labels.data_label import DataLabel
+from labels.image_annotation_document import ImageAnnotationDocument
+
+
+@dataclass
+class MigrationResult:
+    path: str
+    old_bytes: int
+    new_bytes: int
+    old_parse_seconds: float
+    new_parse_seconds: float
+
+
+def _parse_seconds(text: str, repeats: int) -> float:
+    """
+    Best-of-N time to go from annotation text to decoded stripes.
+    Pixel expansion into PixelBag is excluded: it costs the same for
+    every format and would hide the difference.
+    """
+    best = float("inf")
+    for _ in range(max(repeats, 1)):
+        start = time.perf_counter()
+        data = json.loads(text)
+        for label in data.get("labels", []):
+            DataLabel.run_length_from_json(label)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _same_document(a: ImageAnnotationDocument, b: ImageAnnotationDocument) -> bool:
+    if (a.name, a.width, a.height) != (b.name, b.width, b.height):
+        return False
+    if len(a.data) != len(b.data):
+        return False
+    for label_a, label_b in zip(a.data, b.data):
+        if label_a.name != label_b.name:
+            return False
+        if set(label_a.pixel_bag) != set(label_b.pixel_bag):
+            return False
+    return True
+
+
+def migrate_file(
+    path: str,
+    format: str,
+    dry_run: bool = False,
+    timing_repeats: int = 3,
+) -> MigrationResult:
+    """
+    Rewrite one annotation file in `format`.
+
+    The new text is parsed back and compared pixel-for-pixel against the
+    original before anything is written; a mismatch raises ValueError and
+    leaves the file untouched. Writes go through a temp file + os.replace
+    so an interrupted migration never leaves a half-written file.
+    """
+    file_path = Path(path)
+    old_text = file_path.read_text(encoding="utf-8")
+
+    document = ImageAnnotationDocument.loads(old_text)
+    new_text = document.dumps(format)
+
+    if not _same_document(document, ImageAnnotationDocument.loads(new_text)):
+        raise ValueError(f"Lossy conversion detected, not writing: {file_path}")
+
+    result = MigrationResult(
+        path=str(file_path),
+        old_bytes=len(old_text.encode("utf-8")),
+        new_bytes=len(new_text.encode("utf-8")),
+        old_parse_seconds=_parse_seconds(old_text, timing_repeats),
+        new_parse_seconds=_parse_seconds(new_text, timing_repeats),
+    )
+
+    if not dry_run:
+        temp_path = file_path.with_name(file_path.name + ".tmp")
+        temp_path.write_text(new_text, encoding="utf-8")
+        os.replace(temp_path, file_path)
+
+    return result
+
+
+def _migrate_file_args(args) -> MigrationResult:
+    return migrate_file(*args)
+
+
+def find_annotation_files(folders: List[str]) -> List[Path]:
+    paths: List[Path] = []
+    for folder in folders:
+        paths.extend(DatasetIndex.open_local(folder).paths(ANNOTATION_SUFFIX))
+    paths.sort()
+    return paths
+
+
+def migrate(
+    folders: List[str],
+    format: str,
+    workers: int | None = None,
+    dry_run: bool = False,
+    timing_repeats: int = 3,
+) -> List[MigrationResult]:
+    """
+    Convert every *_annotations.json in the given project folders,
+    spreading files across a process pool.
+    """
+    fmt = AnnotationFormat.parse(format).value
+    paths = find_annotation_files(folders)
+    jobs = [(str(p), fmt, dry_run, timing_repeats) for p in paths]
+
+    if workers == 1:
+        return [_migrate_file_args(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_migrate_file_args, jobs, chunksize=16))
+
+
+def print_report(results: List[MigrationResult], format: str, dry_run: bool) -> None:
+    count = len(results)
+    if count == 0:
+        print("No annotation files found.")
+        return
+
+    old_bytes = sum(r.old_bytes for r in results)
+    new_bytes = sum(r.new_bytes for r in results)
+    old_parse = sum(r.old_parse_seconds for r in results)
+    new_parse = sum(r.new_parse_seconds for r in results)
+
+    verb = "Would convert" if dry_run else "Converted"
+    print(f"{verb} {count} annotation files to '{format}'")
+    print(f"  size:  {old_bytes / 1e6:.2f} MB -> {new_bytes / 1e6:.2f} MB "
+          f"({100.0 * new_bytes / max(old_bytes, 1):.1f}%)")
+    print(f"  parse: {old_parse:.3f} s -> {new_parse:.3f} s "
+          f"({old_parse / max(new_parse, 1e-9):.2f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Losslessly convert annotation JSON files to another AnnotationFormat.",
+    )
+    parser.add_argument(
+        "folders",
+        nargs="*",
+        default=["training", "testing"],
+        help="project-relative folders to convert (default: training testing)",
+    )
+    parser.add_argument(
+        "--format",
+        default=AnnotationFormat.PACKED.value,
+        choices=[fmt.value for fmt in AnnotationFormat],
+    )
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--dry-run", action="store_true", help="convert and verify, but do not write")
+    parser.add_argument("--timing-repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    results = migrate(
+        args.folders,
+        args.format,
+        workers=args.workers,
+        dry_run=args.dry_run,
+        timing_repeats=args.timing_repeats,
+    )
+    print_report(results, args.format, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# output_layout.py
+from __future__ import annotations
+from enum import Enum
+
+
+class OutputLayout(Enum):
+    """
+    Where Runner puts finished samples.
+
+        FILES   <folder>/<name>.png + <folder>/<name>_annotations.json
+                (the original layout, one pair of files per sample)
+        SHARDS  <folder>/<prefix>-00000.tar, ... + <folder>/<prefix>.index.json
+                (see ShardWriter)
+    """
+
+    FILES = "files"
+    SHARDS = "shards"
+
+    @classmethod
+    def parse(cls, value: "OutputLayout | str") -> "OutputLayout":
+        if isinstance(value, OutputLayout):
+            return value
+        try:
+            return cls(str(value).strip().lower())
+        except ValueError:
+            names = ", ".join(layout.value for layout in cls)
+            raise ValueError(f"Unknown output layout '{value}' (expected one of: {names})")
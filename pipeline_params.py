@@ -0,0 +1,40 @@
+# pipeline_params.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass
+class PipelineParams:
+    """
+    Worker and queue settings for GenerationPipeline.
+
+    Stages run in threads: rendering is pure Python and holds the GIL,
+    while PNG/zlib encoding and file writes spend most of their time in
+    C and I/O, so extra encode/write workers overlap with rendering.
+    """
+
+    render_workers: int = 1
+    label_workers: int = 1
+    encode_workers: int = 2
+    write_workers: int = 1
+
+    # Capacity of each inter-stage queue; a full queue blocks its producer.
+    queue_size: int = 8
+
+    # Seconds between queue-depth reports (0 disables them).
+    report_interval: float = 2.0
+
+    def validate(self) -> None:
+        """
+        Sanity checks. Raise ValueError if something is obviously invalid.
+        """
+        for name in ("render_workers", "label_workers", "encode_workers", "write_workers"):
+            if getattr(self, name) <= 0:
+                raise ValueError(f"{name} must be positive")
+
+        if self.queue_size <= 0:
+            raise ValueError("queue_size must be positive")
+
+        if self.report_interval < 0:
+            raise ValueError("report_interval cannot be negative")
@@ -0,0 +1,250 @@
+# run_manifest.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, TextIO
+
+from filesystem.file_io import FileIO
+from runner_params import RunnerParams
+from sample_sink import OutputLayout, SampleSink
+
+
+class RunManifest:
+    """
+    Journal of the samples a Runner.run has finished, one per line:
+
+        <folder>/<name>.run.jsonl
+        {"version": 1, "name": ..., "num_colors": 3, "params": {...}}       header
+        {"sample": "proto_cells_train_007", "index": 7, "inputs": "<sha256>",
+         "png": "<sha256>", "annotations": "<sha256>"}                        one per sample
+
+    Lines are appended and flushed as samples are written, so a crash or a
+    stop loses nothing that reached the disk (a torn last line is ignored).
+    Every run rewrites the journal once up front, keeping the entries of
+    samples it will not regenerate.
+
+    "inputs" hashes everything that determines a sample's pixels and
+    annotations: the rendering params (not the index range, output layout
+    or pipeline), the seed, name, num_colors and index. Without a seed the
+    pixels are random, so only the params are compared.
+
+    With params.resume, pending() drops samples whose entry has the same
+    inputs and whose files still hash to the recorded values; everything
+    else (missing, damaged, or generated with different params) is
+    regenerated.
+    """
+
+    VERSION = 1
+    EXTENSION = "run.jsonl"
+
+    # Fields that do not change what a sample looks like
+    IGNORED_FIELDS = (
+        "start_index", "end_index", "output_layout", "shard_max_bytes",
+        "pipeline", "resume", "timing", "timing_export",
+        "memory", "memory_tracemalloc", "memory_export", "memory_budget_mb", "memory_action",
+        "profile_every", "profile_start", "profile_end", "profile_dir",
+        "kernels", "glyph_cache_mb",
+    )
+
+    def __init__(
+        self,
+        path: Path,
+        params: RunnerParams,
+        name: str,
+        num_colors: int,
+        samples: Dict[str, int],
+    ) -> None:
+        """
+        samples maps the file name base of every sample in this run to its index.
+        """
+        self.path = path
+        self.directory = path.parent
+        self.params = params
+        self.name = name
+        self.num_colors = num_colors
+        self.samples = samples
+        self.layout = OutputLayout.parse(params.output_layout)
+
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._inputs_prefix = self._inputs_prefix_for(params, name, num_colors)
+        self._lock = threading.Lock()
+        self._journal: TextIO | None = None
+
+    @classmethod
+    def open_local(
+        cls,
+        params: RunnerParams,
+        name: str,
+        folder: str,
+        num_colors: int,
+        samples: Dict[str, int],
+    ) -> "RunManifest":
+        """
+        The manifest of run `name` in a project folder, with any existing
+        journal loaded.
+        """
+        path = FileIO.local_file(folder, name, cls.EXTENSION)
+        manifest = cls(path, params, name, num_colors, samples)
+        manifest.load()
+        return manifest
+
+    # --------------------------------------------------
+    # Hashing
+    # --------------------------------------------------
+    @classmethod
+    def _inputs_prefix_for(cls, params: RunnerParams, name: str, num_colors: int) -> bytes:
+        relevant = {
+            key: value for key, value in params.to_json().items()
+            if key not in cls.IGNORED_FIELDS
+        }
+        document = {"name": name, "num_colors": num_colors, "params": relevant}
+        return json.dumps(document, sort_keys=True).encode("utf-8")
+
+    def inputs_hash(self, index: int) -> str:
+        digest = hashlib.sha256(self._inputs_prefix)
+        digest.update(f"|{index}".encode("ascii"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    # --------------------------------------------------
+    # Reading
+    # --------------------------------------------------
+    def load(self) -> int:
+        """
+        Read the journal, if any; returns the number of sample entries.
+        """
+        self.entries = {}
+        try:
+            lines = FileIO.load(self.path).decode("utf-8").splitlines()
+        except FileNotFoundError:
+            return 0
+        if not lines:
+            return 0
+
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return 0
+        if header.get("version") != self.VERSION:
+            return 0
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn write at the end of a crashed run
+            if isinstance(entry, dict) and "sample" in entry:
+                self.entries[entry["sample"]] = entry
+        return len(self.entries)
+
+    def is_complete(self, file_name_base: str) -> bool:
+        """
+        True if the sample was written with the current inputs and its
+        files are still intact.
+        """
+        entry = self.entries.get(file_name_base)
+        if entry is None:
+            return False
+        if entry.get("inputs") != self.inputs_hash(self.samples[file_name_base]):
+            return False
+        if self.layout != OutputLayout.FILES:
+            return False
+
+        files = {
+            "png": self.directory / f"{file_name_base}.png",
+            "annotations": self.directory / f"{file_name_base}_annotations.json",
+        }
+        for key, path in files.items():
+            try:
+                if self.content_hash(path.read_bytes()) != entry.get(key):
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def pending(self) -> List[int]:
+        """
+        Indices of this run's samples that still need generating, in order.
+        """
+        return sorted(
+            index for file_name_base, index in self.samples.items()
+            if not self.is_complete(file_name_base)
+        )
+
+    # --------------------------------------------------
+    # Writing
+    # --------------------------------------------------
+    def begin(self, regenerate: Iterable[int]) -> None:
+        """
+        Rewrite the journal with the current header and the entries of
+        every sample not in `regenerate`, then keep it open for appends.
+        """
+        regenerate = set(regenerate)
+        kept = [
+            entry for base, entry in sorted(self.entries.items())
+            if base not in self.samples or self.samples[base] not in regenerate
+        ]
+        self.entries = {entry["sample"]: entry for entry in kept}
+
+        header = {
+            "version": self.VERSION,
+            "name": self.name,
+            "num_colors": self.num_colors,
+            "params": self.params.to_json(),
+        }
+        lines = [json.dumps(header)] + [json.dumps(entry) for entry in kept]
+
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        FileIO.save(("\n".join(lines) + "\n").encode("utf-8"), temp_path)
+        os.replace(temp_path, self.path)
+
+        self._journal = open(self.path, "a", encoding="utf-8")
+
+    def record(self, file_name_base: str, png_bytes: bytes, annotation_text: str) -> None:
+        index = self.samples[file_name_base]
+        entry = {
+            "sample": file_name_base,
+            "index": index,
+            "inputs": self.inputs_hash(index),
+            "png": self.content_hash(png_bytes),
+            "annotations": self.content_hash(annotation_text.encode("utf-8")),
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self.entries[file_name_base] = entry
+            if self._journal is not None:
+                self._journal.write(line)
+                self._journal.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+class ManifestSink(SampleSink):
+    """
+    Writes through to another sink, then records the sample in a RunManifest.
+    """
+
+    def __init__(self, sink: SampleSink, manifest: RunManifest) -> None:
+        self.sink = sink
+        self.manifest = manifest
+
+    def write(self, file_name_base: str, png_bytes: bytes, annotation_text: str) -> None:
+        self.sink.write(file_name_base, png_bytes, annotation_text)
+        self.manifest.record(file_name_base, png_bytes, annotation_text)
+
+    def close(self) -> None:
+        try:
+            self.sink.close()
+        finally:
+            self.manifest.close()
@@ -1,39 +1,136 @@
 # runner.py
 from __future__ import annotations
 
+import hashlib
+import io
 import random
-from typing import List
+from collections import deque
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
 
 from runner_params import RunnerParams
+from image.array_bitmap import ArrayBitmap
 from image.bitmap import Bitmap
+from image.noise_bank import NoiseBank
+from image.noise_source import NoiseSource
 from background_factory import BackgroundFactory
 from circle_factory import CircleFactory
-from filesystem.file_utils import FileUtils
+from glyph_compositor import GlyphCompositor, TintedGlyph
+from kernel_backend import KernelBackend
+from tinted_glyph_cache import TintedGlyphCache
+from sample_sink import SampleSink
+from run_manifest import ManifestSink, RunManifest
+from sample_profiler import SampleProfiler
+from stage_memory import MemoryBudget, StageMemory
+from stage_timing import StageTiming
 from image_utility import ImageUtility
 from image.rgba import RGBA
 from color_enum import ColorName
 from labels.data_label import DataLabel
+from labels.pixel_bag import PixelBag
+from labels.pixel_bag_run_length import PixelBagRunLength
 from circle_label_placement import CircleLabelPlacement
 from labels.data_label_collection import DataLabelCollection
 from labels.image_annotation_document import ImageAnnotationDocument
-import json
+from labels.annotation_rasterizer import AnnotationRasterizer
+
+
+# ----------------------------------------------------------------------
+# Per-sample work items handed from one stage to the next
+# ----------------------------------------------------------------------
+
+@dataclass
+class SamplePlan:
+    index: int
+    file_name_base: str
+    seed: int | None = None  # None -> global random module
+
+
+@dataclass
+class StampedGlyph:
+    placement: CircleLabelPlacement
+    glyph: Bitmap | None  # None when GlyphCompositor already traced it into runs
+    x: int
+    y: int
+    runs: PixelBagRunLength | None = None
+
+
+@dataclass
+class RenderedSample:
+    plan: SamplePlan
+    image: Bitmap | ArrayBitmap
+    stamped: List[StampedGlyph]
+
+
+@dataclass
+class LabeledSample:
+    plan: SamplePlan
+    image: Bitmap | ArrayBitmap
+    document: ImageAnnotationDocument
+    annotation_text: str
+
+
+@dataclass
+class EncodedSample:
+    plan: SamplePlan
+    png_bytes: bytes
+    annotation_text: str
+    # StageTiming.capture() record when encoded in an executor worker process
+    timing: Dict[str, Any] | None = None
+
+
+# progress(done, total) after each written sample; should_stop() -> True to end a run early
+ProgressCallback = Callable[[int, int], None]
+StopCallback = Callable[[], bool]
+
 
 class Runner:
+    # Glyph pixels with alpha (0–1) above this belong to its label
+    LABEL_ALPHA_THRESHOLD = 0.2
+
     @classmethod
-    def run_test(cls, params: RunnerParams) -> None:
+    def run_test(
+        cls,
+        params: RunnerParams,
+        progress: ProgressCallback | None = None,
+        should_stop: StopCallback | None = None,
+        executor: Executor | None = None,
+        workers: int = 1,
+        worker_pids: Callable[[], List[int]] | None = None,
+    ) -> int:
         print("Runner.run_test() called")
         cls._debug_print_params(params)
 
         name = f"{params.file_name_base}_{params.testing_postfix}"
-        cls.run(params, name=name, folder="testing", num_colors=3)
+        return cls.run(
+            params, name=name, folder="testing", num_colors=3,
+            progress=progress, should_stop=should_stop, executor=executor,
+            workers=workers, worker_pids=worker_pids,
+        )
 
     @classmethod
-    def run_train(cls, params: RunnerParams) -> None:
+    def run_train(
+        cls,
+        params: RunnerParams,
+        progress: ProgressCallback | None = None,
+        should_stop: StopCallback | None = None,
+        executor: Executor | None = None,
+        workers: int = 1,
+        worker_pids: Callable[[], List[int]] | None = None,
+    ) -> int:
         print("Runner.run_train() called")
         cls._debug_print_params(params)
 
         name = f"{params.file_name_base}_{params.training_postfix}"
-        cls.run(params, name=name, folder="training", num_colors=3)
+        return cls.run(
+            params, name=name, folder="training", num_colors=3,
+            progress=progress, should_stop=should_stop, executor=executor,
+            workers=workers, worker_pids=worker_pids,
+        )
 
     @classmethod
     def run(
@@ -42,98 +139,575 @@ class Runner:
         name: str,
         folder: str,
         num_colors: int,
-    ) -> None:
+        progress: ProgressCallback | None = None,
+        should_stop: StopCallback | None = None,
+        executor: Executor | None = None,
+        workers: int = 1,
+        worker_pids: Callable[[], List[int]] | None = None,
+    ) -> int:
+        """
+        Generate samples start_index..end_index into folder and return how
+        many were written.
+
+        With an executor (e.g. a warm GenerationPool), samples are rendered
+        and encoded in its worker processes and written here in index order.
+        workers is how many samples the executor runs at once (it keeps
+        that many plus a small prefetch in flight); worker_pids() lists its
+        processes for the memory budget (e.g. GenerationPool.worker_pids).
+
+        progress(0, total) is called once total is known, then
+        progress(done, total) after every written sample (from a worker
+        thread when a pipeline is used). should_stop() is polled
+        before each new sample starts; once it returns True no new samples
+        are started, samples already in flight are finished, and run returns.
+
+        Every written sample is recorded in <folder>/<name>.run.jsonl (see
+        RunManifest). With params.resume, samples recorded there with the
+        same inputs and intact files are skipped, and total counts only
+        the samples left to generate.
+
+        With params.timing, StageTiming is on for the run and its summary
+        is printed at the end (and saved to params.timing_export if set);
+        params.memory does the same with StageMemory. With
+        params.memory_budget_mb, crossing the budget prints a warning and,
+        with memory_action "throttle", executor and pipeline runs keep
+        fewer samples in flight until usage drops again.
+
+        params.profile_every / profile_start..profile_end run those
+        samples' stages under cProfile (see SampleProfiler).
+        """
+        if not params.timing and not params.memory:
+            return cls._run_samples(
+                params, name, folder, num_colors, progress, should_stop, executor, workers, worker_pids
+            )
+
+        if params.timing:
+            StageTiming.start()
+        if params.memory:
+            StageMemory.start(trace_allocations=params.memory_tracemalloc)
+        try:
+            return cls._run_samples(
+                params, name, folder, num_colors, progress, should_stop, executor, workers, worker_pids
+            )
+        finally:
+            if params.timing:
+                StageTiming.stop()
+                print(StageTiming.report())
+                if params.timing_export:
+                    StageTiming.export(params.timing_export)
+            if params.memory:
+                StageMemory.stop()
+                print(StageMemory.report())
+                if params.memory_export:
+                    StageMemory.export(params.memory_export)
+
+    @classmethod
+    def _run_samples(
+        cls,
+        params: RunnerParams,
+        name: str,
+        folder: str,
+        num_colors: int,
+        progress: ProgressCallback | None,
+        should_stop: StopCallback | None,
+        executor: Executor | None,
+        workers: int,
+        worker_pids: Callable[[], List[int]] | None,
+    ) -> int:
         print(f"Main Gen Loop @{name} [{folder}]")
+        SampleProfiler.configure(params)
 
-        width = params.output_width
-        height = params.output_height
         start = params.start_index
         end = params.end_index
 
-        for index in range(start, end + 1):
-            number_string_original = str(index)
-            zeros_needed = max(params.leading_zeros - len(number_string_original), 0)
-            number_string = ("0" * zeros_needed) + number_string_original
+        samples = {
+            cls.plan_sample(params, name, index).file_name_base: index
+            for index in range(start, end + 1)
+        }
+        manifest = RunManifest.open_local(params, name, folder, num_colors, samples)
+        if params.resume:
+            indices = manifest.pending()
+            print(f"Resume: {len(samples) - len(indices)}/{len(samples)} samples already complete")
+        else:
+            indices = list(range(start, end + 1))
+        manifest.begin(regenerate=indices)
+        total = len(indices)
+        if progress is not None:
+            progress(0, total)
+
+        sink = SampleSink.open(
+            params.output_layout,
+            folder,
+            prefix=f"{name}_{cls._number_string(params, start)}",
+            shard_max_bytes=params.shard_max_bytes,
+        )
+        budget = MemoryBudget.from_params(params, worker_pids=worker_pids)
+        with ManifestSink(sink, manifest) as sink:
+            if executor is not None:
+                return cls._run_in_executor(
+                    params, name, num_colors, sink, indices, executor, workers, progress, should_stop, budget
+                )
+
+            if params.pipeline is not None:
+                from generation_pipeline import GenerationPipeline
+                stats = GenerationPipeline(params.pipeline).run(
+                    params, name, num_colors, sink, indices,
+                    progress=progress, should_stop=should_stop, budget=budget,
+                )
+                return stats.completed
+
+            done = 0
+            for index in indices:
+                if should_stop is not None and should_stop():
+                    print(f"Stopped after {done}/{total} samples")
+                    break
+                seed = cls.sample_seed(params.seed, index) if params.seed is not None else None
+                with StageTiming.sample(index), StageMemory.sample(index), StageTiming.time("sample"):
+                    plan = cls.plan_sample(params, name, index, seed=seed)
+                    rendered = cls.render_sample(params, plan, num_colors)
+                    labeled = cls.label_sample(params, rendered)
+                    encoded = cls.encode_sample(params, labeled)
+                    cls.write_sample(encoded, sink)
+                done += 1
+                if budget is not None:
+                    budget.exceeded()  # one sample at a time: nothing to throttle
+                if progress is not None:
+                    progress(done, total)
+            return done
 
-            image = cls.make_image(params, width=width, height=height)
+    @classmethod
+    def _run_in_executor(
+        cls,
+        params: RunnerParams,
+        name: str,
+        num_colors: int,
+        sink: SampleSink,
+        indices: List[int],
+        executor: Executor,
+        workers: int,
+        progress: ProgressCallback | None,
+        should_stop: StopCallback | None,
+        budget: MemoryBudget | None = None,
+        prefetch: int = 2,
+    ) -> int:
+        total = len(indices)
+        max_in_flight = max(workers, 1) + max(prefetch, 0)
+
+        def jobs() -> Iterator[tuple]:
+            for index in indices:
+                if params.seed is not None:
+                    seed = cls.sample_seed(params.seed, index)
+                else:
+                    seed = random.getrandbits(64)
+                yield (params, name, index, num_colors, seed)
+
+        done = 0
+        stopped = False
+        in_flight: deque = deque()
+        pending = jobs()
+        try:
+            while True:
+                # Over budget with "throttle": one sample in flight until it recovers.
+                limit = max_in_flight
+                if budget is not None and budget.exceeded() and budget.throttles:
+                    limit = 1
+                while not stopped and len(in_flight) < limit:
+                    if should_stop is not None and should_stop():
+                        stopped = True
+                        break
+                    job = next(pending, None)
+                    if job is None:
+                        break
+                    in_flight.append(executor.submit(cls.encode_index, *job))
+                if not in_flight:
+                    break
 
-            placements: List[CircleLabelPlacement] = []
+                encoded = in_flight.popleft().result()
+                StageTiming.merge(encoded.plan.index, encoded.timing)
+                cls.write_sample(encoded, sink)
+                done += 1
+                if progress is not None:
+                    progress(done, total)
+        finally:
+            for future in in_flight:
+                future.cancel()
 
-            placement_attempt_number = 0
-            placement_target_count = random.randint(params.target_min, params.target_max)
+        if stopped:
+            print(f"Stopped after {done}/{total} samples")
+        return done
 
-            while placement_attempt_number < params.max_tries:
+    @classmethod
+    def encode_index(
+        cls,
+        params: RunnerParams,
+        name: str,
+        index: int,
+        num_colors: int,
+        seed: int | None,
+    ) -> EncodedSample:
+        """
+        plan -> render -> label -> encode for one index; the unit of work
+        Runner.run sends to an executor. With params.timing the stages are
+        timed in the worker and returned on EncodedSample.timing.
+        """
+        SampleProfiler.configure(params)  # executor workers never saw Runner.run
+        with StageTiming.capture(index) if params.timing else nullcontext() as timing:
+            plan = cls.plan_sample(params, name, index, seed=seed)
+            rendered = cls.render_sample(params, plan, num_colors)
+            labeled = cls.label_sample(params, rendered)
+            encoded = cls.encode_sample(params, labeled)
+        encoded.timing = timing
+        return encoded
+
+    # --------------------------------------------------
+    # Sample stages: plan -> render -> label -> encode -> write
+    #
+    # Runner.run chains them directly; GenerationPipeline runs each one
+    # in its own worker threads connected by bounded queues.
+    # --------------------------------------------------
+    @classmethod
+    def plan_sample(
+        cls,
+        params: RunnerParams,
+        name: str,
+        index: int,
+        seed: int | None = None,
+    ) -> SamplePlan:
+        """
+        Name the sample. With a seed, every random choice for this sample
+        comes from its own random.Random(seed); without one the global
+        random module is used.
+        """
+        file_name_base = f"{name}_{cls._number_string(params, index)}"
+        return SamplePlan(index=index, file_name_base=file_name_base, seed=seed)
 
-                label_id = ColorName.random(num_colors)
-                label_name = label_id.label()
-                label_rgba = label_id.rgba()
+    @classmethod
+    @StageMemory.measured("render")
+    @SampleProfiler.profiled("render")
+    def render_sample(
+        cls,
+        params: RunnerParams,
+        plan: SamplePlan,
+        num_colors: int,
+    ) -> RenderedSample:
+        """
+        Build the background and stamp circles onto it. The stamped glyphs
+        are kept so label_sample can trace them afterwards.
+        """
+        rng = random.Random(plan.seed) if plan.seed is not None else random
+        kernels = KernelBackend.parse(params.kernels)
 
-                circle_image = CircleFactory.random()
-                
-                
+        with StageTiming.time("background"):
+            image = cls.make_image(params, width=params.output_width, height=params.output_height, rng=rng)
 
-                radius = circle_image.width / 2.0
-                min_x = (radius / 2.0)
-                max_x = image.width - (radius / 2.0)
-                min_y = (radius / 2.0)
-                max_y = image.height - (radius / 2.0)
+        placements: List[CircleLabelPlacement] = []
+        stamped: List[StampedGlyph] = []
 
-                placement_x = random.randint(int(round(min_x)), int(round(max_x)))
-                placement_y = random.randint(int(round(min_y)), int(round(max_y)))
+        placement_attempt_number = 0
+        placement_target_count = rng.randint(params.target_min, params.target_max)
 
-                num_intersections = 0
-                for placement in placements:
-                    if placement.intersects(placement_x, placement_y, radius):
-                        num_intersections += 1
+        while placement_attempt_number < params.max_tries:
 
-                if num_intersections <= params.max_overlap:
-                    ImageUtility.recolor_white(circle_image, label_rgba, color_noise=params.color_noise)
-                    base_alpha = random.uniform(params.alpha_min, params.alpha_max)
-                    ImageUtility.multiply_alpha(circle_image, base_alpha, params.alpha_noise)
-                    x = int(round(placement_x - radius))
-                    y = int(round(placement_y - radius))
-                    image.stamp_alpha(circle_image, x, y)
-                    data_label = cls.make_label(params, label_name, circle_image, x, y, 0.2)
-                    placement = CircleLabelPlacement(data_label, placement_x, placement_y, radius)
-                    placements.append(placement)
+            label_id = ColorName.random(num_colors, rng=rng)
+            label_name = label_id.label()
+            label_rgba = label_id.rgba()
 
-                placement_attempt_number += 1
-                if len(placements) >= placement_target_count:
-                    break
-                
-            file_name_base = f"{name}_{number_string}"
+            with StageTiming.time("glyph_decode"):
+                if kernels == KernelBackend.ARRAY:
+                    circle_image = TintedGlyphCache.get(
+                        CircleFactory.random_name(rng=rng), label_rgba, params.glyph_cache_mb * 1024 * 1024
+                    )
+                else:
+                    circle_image = CircleFactory.random(rng=rng)
 
-            image_file_name = file_name_base
-            annotation_file_name = f"{file_name_base}_annotations"
+            radius = circle_image.width / 2.0
+            min_x = (radius / 2.0)
+            max_x = image.width - (radius / 2.0)
+            min_y = (radius / 2.0)
+            max_y = image.height - (radius / 2.0)
 
+            placement_x = rng.randint(int(round(min_x)), int(round(max_x)))
+            placement_y = rng.randint(int(round(min_y)), int(round(max_y)))
 
-            data_labels = [placement.data_label for placement in placements]
+            num_intersections = 0
+            for placement in placements:
+                if placement.intersects(placement_x, placement_y, radius):
+                    num_intersections += 1
 
-            data_label_collection = DataLabelCollection(data_labels)
+            if num_intersections <= params.max_overlap:
+                x = int(round(placement_x - radius))
+                y = int(round(placement_y - radius))
+                placement = CircleLabelPlacement(DataLabel(name=label_name), placement_x, placement_y, radius)
+                stamped.append(cls.place_glyph(params, image, circle_image, label_rgba, placement, x, y, rng))
+                StageTiming.count("glyphs")
+                placements.append(placement)
 
-            image_annotation_document = ImageAnnotationDocument(file_name_base, image.width, image.height, data_label_collection)
+            placement_attempt_number += 1
+            StageTiming.count("placement_attempts")
+            if len(placements) >= placement_target_count:
+                break
 
-            anno_string = json.dumps(image_annotation_document.to_json(), indent=2)
+        return RenderedSample(plan=plan, image=image, stamped=stamped)
 
-            FileUtils.save_local_text(
-                anno_string,
-                folder,
-                annotation_file_name,
-                "json",
-            )
-            FileUtils.save_local_image(
-                image.export_pillow(),
-                folder,
-                image_file_name,
-                "png",
+    @classmethod
+    def place_glyph(
+        cls,
+        params: RunnerParams,
+        image: Bitmap | ArrayBitmap,
+        glyph: Bitmap | ArrayBitmap | TintedGlyph,
+        rgba: RGBA,
+        placement: CircleLabelPlacement,
+        x: int,
+        y: int,
+        rng: random.Random | None = None,
+    ) -> StampedGlyph:
+        """
+        Recolor, alpha-multiply and stamp one accepted circle at (x, y).
+
+        On a Bitmap this runs the per-pixel kernels in place on `glyph`
+        (a fresh sprite), and label_sample traces the glyph afterwards.
+        On an ArrayBitmap it is a single GlyphCompositor.place, which
+        only reads `glyph` (a shared template, or its TintedGlyph for
+        rgba) and returns the label's stripes along with the stamp.
+
+        Noise comes from the NoiseBank when params.noise_source is "bank".
+        """
+        if rng is None:
+            rng = random
+        noise_bank = cls.noise_bank(params)
+
+        if isinstance(image, ArrayBitmap):
+            with StageTiming.time("place_glyph"):
+                runs = GlyphCompositor.place(
+                    image, glyph, rgba,
+                    params.color_noise, params.alpha_min, params.alpha_max, params.alpha_noise,
+                    x, y, cls.LABEL_ALPHA_THRESHOLD, rng=rng, noise_bank=noise_bank,
+                )
+            return StampedGlyph(placement, None, x, y, runs)
+
+        with StageTiming.time("recolor_white"):
+            ImageUtility.recolor_white(
+                glyph, rgba, color_noise=params.color_noise, rng=rng, noise_bank=noise_bank
             )
+        base_alpha = rng.uniform(params.alpha_min, params.alpha_max)
+        with StageTiming.time("multiply_alpha"):
+            ImageUtility.multiply_alpha(glyph, base_alpha, params.alpha_noise, rng=rng, noise_bank=noise_bank)
+        with StageTiming.time("stamp_alpha"):
+            image.stamp_alpha(glyph, x, y)
+        # The label's pixels are traced later, in label_sample.
+        return StampedGlyph(placement, glyph, x, y)
+
+    @classmethod
+    @StageMemory.measured("label")
+    @SampleProfiler.profiled("label")
+    def label_sample(
+        cls,
+        params: RunnerParams,
+        rendered: RenderedSample,
+        serialize: bool = True,
+    ) -> LabeledSample:
+        """
+        Trace every stamped glyph into a DataLabel and serialize the
+        annotation document (annotation_text is "" when serialize is False).
+        """
+        for item in rendered.stamped:
+            with StageTiming.time("make_label"):
+                item.placement.data_label = cls.label_glyph(params, item)
+
+        data_labels = [item.placement.data_label for item in rendered.stamped]
+        data_label_collection = DataLabelCollection(data_labels)
+
+        image = rendered.image
+        document = ImageAnnotationDocument(
+            rendered.plan.file_name_base, image.width, image.height, data_label_collection
+        )
+        annotation_text = ""
+        if serialize:
+            with StageTiming.time("json_dumps"):
+                annotation_text = document.dumps(params.annotation_format)
+
+        return LabeledSample(
+            plan=rendered.plan,
+            image=image,
+            document=document,
+            annotation_text=annotation_text,
+        )
+
+    @classmethod
+    def noise_bank(cls, params: RunnerParams) -> NoiseBank | None:
+        """
+        The shared NoiseBank for params, or None for fresh noise.
+        """
+        if NoiseSource.parse(params.noise_source) == NoiseSource.FRESH:
+            return None
+        return NoiseBank.shared(params.noise_bank_count, params.noise_bank_size)
+
+    @classmethod
+    def label_glyph(cls, params: RunnerParams, item: StampedGlyph) -> DataLabel:
+        """
+        The DataLabel of a stamped glyph: from the stripes place_glyph
+        returned, or traced from the glyph by make_label.
+        """
+        name = item.placement.data_label.name
+        if item.runs is not None:
+            return DataLabel(name, PixelBag.from_run_length(item.runs))
+        return cls.make_label(params, name, item.glyph, item.x, item.y, cls.LABEL_ALPHA_THRESHOLD)
+
+    @classmethod
+    @StageMemory.measured("encode")
+    @SampleProfiler.profiled("encode")
+    def encode_sample(cls, params: RunnerParams, labeled: LabeledSample) -> EncodedSample:
+        with StageTiming.time("png_encode"):
+            png_bytes = cls.encode_png(labeled.image)
+        return EncodedSample(
+            plan=labeled.plan,
+            png_bytes=png_bytes,
+            annotation_text=labeled.annotation_text,
+        )
+
+    @classmethod
+    @SampleProfiler.profiled("write")
+    def write_sample(cls, encoded: EncodedSample, sink: SampleSink) -> None:
+        index = encoded.plan.index
+        with StageTiming.sample(index), StageMemory.sample(index):
+            with StageTiming.time("write"), StageMemory.stage("write"):
+                sink.write(encoded.plan.file_name_base, encoded.png_bytes, encoded.annotation_text)
+
+    @classmethod
+    def encode_png(cls, image: Bitmap | ArrayBitmap) -> bytes:
+        buffer = io.BytesIO()
+        image.export_pillow().save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    @classmethod
+    def sample_seed(cls, seed: int, index: int) -> int:
+        """
+        Stable 64-bit seed for sample `index` of a run seeded with `seed`.
+        Independent of process, platform and PYTHONHASHSEED.
+        """
+        digest = hashlib.blake2b(f"{seed}:{index}".encode("ascii"), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    # --------------------------------------------------
+    # In-memory generation (no filesystem)
+    # --------------------------------------------------
+    GENERATE_TARGETS = AnnotationRasterizer.TARGETS
+
+    @classmethod
+    def generate(
+        cls,
+        params: RunnerParams,
+        name: str | None = None,
+        num_colors: int = 3,
+        target: str = "document",
+        seed: int | None = None,
+        workers: int = 0,
+        prefetch: int = 2,
+    ) -> Iterator[Tuple[np.ndarray, Any]]:
+        """
+        Yield (image, target) for every index in
+        [params.start_index, params.end_index], in index order, without
+        touching the filesystem.
+
+        image is (H, W, 3) uint8 RGB. target is chosen by `target`:
+            "document"   ImageAnnotationDocument
+            "class_map"  (H, W) uint8, 0 = background, k = ColorName.labels(num_colors)[k - 1]
+            "masks"      (C, H, W) uint8, one channel per ColorName.labels(num_colors)
+
+        With seed (default: params.seed), sample i always comes out the
+        same and matches what Runner.run writes for it with that seed;
+        without, per-sample seeds are drawn from the global random module.
+
+        workers > 0 renders in that many background processes, keeping up
+        to workers + prefetch samples in flight ahead of the consumer.
+        """
+        if target not in cls.GENERATE_TARGETS:
+            raise ValueError(f"Unknown target '{target}' (expected one of: {', '.join(cls.GENERATE_TARGETS)})")
+        if name is None:
+            name = f"{params.file_name_base}_{params.training_postfix}"
+        if seed is None:
+            seed = params.seed
+
+        def jobs() -> Iterator[tuple]:
+            for index in range(params.start_index, params.end_index + 1):
+                if seed is not None:
+                    sample_seed = cls.sample_seed(seed, index)
+                else:
+                    sample_seed = random.getrandbits(64)
+                yield (params, name, index, num_colors, target, sample_seed)
+
+        if workers <= 0:
+            for job in jobs():
+                yield cls.generate_sample(*job)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        in_flight: deque = deque()
+        try:
+            pending = jobs()
+            for job in pending:
+                in_flight.append(executor.submit(cls.generate_sample, *job))
+                if len(in_flight) >= workers + max(prefetch, 0):
+                    break
+            while in_flight:
+                result = in_flight.popleft().result()
+                for job in pending:
+                    in_flight.append(executor.submit(cls.generate_sample, *job))
+                    break
+                yield result
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def generate_sample(
+        cls,
+        params: RunnerParams,
+        name: str,
+        index: int,
+        num_colors: int,
+        target: str,
+        seed: int | None,
+    ) -> Tuple[np.ndarray, Any]:
+        """
+        Render one sample fully in memory. See generate().
+        """
+        plan = cls.plan_sample(params, name, index, seed=seed)
+        rendered = cls.render_sample(params, plan, num_colors)
+        labeled = cls.label_sample(params, rendered, serialize=False)
+
+        image = cls.image_array(labeled.image)
+        document = labeled.document
+        if target == "class_map":
+            return image, AnnotationRasterizer.class_map(document, ColorName.labels(num_colors))
+        if target == "masks":
+            return image, AnnotationRasterizer.class_masks(document, ColorName.labels(num_colors))
+        return image, document
+
+    @classmethod
+    def image_array(cls, image: Bitmap | ArrayBitmap) -> np.ndarray:
+        """
+        (H, W, 3) uint8 RGB pixels of a Bitmap or ArrayBitmap.
+        """
+        if isinstance(image, ArrayBitmap):
+            return image.pixels[..., :3].copy()
+        return np.asarray(image.export_pillow().convert("RGB"))
+
+    @classmethod
+    def _number_string(cls, params: RunnerParams, index: int) -> str:
+        number_string_original = str(index)
+        zeros_needed = max(params.leading_zeros - len(number_string_original), 0)
+        return ("0" * zeros_needed) + number_string_original
 
     @classmethod
     def make_label(
         cls,
         params: RunnerParams,
         label_name: str,
-        glyph: Bitmap,
+        glyph: Bitmap | ArrayBitmap,
         x: int,
         y: int,
         alpha_threshold: float
@@ -146,6 +720,9 @@ class Runner:
         Only pixels that fall inside the final image bounds
         [0, width-1] x [0, height-1] are recorded.
         """
+        if isinstance(glyph, ArrayBitmap):
+            return cls._make_label_array(params, label_name, glyph, x, y, alpha_threshold)
+
         label = DataLabel(name=label_name)
 
         gw = glyph.width
@@ -169,8 +746,29 @@ class Runner:
 
         return label
 
+    @classmethod
+    def _make_label_array(
+        cls,
+        params: RunnerParams,
+        label_name: str,
+        glyph: ArrayBitmap,
+        x: int,
+        y: int,
+        alpha_threshold: float
+    ) -> DataLabel:
+        """
+        make_label for an ArrayBitmap glyph: threshold the alpha channel
+        of the part inside the image bounds and read off its stripes.
+        """
+        start_gx, start_gy = max(0, -x), max(0, -y)
+        end_gx = min(glyph.width, params.output_width - x)
+        end_gy = min(glyph.height, params.output_height - y)
+        if start_gx >= end_gx or start_gy >= end_gy:
+            return DataLabel(name=label_name)
 
-
+        alpha = glyph.pixels[start_gy:end_gy, start_gx:end_gx, 3]
+        runs = PixelBagRunLength.from_mask(alpha / 255.0 > alpha_threshold, x + start_gx, y + start_gy)
+        return DataLabel(name=label_name, pixel_bag=PixelBag.from_run_length(runs))
 
     @classmethod
     def make_image(
@@ -178,22 +776,33 @@ class Runner:
         params: RunnerParams,
         width: int = 256,
         height: int = 256,
-    ) -> Bitmap:
-        background = BackgroundFactory.random()
+        rng: random.Random | None = None,
+    ) -> Bitmap | ArrayBitmap:
+        """
+        A width x height crop of a random background, as a Bitmap, or as
+        an ArrayBitmap when params.kernels is "array" (same draws from rng).
+        """
+        if rng is None:
+            rng = random
 
-        result = Bitmap()
-        result.allocate(width=width, height=height)
+        if KernelBackend.parse(params.kernels) == KernelBackend.ARRAY:
+            background = ArrayBitmap.with_pillow(BackgroundFactory.random_image(rng=rng))
+            result = ArrayBitmap(width, height)
+        else:
+            background = BackgroundFactory.random(rng=rng)
+            result = Bitmap()
+            result.allocate(width=width, height=height)
 
         span_x = background.width - width
         span_y = background.height - height
 
         offset_x = 0
         if span_x > 0:
-            offset_x = -random.randint(0, span_x)
+            offset_x = -rng.randint(0, span_x)
 
         offset_y = 0
         if span_y > 0:
-            offset_y = -random.randint(0, span_y)
+            offset_y = -rng.randint(0, span_y)
 
         result.stamp(background, offset_x, offset_y)
 
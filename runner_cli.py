@@ -0,0 +1,164 @@
+# runner_cli.py
+"""
+Headless entry point for Runner: no Qt, no window, no startup listings.
+
+    python runner_cli.py train --end-index 999 --seed 7
+    python runner_cli.py both --config runs/small.json --output-layout shards
+    python runner_cli.py test --config runs/small.toml --print-config
+    python runner_cli.py train --seed 7 --resume      # continue an interrupted run
+
+Settings are layered: built-in defaults (the GUI panels' initial values),
+then the --config file (.json or .toml, keys are RunnerParams field names,
+an optional [pipeline] table / "pipeline" object), then command-line flags.
+
+Only argparse and RunnerParams are imported up front; the rendering
+modules are imported after the arguments parse, so --help and
+--print-config return immediately.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, List
+
+from pipeline_params import PipelineParams
+from runner_params import RunnerParams
+
+# Initial values of the GUI panels (TopLeft/TopCenter/TopRight/MiddleLeft).
+DEFAULTS: Dict[str, Any] = {
+    "alpha_min": 0.65,
+    "alpha_max": 0.85,
+    "alpha_noise": 0.10,
+    "color_noise": 0.25,
+    "file_name_base": "proto_cells",
+    "training_postfix": "train",
+    "testing_postfix": "test",
+    "leading_zeros": 3,
+    "target_min": 5,
+    "target_max": 10,
+    "max_overlap": 0,
+    "max_tries": 30,
+    "output_width": 256,
+    "output_height": 256,
+    "start_index": 0,
+    "end_index": 600,
+}
+
+SPLITS = ("train", "test", "both")
+
+_TYPES = {"float": float, "int": int, "str": str, "int | None": int}
+
+
+def _flag(name: str) -> str:
+    return "--" + name.replace("_", "-")
+
+
+def _add_field_flags(group: argparse._ArgumentGroup, cls: type, skip: tuple = ()) -> None:
+    for field in fields(cls):
+        if field.name in skip:
+            continue
+        if str(field.type) == "bool":
+            # --x / --no-x, so a config file value can be overridden either way
+            group.add_argument(_flag(field.name), dest=field.name, action=argparse.BooleanOptionalAction, default=None)
+            continue
+        group.add_argument(
+            _flag(field.name),
+            dest=field.name,
+            type=_TYPES.get(str(field.type), str),
+            default=None,
+            metavar=str(field.type).split(" ")[0].upper(),
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic circle samples without the GUI.",
+    )
+    parser.add_argument("split", choices=SPLITS, help="which split(s) to generate")
+    parser.add_argument("--config", type=Path, help="JSON or TOML file of RunnerParams fields")
+    parser.add_argument("--num-colors", type=int, default=3, help="colors to draw from (default 3)")
+    parser.add_argument("--print-config", action="store_true", help="print the effective settings as JSON and exit")
+
+    _add_field_flags(parser.add_argument_group("params"), RunnerParams, skip=("pipeline",))
+
+    pipeline = parser.add_argument_group("pipeline (any of these enables GenerationPipeline)")
+    pipeline.add_argument("--pipeline", action="store_true", help="use GenerationPipeline with default workers")
+    _add_field_flags(pipeline, PipelineParams)
+    return parser
+
+
+def load_config(path: Path) -> Dict[str, Any]:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".toml":
+        import tomllib
+        return tomllib.loads(text)
+    return json.loads(text)
+
+
+def build_params(args: argparse.Namespace) -> RunnerParams:
+    """
+    Defaults, then --config, then flags. Raises ValueError on bad settings.
+    """
+    values: Dict[str, Any] = dict(DEFAULTS)
+    pipeline: Dict[str, Any] | None = None
+
+    if args.config is not None:
+        config = load_config(args.config)
+        if "pipeline" in config:
+            pipeline = dict(config.pop("pipeline") or {})
+        values.update(config)
+
+    for field in fields(RunnerParams):
+        value = getattr(args, field.name, None)
+        if field.name != "pipeline" and value is not None:
+            values[field.name] = value
+
+    pipeline_flags = {
+        field.name: getattr(args, field.name)
+        for field in fields(PipelineParams)
+        if getattr(args, field.name) is not None
+    }
+    if args.pipeline or pipeline_flags:
+        pipeline = {**(pipeline or {}), **pipeline_flags}
+
+    values["pipeline"] = pipeline
+    params = RunnerParams.from_json(values)
+    params.validate()
+    return params
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        params = build_params(args)
+    except (ValueError, TypeError, OSError) as error:
+        parser.error(str(error))
+
+    if args.print_config:
+        print(json.dumps(params.to_json(), indent=2))
+        return 0
+
+    # Rendering modules (numpy, PIL, factories) only load from here on.
+    from runner import Runner
+
+    for split in ("train", "test") if args.split == "both" else (args.split,):
+        if split == "train":
+            name, folder = f"{params.file_name_base}_{params.training_postfix}", "training"
+        else:
+            name, folder = f"{params.file_name_base}_{params.testing_postfix}", "testing"
+
+        start_time = time.perf_counter()
+        count = Runner.run(params, name=name, folder=folder, num_colors=args.num_colors)
+        elapsed = time.perf_counter() - start_time
+        print(f"{split}: {count} samples in {elapsed:.2f} s ({count / elapsed:.2f} samples/s) -> {folder}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,15 @@
 # runner_params.py
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict
+
+from image.noise_source import DEFAULT_BANK_COUNT, DEFAULT_BANK_SIZE, NoiseSource
+from labels.annotation_format import AnnotationFormat
+from kernel_backend import KernelBackend
+from memory_action import MemoryAction
+from output_layout import OutputLayout
+from pipeline_params import PipelineParams
 
 
 @dataclass
@@ -34,6 +42,57 @@ class RunnerParams:
     start_index: int
     end_index: int
 
+    # Output encoding (no panel yet; defaults keep the original layout)
+    annotation_format: str = AnnotationFormat.JSON.value  # "json" | "flat" | "packed"
+    output_layout: str = OutputLayout.FILES.value          # "files" | "shards"
+    shard_max_bytes: int = 64 * 1024 * 1024                # only used by "shards"
+
+    # With a seed, sample i is always rendered identically (Runner.sample_seed).
+    seed: int | None = None
+
+    # Skip samples the run manifest shows as already written with these params.
+    resume: bool = False
+
+    # Per-stage timers (StageTiming) for the run; summary printed at the end,
+    # and written as JSON to timing_export when it is set.
+    timing: bool = False
+    timing_export: str | None = None
+
+    # Per-stage memory sampling (StageMemory), with tracemalloc if
+    # memory_tracemalloc; report printed at the end, JSON to memory_export.
+    memory: bool = False
+    memory_tracemalloc: bool = False
+    memory_export: str | None = None
+
+    # RSS ceiling for the run (this process + executor workers), and what
+    # to do above it: "warn" | "throttle" (fewer samples in flight).
+    memory_budget_mb: int | None = None
+    memory_action: str = MemoryAction.WARN.value
+
+    # cProfile every Nth sample and/or samples profile_start..profile_end
+    # (SampleProfiler); pstats + collapsed stacks per stage in profile_dir.
+    profile_every: int | None = None
+    profile_start: int | None = None
+    profile_end: int | None = None
+    profile_dir: str = "profiles"
+
+    # Image kernels: "reference" (per-pixel Bitmap loops) | "array" (NumPy
+    # ArrayBitmap, one fused GlyphCompositor.place per circle). Same output.
+    kernels: str = KernelBackend.REFERENCE.value
+
+    # Memory for TintedGlyphCache (alpha scale and visible mask per sprite
+    # and color, "array" kernels only); 0 prepares every glyph from scratch.
+    glyph_cache_mb: int = 32
+
+    # Glyph color/alpha noise: "fresh" (exact per-pixel draws) | "bank"
+    # (windows of noise_bank_count precomputed noise_bank_size² fields).
+    noise_source: str = NoiseSource.FRESH.value
+    noise_bank_count: int = DEFAULT_BANK_COUNT
+    noise_bank_size: int = DEFAULT_BANK_SIZE
+
+    # None runs samples one after another; set to use GenerationPipeline.
+    pipeline: PipelineParams | None = None
+
     def validate(self) -> None:
         """
         Sanity checks. Raise ValueError if something is obviously invalid.
@@ -67,3 +126,56 @@ class RunnerParams:
 
         if self.end_index < self.start_index:
             raise ValueError("end_index must be >= start_index")
+
+        AnnotationFormat.parse(self.annotation_format)
+        OutputLayout.parse(self.output_layout)
+
+        if self.shard_max_bytes <= 0:
+            raise ValueError("shard_max_bytes must be positive")
+
+        if self.resume and OutputLayout.parse(self.output_layout) != OutputLayout.FILES:
+            raise ValueError("resume needs output_layout 'files' (shards are append-only)")
+
+        KernelBackend.parse(self.kernels)
+        if self.glyph_cache_mb < 0:
+            raise ValueError("glyph_cache_mb cannot be negative")
+        NoiseSource.parse(self.noise_source)
+        if self.noise_bank_count <= 0 or self.noise_bank_size <= 0:
+            raise ValueError("noise_bank_count/noise_bank_size must be positive")
+        MemoryAction.parse(self.memory_action)
+        if self.memory_budget_mb is not None and self.memory_budget_mb <= 0:
+            raise ValueError("memory_budget_mb must be positive")
+
+        if self.profile_every is not None and self.profile_every <= 0:
+            raise ValueError("profile_every must be positive")
+        if self.profile_end is not None:
+            if self.profile_start is None:
+                raise ValueError("profile_end needs profile_start")
+            if self.profile_end < self.profile_start:
+                raise ValueError("profile_end must be >= profile_start")
+
+        if self.pipeline is not None:
+            self.pipeline.validate()
+
+    # --------------------------------------------------
+    # JSON (config files, run manifests)
+    # --------------------------------------------------
+    def to_json(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "RunnerParams":
+        """
+        Build params from a dict like to_json() produces. Unknown keys
+        raise ValueError; missing fields without a default raise TypeError.
+        """
+        names = {f.name for f in fields(cls)}
+        unknown = sorted(set(data) - names)
+        if unknown:
+            raise ValueError(f"Unknown RunnerParams field(s): {', '.join(unknown)}")
+
+        values = dict(data)
+        pipeline = values.get("pipeline")
+        if isinstance(pipeline, dict):
+            values["pipeline"] = PipelineParams(**pipeline)
+        return cls(**values)
@@ -0,0 +1,195 @@
+# sample_profiler.py
+from __future__ import annotations
+
+import cProfile
+import functools
+import os
+import pstats
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from filesystem.file_io import FileIO
+
+# pstats function key: (file name, line number, function name)
+FunctionKey = Tuple[str, int, str]
+
+# Paths cheaper than this (seconds) are left out of collapsed stacks.
+_MIN_SECONDS = 1e-6
+
+
+class SampleProfiler:
+    """
+    cProfile for selected samples of a run, one profile per stage.
+
+        @classmethod
+        @SampleProfiler.profiled("render")
+        def render_sample(cls, params, plan, ...): ...
+
+    Configured from RunnerParams (configure): a sample is profiled when
+    profile_every is set and it is every Nth index from start_index, or
+    when its index is within [profile_start, profile_end]. Each profiled
+    stage writes, into params.profile_dir:
+
+        <sample>.<stage>.pstats       load with pstats / snakeviz
+        <sample>.<stage>.collapsed    "stage;frame;frame <microseconds>" lines
+                                      for flamegraph.pl, speedscope, inferno
+
+    so `cat profiles/*.collapsed | flamegraph.pl > run.svg` shows every
+    profiled sample split by stage. Collapsed stacks are rebuilt from
+    cProfile's caller edges, so time under a function called from several
+    places is split by each caller's share.
+
+    Profiling per-pixel code costs a lot (every RGBA call is traced):
+    a profiled sample runs several times slower than the others.
+
+    Only one profiler can be active per process (Python 3.12+ raises on a
+    second enable()), so profiled stages run one at a time: under
+    GenerationPipeline a profiled stage waits for the one being profiled
+    on another thread, and unprofiled stages keep running alongside. On
+    3.12+ cProfile traces every thread, so such a stage's profile also
+    holds whatever those stages ran meanwhile. When another tool (a
+    debugger, coverage) already holds the profiler, stages run
+    unprofiled.
+    """
+
+    enabled: bool = False
+    every: int | None = None
+    first_index: int = 0
+    start: int | None = None
+    end: int | None = None
+    directory: Path | None = None
+
+    _lock = threading.Lock()
+    _profile_lock = threading.Lock()
+
+    # --------------------------------------------------
+    # Selection
+    # --------------------------------------------------
+    @classmethod
+    def configure(cls, params: Any) -> None:
+        """
+        Take the profile_* settings of a RunnerParams (None disables).
+        """
+        every = getattr(params, "profile_every", None)
+        start = getattr(params, "profile_start", None)
+        if every is None and start is None:
+            cls.enabled = False
+            return
+        end = getattr(params, "profile_end", None)
+        cls.every = every
+        cls.first_index = params.start_index
+        cls.start = start
+        cls.end = end if end is not None else start
+        cls.directory = FileIO.local_directory(params.profile_dir)
+        cls.enabled = True
+
+    @classmethod
+    def selects(cls, index: int) -> bool:
+        if not cls.enabled:
+            return False
+        if cls.every is not None and (index - cls.first_index) % cls.every == 0:
+            return True
+        return cls.start is not None and cls.start <= index <= cls.end
+
+    # --------------------------------------------------
+    # Profiling
+    # --------------------------------------------------
+    @classmethod
+    def profiled(cls, stage: str) -> Callable[[Callable], Callable]:
+        """
+        Decorator for a Runner stage whose arguments include the sample
+        (a SamplePlan, or a work item carrying one as .plan).
+        """
+        def decorate(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return fn(*args, **kwargs)
+                plan = _find_plan(args)
+                if plan is None or not cls.selects(plan.index):
+                    return fn(*args, **kwargs)
+                with cls._profile_lock:
+                    profile = cProfile.Profile()
+                    try:
+                        profile.enable()
+                    except ValueError:  # another profiling tool is active
+                        return fn(*args, **kwargs)
+                    try:
+                        return fn(*args, **kwargs)
+                    finally:
+                        profile.disable()
+                        cls._save(plan.file_name_base, stage, profile)
+            return wrapper
+        return decorate
+
+    @classmethod
+    def _save(cls, file_name_base: str, stage: str, profile: cProfile.Profile) -> None:
+        directory = cls.directory
+        if directory is None:
+            return
+        stats = pstats.Stats(profile)
+        base = directory / f"{file_name_base}.{stage}"
+        text = "".join(f"{line}\n" for line in cls.collapsed_stacks(stats, stage))
+        with cls._lock:
+            directory.mkdir(parents=True, exist_ok=True)
+            stats.dump_stats(str(base) + ".pstats")
+            FileIO.save(text.encode("utf-8"), str(base) + ".collapsed")
+
+    # --------------------------------------------------
+    # Collapsed stacks
+    # --------------------------------------------------
+    @classmethod
+    def collapsed_stacks(cls, stats: pstats.Stats, label: str) -> List[str]:
+        """
+        "label;root;...;function <self microseconds>" per call path.
+        """
+        entries = stats.stats  # function -> (cc, nc, tt, ct, callers)
+        callees: Dict[FunctionKey, Dict[FunctionKey, float]] = defaultdict(dict)
+        for function, (_cc, _nc, _tt, _ct, callers) in entries.items():
+            for caller, edge in callers.items():
+                callees[caller][function] = edge[3]  # cumulative time under this caller
+
+        totals: Dict[Tuple[str, ...], float] = defaultdict(float)
+        on_path: set = set()
+
+        def walk(function: FunctionKey, path: Tuple[str, ...], seconds: float) -> None:
+            _cc, _nc, self_time, cumulative, _callers = entries[function]
+            share = seconds / cumulative if cumulative > 0 else 0.0
+            path = path + (_frame_name(function),)
+            totals[path] += self_time * share
+            on_path.add(function)
+            for callee, edge_seconds in callees.get(function, {}).items():
+                if callee not in on_path and edge_seconds * share >= _MIN_SECONDS:
+                    walk(callee, path, edge_seconds * share)
+            on_path.discard(function)
+
+        for function, entry in entries.items():
+            if not entry[4]:  # no callers: a root of the profile
+                walk(function, (label,), entry[3])
+
+        return [
+            f"{';'.join(path)} {int(round(seconds * 1e6))}"
+            for path, seconds in sorted(totals.items())
+            if seconds >= _MIN_SECONDS
+        ]
+
+
+def _find_plan(args: tuple) -> Any:
+    for arg in args:
+        if hasattr(arg, "file_name_base") and hasattr(arg, "index"):
+            return arg
+        plan = getattr(arg, "plan", None)
+        if plan is not None:
+            return plan
+    return None
+
+
+def _frame_name(function: FunctionKey) -> str:
+    file_name, line, name = function
+    if file_name == "~":  # built-in
+        text = name
+    else:
+        text = f"{os.path.basename(file_name)}:{line}:{name}"
+    return text.replace(";", ",").replace(" ", "_")
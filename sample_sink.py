@@ -0,0 +1,88 @@
+# sample_sink.py
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+from filesystem.file_io import FileIO
+from filesystem.shard_writer import ShardWriter
+from output_layout import OutputLayout
+
+
+class SampleSink(ABC):
+    """
+    Destination for encoded samples. Runner writes every sample through
+    one sink and closes it when the run ends.
+    """
+
+    @abstractmethod
+    def write(self, file_name_base: str, png_bytes: bytes, annotation_text: str) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "SampleSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @classmethod
+    def open(
+        cls,
+        layout: OutputLayout | str,
+        folder: str,
+        prefix: str,
+        shard_max_bytes: int,
+    ) -> "SampleSink":
+        """
+        Build the sink for a layout. `prefix` names the shard set
+        (ignored by the FILES layout).
+        """
+        match OutputLayout.parse(layout):
+            case OutputLayout.FILES:
+                return FileSampleSink(folder)
+            case OutputLayout.SHARDS:
+                return ShardSampleSink(folder, prefix, shard_max_bytes)
+        raise ValueError("Unknown OutputLayout")
+
+
+class FileSampleSink(SampleSink):
+    """
+    One PNG and one _annotations.json per sample (default layout).
+    """
+
+    def __init__(self, folder: str) -> None:
+        self.folder = folder
+
+    def write(self, file_name_base: str, png_bytes: bytes, annotation_text: str) -> None:
+        FileIO.save_local(
+            annotation_text.encode("utf-8"),
+            self.folder,
+            f"{file_name_base}_annotations",
+            "json",
+        )
+        FileIO.save_local(
+            png_bytes,
+            self.folder,
+            file_name_base,
+            "png",
+        )
+
+
+class ShardSampleSink(SampleSink):
+    """
+    Size-bounded tar shards plus an index, via ShardWriter.
+    """
+
+    def __init__(self, folder: str, prefix: str, max_bytes: int) -> None:
+        self.writer = ShardWriter.local(folder, prefix, max_bytes)
+
+    def write(self, file_name_base: str, png_bytes: bytes, annotation_text: str) -> None:
+        self.writer.write(file_name_base, {
+            "png": png_bytes,
+            "annotations.json": annotation_text.encode("utf-8"),
+        })
+
+    def close(self) -> None:
+        self.writer.close()
@@ -0,0 +1,211 @@
+# split_reader.py
+from __future__ import annotations
+
+import io
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from color_enum import ColorName
+from filesystem.dataset_index import DatasetIndex
+from filesystem.file_io import FileIO
+from labels.annotation_rasterizer import AnnotationRasterizer
+from labels.image_annotation_document import ImageAnnotationDocument
+
+
+@dataclass(frozen=True)
+class SamplePaths:
+    name: str
+    image_path: Path
+    annotation_path: Path
+
+
+class SplitReader:
+    """
+    Batched reader for a generated split (e.g. "training").
+
+    Sample pairs are discovered once, up front. Each batch's samples are
+    decoded on a pool of workers (threads by default: PIL's PNG decoder
+    releases the GIL; processes help when JSON parsing dominates), and up
+    to `prefetch` batches are decoded ahead of the consumer.
+
+    Every batch is a dict:
+        "names"    list of sample names
+        "images"   (B, H, W, 3) uint8
+        "targets"  (B, H, W) / (B, C, H, W) uint8 for "class_map" / "masks",
+                   a list of ImageAnnotationDocument for "document"
+
+    With shuffle, epoch e visits samples in a permutation drawn from
+    (seed, e), so the order is the same on every machine and every run.
+
+    Usage:
+        reader = SplitReader("training", batch_size=16, target="class_map", shuffle=True)
+        for epoch in range(10):
+            for batch in reader.batches(epoch):
+                ...
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        batch_size: int = 8,
+        target: str = "document",
+        num_colors: int = 3,
+        shuffle: bool = False,
+        seed: int = 0,
+        drop_last: bool = False,
+        workers: int = 4,
+        prefetch: int = 2,
+        use_processes: bool = False,
+    ) -> None:
+        if target not in AnnotationRasterizer.TARGETS:
+            raise ValueError(f"Unknown target '{target}' (expected one of: {', '.join(AnnotationRasterizer.TARGETS)})")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+
+        self.folder = folder
+        self.samples = self.discover(folder)
+        self.batch_size = batch_size
+        self.target = target
+        self.class_names = ColorName.labels(num_colors)
+        self.shuffle = shuffle
+        self.seed = seed
+        self.drop_last = drop_last
+        self.workers = workers
+        self.prefetch = max(prefetch, 0)
+        self.use_processes = use_processes
+
+        self._epoch = 0
+
+    # --------------------------------------------------
+    # Discovery / decoding
+    # --------------------------------------------------
+    @classmethod
+    def discover(cls, folder: str) -> List[SamplePaths]:
+        """
+        Pair <name>.png with <name>_annotations.json in a project folder,
+        sorted by name, via its DatasetIndex. Images without annotations
+        (and vice versa) are skipped.
+        """
+        index = DatasetIndex.open_local(folder)
+        return [
+            SamplePaths(sample.name, sample.image, sample.annotation)
+            for sample in index.complete_samples()
+        ]
+
+    @classmethod
+    def load_sample(
+        cls,
+        sample: SamplePaths,
+        target: str,
+        class_names: Sequence[str],
+    ) -> Tuple[np.ndarray, Any]:
+        """
+        Decode one sample into ((H, W, 3) uint8 RGB, target); see Runner.generate
+        for the target kinds.
+        """
+        image = cls.load_image(sample.image_path)
+        document = ImageAnnotationDocument.loads(FileIO.load(sample.annotation_path).decode("utf-8"))
+        if target == "class_map":
+            return image, AnnotationRasterizer.class_map(document, class_names)
+        if target == "masks":
+            return image, AnnotationRasterizer.class_masks(document, class_names)
+        return image, document
+
+    @classmethod
+    def load_image(cls, image_path: Path) -> np.ndarray:
+        """
+        (H, W, 3) uint8 RGB pixels of a PNG.
+        """
+        with Image.open(io.BytesIO(FileIO.load(image_path))) as pil_image:
+            return np.asarray(pil_image.convert("RGB"))
+
+    # --------------------------------------------------
+    # Order
+    # --------------------------------------------------
+    def __len__(self) -> int:
+        """
+        Number of batches per epoch.
+        """
+        if self.drop_last:
+            return len(self.samples) // self.batch_size
+        return (len(self.samples) + self.batch_size - 1) // self.batch_size
+
+    def order(self, epoch: int = 0) -> np.ndarray:
+        """
+        Sample indices in the order epoch `epoch` visits them.
+        """
+        if not self.shuffle:
+            return np.arange(len(self.samples))
+        rng = np.random.default_rng([self.seed, epoch])
+        return rng.permutation(len(self.samples))
+
+    def batch_indices(self, epoch: int = 0) -> List[List[int]]:
+        order = self.order(epoch).tolist()
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        if self.drop_last and batches and len(batches[-1]) < self.batch_size:
+            batches.pop()
+        return batches
+
+    # --------------------------------------------------
+    # Iteration
+    # --------------------------------------------------
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate the next epoch (0, 1, 2, ... on successive calls).
+        """
+        epoch = self._epoch
+        self._epoch += 1
+        return self.batches(epoch)
+
+    def batches(self, epoch: int = 0) -> Iterator[Dict[str, Any]]:
+        plan = self.batch_indices(epoch)
+        executor = self._make_executor()
+        in_flight: deque = deque()
+        try:
+            pending = iter(plan)
+            for indices in pending:
+                in_flight.append(self._submit(executor, indices))
+                if len(in_flight) > self.prefetch:
+                    break
+            while in_flight:
+                indices, futures = in_flight.popleft()
+                for next_indices in pending:
+                    in_flight.append(self._submit(executor, next_indices))
+                    break
+                yield self._collate(indices, [future.result() for future in futures])
+        finally:
+            for _, futures in in_flight:
+                for future in futures:
+                    future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _make_executor(self) -> Executor:
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="split-reader")
+
+    def _submit(self, executor: Executor, indices: List[int]) -> Tuple[List[int], list]:
+        futures = [
+            executor.submit(self.load_sample, self.samples[i], self.target, self.class_names)
+            for i in indices
+        ]
+        return indices, futures
+
+    def _collate(self, indices: List[int], items: List[Tuple[np.ndarray, Any]]) -> Dict[str, Any]:
+        images = np.stack([image for image, _ in items])
+        targets = [target for _, target in items]
+        if self.target != "document":
+            targets = np.stack(targets)
+        return {
+            "names": [self.samples[i].name for i in indices],
+            "images": images,
+            "targets": targets,
+        }
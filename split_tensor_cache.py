@@ -0,0 +1,241 @@
+# split_tensor_cache.py
+from __future__ import annotations
+
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from color_enum import ColorName
+from filesystem.file_io import FileIO, PathLike
+from labels.annotation_rasterizer import AnnotationRasterizer
+from labels.data_label import DataLabel
+from labels.image_annotation_reader import ImageAnnotationReader
+from split_reader import SamplePaths, SplitReader
+
+MANIFEST_FILE = "manifest.json"
+IMAGES_FILE = "images.npy"
+MASKS_FILE = "masks.npy"
+
+
+class SplitTensorCache:
+    """
+    A split decoded once into two .npy arrays that later epochs memory-map:
+
+        <split>.tensors/images.npy     (N, H, W, 3) uint8 RGB
+        <split>.tensors/masks.npy      (N, H, W) class maps    (target "class_map")
+                                       (N, C, H, W) masks      (target "masks")
+        <split>.tensors/manifest.json  sample names, sources, class names
+
+    Row i of both arrays is manifest["samples"][i]. The manifest also keeps
+    each source file's size and mtime so is_stale() can tell when the split
+    was regenerated.
+
+    Usage:
+        SplitTensorCache.compile_local("training", target="class_map")
+        cache = SplitTensorCache.open_local("training")
+        image, class_map = cache[17]            # straight from the page cache
+        images, masks = cache.batch([3, 9, 12])
+    """
+
+    VERSION = 1
+    TARGETS = ("class_map", "masks")
+
+    def __init__(self, directory: PathLike) -> None:
+        self.directory = FileIO._to_path(directory)
+        self.manifest: Dict[str, Any] = json.loads(
+            FileIO.load(self.directory / MANIFEST_FILE).decode("utf-8")
+        )
+        version = self.manifest.get("version")
+        if version != self.VERSION:
+            raise ValueError(f"Unsupported tensor cache version {version}: {self.directory}")
+
+        self.images: np.ndarray = np.load(self.directory / IMAGES_FILE, mmap_mode="r")
+        self.masks: np.ndarray = np.load(self.directory / MASKS_FILE, mmap_mode="r")
+        self._names: Dict[str, int] = {
+            sample["name"]: i for i, sample in enumerate(self.manifest["samples"])
+        }
+
+    @classmethod
+    def local_directory(cls, split: str) -> Path:
+        return FileIO.local_directory(f"{split}.tensors")
+
+    @classmethod
+    def open_local(cls, split: str) -> "SplitTensorCache":
+        return cls(cls.local_directory(split))
+
+    # --------------------------------------------------
+    # Access
+    # --------------------------------------------------
+    def __len__(self) -> int:
+        return int(self.manifest["count"])
+
+    def __getitem__(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.images[index], self.masks[index]
+
+    def batch(self, indices: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Copy rows `indices` into regular (B, ...) arrays.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        return self.images[indices], self.masks[indices]
+
+    @property
+    def names(self) -> List[str]:
+        return [sample["name"] for sample in self.manifest["samples"]]
+
+    @property
+    def class_names(self) -> List[str]:
+        return list(self.manifest["class_names"])
+
+    @property
+    def target(self) -> str:
+        return self.manifest["target"]
+
+    def index_of(self, name: str) -> int:
+        return self._names[name]
+
+    def is_stale(self) -> bool:
+        """
+        True if a source file is gone or changed size/mtime since compiling.
+        """
+        for sample in self.manifest["samples"]:
+            for kind in ("image", "annotation"):
+                path = Path(sample[kind])
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    return True
+                if stat.st_size != sample[f"{kind}_size"] or stat.st_mtime_ns != sample[f"{kind}_mtime_ns"]:
+                    return True
+        return False
+
+    # --------------------------------------------------
+    # Compile
+    # --------------------------------------------------
+    @classmethod
+    def compile_local(
+        cls,
+        split: str,
+        target: str = "class_map",
+        num_colors: int = 3,
+        workers: int = 4,
+    ) -> "SplitTensorCache":
+        return cls.compile(
+            SplitReader.discover(split),
+            cls.local_directory(split),
+            target=target,
+            class_names=ColorName.labels(num_colors),
+            workers=workers,
+        )
+
+    @classmethod
+    def compile(
+        cls,
+        samples: Sequence[SamplePaths],
+        directory: PathLike,
+        target: str = "class_map",
+        class_names: Sequence[str] | None = None,
+        workers: int = 4,
+    ) -> "SplitTensorCache":
+        """
+        Decode every image and rasterize every annotation of `samples`
+        into `directory`. All images must share one size.
+
+        Rows are written straight into the memmapped .npy files; PNGs are
+        decoded on `workers` threads. The arrays are written under temporary
+        names and the manifest last (any old manifest is removed first), so
+        an interrupted compile never leaves a cache that opens.
+        """
+        if target not in cls.TARGETS:
+            raise ValueError(f"Unknown target '{target}' (expected one of: {', '.join(cls.TARGETS)})")
+        if not samples:
+            raise ValueError("No samples to compile")
+        if class_names is None:
+            class_names = ColorName.labels(3)
+        class_names = list(class_names)
+
+        directory = FileIO._to_path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        first = ImageAnnotationReader.read_header(samples[0].annotation_path)
+        width, height = first.width, first.height
+        count = len(samples)
+
+        if target == "class_map":
+            mask_shape: Tuple[int, ...] = (count, height, width)
+        else:
+            mask_shape = (count, len(class_names), height, width)
+
+        # A recompile drops the old manifest first: it must never describe
+        # the new arrays if the compile stops after swapping them in.
+        (directory / MANIFEST_FILE).unlink(missing_ok=True)
+
+        images_tmp = directory / f"{IMAGES_FILE}.tmp"
+        masks_tmp = directory / f"{MASKS_FILE}.tmp"
+        images = np.lib.format.open_memmap(images_tmp, mode="w+", dtype=np.uint8, shape=(count, height, width, 3))
+        masks = np.lib.format.open_memmap(masks_tmp, mode="w+", dtype=np.uint8, shape=mask_shape)
+
+        def decode(sample: SamplePaths) -> np.ndarray:
+            image = SplitReader.load_image(sample.image_path)
+            if image.shape != (height, width, 3):
+                raise ValueError(f"{sample.image_path.name} is {image.shape[1]}x{image.shape[0]}, expected {width}x{height}")
+            return image
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="tensor-cache") as executor:
+            for i, (sample, image) in enumerate(zip(samples, executor.map(decode, samples))):
+                images[i] = image
+                labels = [
+                    (item.get("name", ""), np.asarray(DataLabel.run_length_from_json(item).to_flat(), dtype=np.int32))
+                    for item in ImageAnnotationReader.iter_label_json(sample.annotation_path)
+                ]
+                if target == "class_map":
+                    AnnotationRasterizer.class_map_from_stripes(width, height, labels, class_names, out=masks[i])
+                else:
+                    AnnotationRasterizer.class_masks_from_stripes(width, height, labels, class_names, out=masks[i])
+
+        images.flush()
+        masks.flush()
+        del images, masks
+
+        os.replace(images_tmp, directory / IMAGES_FILE)
+        os.replace(masks_tmp, directory / MASKS_FILE)
+
+        manifest = {
+            "version": cls.VERSION,
+            "target": target,
+            "class_names": class_names,
+            "count": count,
+            "width": width,
+            "height": height,
+            "samples": [cls._sample_entry(sample) for sample in samples],
+        }
+        FileIO.save(json.dumps(manifest, indent=2).encode("utf-8"), directory / MANIFEST_FILE)
+        return cls(directory)
+
+    @staticmethod
+    def _sample_entry(sample: SamplePaths) -> Dict[str, Any]:
+        image_stat = sample.image_path.stat()
+        annotation_stat = sample.annotation_path.stat()
+        return {
+            "name": sample.name,
+            "image": str(sample.image_path),
+            "image_size": image_stat.st_size,
+            "image_mtime_ns": image_stat.st_mtime_ns,
+            "annotation": str(sample.annotation_path),
+            "annotation_size": annotation_stat.st_size,
+            "annotation_mtime_ns": annotation_stat.st_mtime_ns,
+        }
+
+
+if __name__ == "__main__":
+    # python split_tensor_cache.py training testing [--masks]
+    args = sys.argv[1:]
+    cache_target = "masks" if "--masks" in args else "class_map"
+    for split_name in [a for a in args if not a.startswith("--")] or ["training", "testing"]:
+        cache = SplitTensorCache.compile_local(split_name, target=cache_target)
+        print(f"{split_name}: {len(cache)} samples -> {cache.directory}")
@@ -0,0 +1,327 @@
+# stage_memory.py
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+from filesystem.file_io import FileIO, PathLike
+from memory_action import MemoryAction
+from stage_timing import _percentile
+
+_MB = 1024 * 1024
+
+
+def _megabytes(value: int | None) -> str:
+    return f"{value / _MB:.1f}" if value is not None else "n/a"
+
+
+@dataclass
+class _StagePeak:
+    calls: int = 0
+    max_rss: int = 0
+    max_traced: int = 0      # traced bytes at the stage's peak
+    max_allocated: int = 0   # peak minus traced bytes when the stage started
+
+
+@dataclass
+class _SamplePeak:
+    rss: int = 0
+    traced: int = 0
+
+
+class StageMemory:
+    """
+    Process-wide memory sampling around Runner's sample stages.
+
+        @classmethod
+        @StageMemory.measured("render")
+        def render_sample(cls, ...): ...
+
+    Disabled by default: measured() then costs one flag check per call.
+    While enabled, every measured stage records the resident set size
+    (RSS) when it ends and, with tracemalloc on, the peak of traced
+    Python allocations while it ran. Both roll up into the sample whose
+    context is active on the thread (StageMemory.sample(index)), giving
+    a peak-memory-per-sample report.
+
+    tracemalloc's peak is process-wide: with concurrent pipeline workers
+    a stage's peak includes what other threads allocated meanwhile, so
+    run serially for exact per-sample peaks. Samples rendered in executor
+    worker processes are not seen here; MemoryBudget counts their RSS.
+
+    Usage:
+        StageMemory.start(trace_allocations=True)
+        ... Runner.run ...
+        StageMemory.stop()
+        print(StageMemory.report())
+        StageMemory.export("memory.json")
+    """
+
+    enabled: bool = False
+    tracing: bool = False
+
+    _lock = threading.Lock()
+    _local = threading.local()
+    _stages: Dict[str, _StagePeak] = {}
+    _samples: Dict[Any, _SamplePeak] = {}
+    _started_tracemalloc = False
+
+    # --------------------------------------------------
+    # Lifetime
+    # --------------------------------------------------
+    @classmethod
+    def start(cls, trace_allocations: bool = False) -> None:
+        """
+        Clear everything recorded so far and enable sampling; with
+        trace_allocations also trace Python allocations with tracemalloc
+        (several times slower, but exact).
+        """
+        cls.reset()
+        cls.tracing = trace_allocations
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            cls._started_tracemalloc = True
+        cls.enabled = True
+
+    @classmethod
+    def stop(cls) -> None:
+        cls.enabled = False
+        if cls._started_tracemalloc:
+            tracemalloc.stop()
+            cls._started_tracemalloc = False
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._stages.clear()
+            cls._samples.clear()
+
+    # --------------------------------------------------
+    # Process memory
+    # --------------------------------------------------
+    @staticmethod
+    def rss_bytes(pid: int | None = None) -> int | None:
+        """
+        Current resident memory of a process (default: this one) from
+        /proc, or None where /proc is not available.
+        """
+        try:
+            with open(f"/proc/{pid if pid is not None else 'self'}/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def peak_rss_bytes() -> int | None:
+        """
+        Highest RSS this process has reached, from getrusage (Unix only).
+        """
+        try:
+            import resource
+        except ImportError:
+            return None
+        # ru_maxrss is KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    # --------------------------------------------------
+    # Recording
+    # --------------------------------------------------
+    @classmethod
+    def measured(cls, name: str) -> Callable[[Callable], Callable]:
+        """
+        Decorator: sample memory around every call of the wrapped function.
+        """
+        def decorate(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return fn(*args, **kwargs)
+                with cls.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    @classmethod
+    @contextmanager
+    def stage(cls, name: str) -> Iterator[None]:
+        if not cls.enabled:
+            yield
+            return
+        tracing = cls.tracing and tracemalloc.is_tracing()
+        start_traced = 0
+        if tracing:
+            start_traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            peak_traced = tracemalloc.get_traced_memory()[1] if tracing else 0
+            cls._add(name, cls.rss_bytes() or 0, peak_traced, max(peak_traced - start_traced, 0))
+
+    @classmethod
+    @contextmanager
+    def sample(cls, key: Any) -> Iterator[None]:
+        """
+        Attribute stages on this thread to sample `key` until the block ends.
+        """
+        if not cls.enabled:
+            yield
+            return
+        previous = getattr(cls._local, "sample", None)
+        cls._local.sample = key
+        try:
+            yield
+        finally:
+            cls._local.sample = previous
+
+    @classmethod
+    def _add(cls, name: str, rss: int, traced: int, allocated: int) -> None:
+        key = getattr(cls._local, "sample", None)
+        with cls._lock:
+            stage = cls._stages.setdefault(name, _StagePeak())
+            stage.calls += 1
+            stage.max_rss = max(stage.max_rss, rss)
+            stage.max_traced = max(stage.max_traced, traced)
+            stage.max_allocated = max(stage.max_allocated, allocated)
+            if key is not None:
+                sample = cls._samples.setdefault(key, _SamplePeak())
+                sample.rss = max(sample.rss, rss)
+                sample.traced = max(sample.traced, traced)
+
+    # --------------------------------------------------
+    # Summary
+    # --------------------------------------------------
+    @classmethod
+    def summary(cls, worst: int = 5) -> Dict[str, Any]:
+        with cls._lock:
+            rss = [peak.rss for peak in cls._samples.values()]
+            traced = [peak.traced for peak in cls._samples.values()]
+            by_rss = sorted(cls._samples.items(), key=lambda item: item[1].rss, reverse=True)
+            return {
+                "tracemalloc": cls.tracing,
+                "peak_rss_bytes": cls.peak_rss_bytes(),
+                "samples": len(cls._samples),
+                "sample_rss_p50_bytes": int(_percentile(rss, 0.50)),
+                "sample_rss_p95_bytes": int(_percentile(rss, 0.95)),
+                "sample_rss_max_bytes": max(rss, default=0),
+                "sample_traced_p50_bytes": int(_percentile(traced, 0.50)),
+                "sample_traced_max_bytes": max(traced, default=0),
+                "stages": {
+                    name: {
+                        "calls": stage.calls,
+                        "max_rss_bytes": stage.max_rss,
+                        "max_traced_bytes": stage.max_traced,
+                        "max_allocated_bytes": stage.max_allocated,
+                    }
+                    for name, stage in cls._stages.items()
+                },
+                "worst_samples": [
+                    {"sample": key, "rss_bytes": peak.rss, "traced_bytes": peak.traced}
+                    for key, peak in by_rss[:worst]
+                ],
+            }
+
+    @classmethod
+    def report(cls) -> str:
+        summary = cls.summary()
+        traced = summary["tracemalloc"]
+        lines = [
+            f"Stage memory: {summary['samples']} samples, process peak RSS "
+            f"{_megabytes(summary['peak_rss_bytes'])} MB",
+            f"  per sample RSS MB: p50 {_megabytes(summary['sample_rss_p50_bytes'])}, "
+            f"p95 {_megabytes(summary['sample_rss_p95_bytes'])}, max {_megabytes(summary['sample_rss_max_bytes'])}",
+        ]
+        if traced:
+            lines.append(
+                f"  per sample traced MB: p50 {_megabytes(summary['sample_traced_p50_bytes'])}, "
+                f"max {_megabytes(summary['sample_traced_max_bytes'])}"
+            )
+        lines.append(f"  {'stage':<18} {'calls':>7} {'max RSS MB':>11} {'peak MB':>9} {'added MB':>9}")
+        for name, stage in summary["stages"].items():
+            lines.append(
+                f"  {name:<18} {stage['calls']:>7} {_megabytes(stage['max_rss_bytes']):>11} "
+                f"{_megabytes(stage['max_traced_bytes']) if traced else '-':>9} "
+                f"{_megabytes(stage['max_allocated_bytes']) if traced else '-':>9}"
+            )
+        worst = ", ".join(
+            f"{entry['sample']} ({_megabytes(entry['rss_bytes'])} MB)" for entry in summary["worst_samples"]
+        )
+        if worst:
+            lines.append(f"  highest RSS: {worst}")
+        return "\n".join(lines)
+
+    @classmethod
+    def export(cls, file_path: PathLike) -> Path:
+        data = json.dumps(cls.summary(), indent=2).encode("utf-8")
+        return FileIO.save(data, file_path)
+
+
+# ----------------------------------------------------------------------
+# Budget
+# ----------------------------------------------------------------------
+
+class MemoryBudget:
+    """
+    Resident-memory ceiling for a run: this process plus its worker
+    processes (worker_pids, e.g. GenerationPool.worker_pids).
+    """
+
+    def __init__(
+        self,
+        limit_bytes: int,
+        action: MemoryAction | str = MemoryAction.WARN,
+        worker_pids: Callable[[], List[int]] | None = None,
+    ) -> None:
+        self.limit_bytes = int(limit_bytes)
+        self.action = MemoryAction.parse(action)
+        self.worker_pids = worker_pids
+        self.exceedances = 0
+        self.max_usage = 0
+        self._over = False
+
+    @classmethod
+    def from_params(cls, params: Any, worker_pids: Callable[[], List[int]] | None = None) -> "MemoryBudget | None":
+        """
+        The budget params.memory_budget_mb describes, or None without one.
+        """
+        if params.memory_budget_mb is None:
+            return None
+        return cls(params.memory_budget_mb * _MB, params.memory_action, worker_pids)
+
+    @property
+    def throttles(self) -> bool:
+        return self.action == MemoryAction.THROTTLE
+
+    def usage(self) -> int | None:
+        total = StageMemory.rss_bytes()
+        if total is None:
+            return None
+        for pid in self.worker_pids() if self.worker_pids is not None else ():
+            total += StageMemory.rss_bytes(pid) or 0  # None: worker exited meanwhile
+        return total
+
+    def exceeded(self) -> bool:
+        """
+        Measure now; prints once each time usage crosses the limit.
+        """
+        usage = self.usage()
+        if usage is None:
+            return False
+        self.max_usage = max(self.max_usage, usage)
+        over = usage > self.limit_bytes
+        if over and not self._over:
+            self.exceedances += 1
+            effect = "throttling workers" if self.throttles else "continuing"
+            print(f"Warning: memory budget exceeded ({_megabytes(usage)} MB > "
+                  f"{_megabytes(self.limit_bytes)} MB), {effect}")
+        elif self._over and not over:
+            print(f"Memory back under budget ({_megabytes(usage)} MB)")
+        self._over = over
+        return over
@@ -0,0 +1,259 @@
+# stage_timing.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from filesystem.file_io import FileIO, PathLike
+
+
+class _NullTimer:
+    """
+    Shared do-nothing context manager handed out while timing is disabled.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        StageTiming._add(self.name, time.perf_counter() - self.start)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class StageTiming:
+    """
+    Process-wide named timers and counters for the generation loop.
+
+        with StageTiming.time("recolor_white"):
+            ImageUtility.recolor_white(...)
+        StageTiming.count("glyphs")
+
+    Disabled by default: time() then returns one shared no-op context
+    manager and count() returns after a single flag check, so the
+    instrumentation can stay in the hot path.
+
+    Time is attributed to the sample whose context is active on the
+    calling thread (StageTiming.sample(index)); the summary reports, per
+    timer, the total, the call count and the p50/p95 of its per-sample
+    sums, plus samples/sec over the whole run.
+
+    Samples rendered in executor worker processes are timed there by
+    capture() and added to this process's summary by merge().
+
+    Usage:
+        StageTiming.start()
+        ... Runner.run ...
+        StageTiming.stop()
+        print(StageTiming.report())
+        StageTiming.export("timing.json")
+    """
+
+    enabled: bool = False
+
+    _lock = threading.Lock()
+    _local = threading.local()
+    _totals: Dict[str, float] = defaultdict(float)
+    _calls: Dict[str, int] = defaultdict(int)
+    _per_sample: Dict[str, Dict[Any, float]] = defaultdict(lambda: defaultdict(float))
+    _counters: Dict[str, int] = defaultdict(int)
+    _samples: set = set()
+    _started = 0.0
+    _stopped = 0.0
+    _pid: int | None = None  # process that called start()
+
+    # --------------------------------------------------
+    # Lifetime
+    # --------------------------------------------------
+    @classmethod
+    def start(cls) -> None:
+        """
+        Clear everything recorded so far and enable timing.
+        """
+        cls.reset()
+        cls._started = time.perf_counter()
+        cls._pid = os.getpid()
+        cls.enabled = True
+
+    @classmethod
+    def stop(cls) -> None:
+        cls.enabled = False
+        cls._stopped = time.perf_counter()
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._totals.clear()
+            cls._calls.clear()
+            cls._per_sample.clear()
+            cls._counters.clear()
+            cls._samples.clear()
+            cls._started = cls._stopped = 0.0
+
+    # --------------------------------------------------
+    # Recording
+    # --------------------------------------------------
+    @classmethod
+    def time(cls, name: str):
+        if not cls.enabled:
+            return _NULL_TIMER
+        return _Timer(name)
+
+    @classmethod
+    def count(cls, name: str, amount: int = 1) -> None:
+        if not cls.enabled:
+            return
+        with cls._lock:
+            cls._counters[name] += amount
+
+    @classmethod
+    @contextmanager
+    def sample(cls, key: Any) -> Iterator[None]:
+        """
+        Attribute timers on this thread to sample `key` (e.g. its index)
+        until the block ends.
+        """
+        if not cls.enabled:
+            yield
+            return
+        previous = getattr(cls._local, "sample", None)
+        cls._local.sample = key
+        with cls._lock:
+            cls._samples.add(key)
+        try:
+            yield
+        finally:
+            cls._local.sample = previous
+
+    @classmethod
+    @contextmanager
+    def capture(cls, key: Any) -> Iterator[Dict[str, Any] | None]:
+        """
+        sample(key) for work that may run in an executor worker process.
+        There (including forked workers, which inherit `enabled`) the
+        block is timed locally and the yielded dict is filled with what it
+        recorded; send it back with the result and pass it to merge() in
+        the process that called start(). In that process (e.g. a thread
+        executor) this is just sample(key) and yields None.
+        """
+        if cls.enabled and cls._pid == os.getpid():
+            with cls.sample(key):
+                yield None
+            return
+        record: Dict[str, Any] = {}
+        cls.start()
+        try:
+            with cls.sample(key):
+                yield record
+        finally:
+            cls.stop()
+            with cls._lock:
+                record["timers"] = {name: (cls._totals[name], cls._calls[name]) for name in cls._totals}
+                record["counters"] = dict(cls._counters)
+            cls.reset()
+
+    @classmethod
+    def merge(cls, key: Any, record: Dict[str, Any] | None) -> None:
+        """
+        Add a record from capture() as sample `key`.
+        """
+        if not cls.enabled or not record:
+            return
+        with cls._lock:
+            cls._samples.add(key)
+            for name, (seconds, calls) in record["timers"].items():
+                cls._totals[name] += seconds
+                cls._calls[name] += calls
+                cls._per_sample[name][key] += seconds
+            for name, value in record["counters"].items():
+                cls._counters[name] += value
+
+    @classmethod
+    def _add(cls, name: str, seconds: float) -> None:
+        key = getattr(cls._local, "sample", None)
+        with cls._lock:
+            cls._totals[name] += seconds
+            cls._calls[name] += 1
+            if key is not None:
+                cls._per_sample[name][key] += seconds
+
+    # --------------------------------------------------
+    # Summary
+    # --------------------------------------------------
+    @classmethod
+    def summary(cls) -> Dict[str, Any]:
+        with cls._lock:
+            end = cls._stopped if cls._stopped else time.perf_counter()
+            elapsed = max(end - cls._started, 0.0) if cls._started else 0.0
+            samples = len(cls._samples)
+            timers = {}
+            for name in sorted(cls._totals, key=cls._totals.get, reverse=True):
+                per_sample = list(cls._per_sample.get(name, {}).values())
+                timers[name] = {
+                    "total_seconds": cls._totals[name],
+                    "calls": cls._calls[name],
+                    "p50_per_sample_seconds": _percentile(per_sample, 0.50),
+                    "p95_per_sample_seconds": _percentile(per_sample, 0.95),
+                }
+            return {
+                "elapsed_seconds": elapsed,
+                "samples": samples,
+                "samples_per_second": samples / elapsed if elapsed > 0 else 0.0,
+                "timers": timers,
+                "counters": dict(sorted(cls._counters.items())),
+            }
+
+    @classmethod
+    def report(cls) -> str:
+        summary = cls.summary()
+        lines = [
+            f"Stage timing: {summary['samples']} samples in {summary['elapsed_seconds']:.2f} s "
+            f"({summary['samples_per_second']:.2f} samples/s)",
+            f"  {'timer':<18} {'total s':>9} {'calls':>7} {'p50 ms':>9} {'p95 ms':>9}",
+        ]
+        for name, timer in summary["timers"].items():
+            lines.append(
+                f"  {name:<18} {timer['total_seconds']:>9.3f} {timer['calls']:>7} "
+                f"{timer['p50_per_sample_seconds'] * 1000:>9.2f} {timer['p95_per_sample_seconds'] * 1000:>9.2f}"
+            )
+        for name, value in summary["counters"].items():
+            lines.append(f"  {name:<18} {value:>9}")
+        return "\n".join(lines)
+
+    @classmethod
+    def export(cls, file_path: PathLike) -> Path:
+        data = json.dumps(cls.summary(), indent=2).encode("utf-8")
+        return FileIO.save(data, file_path)
@@ -0,0 +1,150 @@
+# synthetic_dataset.py
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from runner import Runner
+from runner_params import RunnerParams
+
+
+class SyntheticDataset:
+    """
+    Random-access view of a split that is never written to disk.
+
+    Item i is sample params.start_index + i, rendered on demand from
+    (params, seed, index) by Runner.generate_sample. The per-sample seed
+    comes from Runner.sample_seed, so an item is bit-identical on every
+    call, in every process, and matches what Runner.run writes for the
+    same index when params.seed == seed.
+
+    Recently rendered items are kept in an LRU cache (cache_size items,
+    0 disables it). Cached numpy arrays are returned read-only so a caller
+    cannot change what the next caller gets.
+
+    The object pickles without its cache, so it can be handed to worker
+    processes (e.g. a torch DataLoader) that each render their own indices.
+
+    Usage:
+        dataset = SyntheticDataset(params, seed=1234, target="class_map")
+        image, class_map = dataset[17]
+    """
+
+    def __init__(
+        self,
+        params: RunnerParams,
+        seed: int | None = None,
+        name: str | None = None,
+        num_colors: int = 3,
+        target: str = "document",
+        cache_size: int = 64,
+    ) -> None:
+        if seed is None:
+            seed = params.seed
+        if seed is None:
+            raise ValueError("SyntheticDataset needs a seed (argument or params.seed)")
+        if target not in Runner.GENERATE_TARGETS:
+            raise ValueError(f"Unknown target '{target}' (expected one of: {', '.join(Runner.GENERATE_TARGETS)})")
+        if cache_size < 0:
+            raise ValueError("cache_size cannot be negative")
+
+        self.params = params
+        self.seed = int(seed)
+        self.name = name if name is not None else f"{params.file_name_base}_{params.training_postfix}"
+        self.num_colors = num_colors
+        self.target = target
+        self.cache_size = cache_size
+
+        self._reset_cache()
+
+    def _reset_cache(self) -> None:
+        self._cache: OrderedDict[int, Tuple[np.ndarray, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # --------------------------------------------------
+    # Sequence protocol
+    # --------------------------------------------------
+    def __len__(self) -> int:
+        return max(self.params.end_index - self.params.start_index + 1, 0)
+
+    def __getitem__(self, i: int) -> Tuple[np.ndarray, Any]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"SyntheticDataset index {i} out of range (0..{len(self) - 1})")
+
+        with self._lock:
+            item = self._cache.get(i)
+            if item is not None:
+                self._cache.move_to_end(i)
+                self.hits += 1
+                return item
+            self.misses += 1
+
+        item = self.render(i)
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[i] = item
+                self._cache.move_to_end(i)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return item
+
+    def render(self, i: int) -> Tuple[np.ndarray, Any]:
+        """
+        Render item i, bypassing the cache.
+        """
+        index = self.index_of(i)
+        image, target = Runner.generate_sample(
+            self.params,
+            self.name,
+            index,
+            self.num_colors,
+            self.target,
+            Runner.sample_seed(self.seed, index),
+        )
+        image.flags.writeable = False
+        if isinstance(target, np.ndarray):
+            target.flags.writeable = False
+        return image, target
+
+    def index_of(self, i: int) -> int:
+        """
+        Sample index (as used in file names) of item i.
+        """
+        return self.params.start_index + i
+
+    # --------------------------------------------------
+    # Cache
+    # --------------------------------------------------
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def cache_info(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache),
+                "max_size": self.cache_size,
+            }
+
+    # --------------------------------------------------
+    # Pickling (worker processes start with an empty cache)
+    # --------------------------------------------------
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for key in ("_cache", "_lock", "hits", "misses"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._reset_cache()
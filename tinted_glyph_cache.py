@@ -0,0 +1,75 @@
+# tinted_glyph_cache.py
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from circle_factory import CircleFactory
+from glyph_compositor import TintedGlyph
+from image.rgba import RGBA
+
+
+class TintedGlyphCache:
+    """
+    Process-wide LRU of TintedGlyphs keyed by (sprite name, color), built
+    lazily from CircleFactory templates (see TintedGlyph for what an entry
+    saves a placement). Each get() names its own byte limit
+    (RunnerParams.glyph_cache_mb); least recently used entries are dropped
+    until the cache fits, and a limit of 0 disables caching.
+
+    A run touches at most 30 sizes x 6 colors (about 10 MB for all of
+    them), so the default limit never evicts in practice.
+    """
+
+    DEFAULT_LIMIT_BYTES = 32 * 1024 * 1024
+
+    _entries: "OrderedDict[Tuple[str, Tuple[int, int, int, int]], TintedGlyph]" = OrderedDict()
+    _bytes: int = 0
+    _hits: int = 0
+    _misses: int = 0
+    _evictions: int = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str, rgba: RGBA, limit_bytes: int = DEFAULT_LIMIT_BYTES) -> TintedGlyph:
+        key = (name, rgba.tuple())
+        with cls._lock:
+            tinted = cls._entries.get(key)
+            if tinted is not None:
+                cls._entries.move_to_end(key)
+                cls._hits += 1
+                return tinted
+            cls._misses += 1
+
+        tinted = TintedGlyph.build(CircleFactory.template(name), rgba)
+        if limit_bytes <= 0:
+            return tinted
+
+        with cls._lock:
+            if key not in cls._entries:
+                cls._entries[key] = tinted
+                cls._bytes += tinted.nbytes
+            while cls._bytes > limit_bytes and len(cls._entries) > 1:
+                _key, evicted = cls._entries.popitem(last=False)
+                cls._bytes -= evicted.nbytes
+                cls._evictions += 1
+        return tinted
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries.clear()
+            cls._bytes = 0
+            cls._hits = cls._misses = cls._evictions = 0
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        with cls._lock:
+            return {
+                "entries": len(cls._entries),
+                "bytes": cls._bytes,
+                "hits": cls._hits,
+                "misses": cls._misses,
+                "evictions": cls._evictions,
+            }